@@ -1,18 +1,69 @@
 import streamlit as st
-import yfinance as yf
+import secrets
 import pandas as pd
-import plotly.express as px
 from datetime import date, datetime, timedelta
-import pytz
-
-# initialise session
-if "portfolio" not in st.session_state:
-    st.session_state.portfolio = []
+from utils.lazy import lazy_import
+from utils.price_cache import price_cache
+from utils.price_store import price_store
+from utils.quotes import get_quotes
+from utils.live_quotes import intraday_buffer
+from utils.market_calendar import session_at, traded_today, next_open, cache_ttl, cache_epoch
+from utils.shared_cache import market_cache
+from utils.fetch_scheduler import scheduler
+from utils.valuation import build_close_matrix, portfolio_value_series, percentage_change
+from utils.charting import TIMEFRAMES, build_rollups, chart_frame
+from utils.risk import BENCHMARK, daily_returns, portfolio_returns, risk_summary, rolling_stats, correlation_matrix
+from utils.holdings import format_holdings_table, build_purchases_table
+from utils.lot_store import get_lot_store
+from utils.portfolio_io import import_lots, export_parquet, validate_tickers
+from utils.instrumentation import metrics
+from utils.market_data import get_provider
+from utils.memo import Memo
+
+# heavy modules, only loaded once a run actually needs them
+px = lazy_import("plotly.express")
 
 st.set_page_config(page_title="Stock Portfolio Tracker", layout="wide", page_icon="💰")
 st.title("Portfolio")
 
-# fetch stock data from yfinance
+# derived tables and charts of this session, rebuilt only when their inputs change
+memo = Memo(st.session_state)
+
+# every session works on its own portfolio, saved under a key it can enter again later
+if "portfolio_id" not in st.session_state:
+    st.session_state.portfolio_id = secrets.token_urlsafe(12)
+st.sidebar.header("Portfolio")
+st.session_state.portfolio_id = st.sidebar.text_input(
+    "Portfolio key", st.session_state.portfolio_id,
+    help="Your purchases are saved under this key. Enter it again on a later visit to reopen them."
+).strip() or st.session_state.portfolio_id
+lot_store = get_lot_store(st.session_state.portfolio_id)
+
+# load the persisted portfolio lots once per change of the lot store; the version is read
+# once, before the lots, so a concurrent write can only make this run's data newer than its key
+lots_version = (lot_store.portfolio_id, lot_store.version)
+lots_df = memo.get("lots", lots_version, lot_store.lots_frame)
+
+def load_history(ticker: str):
+    """Loads 15 years of closes into the compact in-memory price store."""
+    start_date = (datetime.today() - timedelta(days=15*365)).strftime("%Y-%m-%d") # 15 years ago
+    # served from the on-disk price cache, only bars after the last stored date are downloaded
+    hist = price_cache.get_history(ticker, start_date, datetime.today().strftime("%Y-%m-%d"))
+    return price_store.put(ticker, hist)
+
+def load_stock_data(ticker: str) -> float:
+    """Refreshes the stored history and returns the current price, errors are raised to the caller."""
+    load_history(ticker)
+
+    provider = get_provider()
+
+    def fetch() -> float:
+        with metrics.call(provider.name, "fast_info"):
+            return provider.last_price(ticker)
+
+    return scheduler.run(("fast_info", ticker), fetch)
+
+# fetch stock data from the market-data provider
 def fetch_stock_data(ticker: str) -> tuple:
     """Fetches historical and current price data for a given ticker.
     Args:
@@ -20,15 +71,18 @@ def fetch_stock_data(ticker: str) -> tuple:
 
     Returns:
         tuple: A tuple containing:
-            - hist (pandas.DataFrame or None): A Pandas DataFrame containing historical stock data, 
-              or None if an error occurred or no data was found.  The DataFrame typically
-              includes columns like 'Open', 'High', 'Low', 'Close', 'Volume', etc.
+            - hist (PriceSeries or None): The compact daily closes of the stock (float32, on
+              a date index shared with other tickers), or None if an error occurred.
             - current_price (float or None): The current price of the stock, or None."""
     try:
-        stock = yf.Ticker(ticker)
-        start_date = (datetime.today() - timedelta(days=15*365)).strftime("%Y-%m-%d") # 15 years ago
-        hist = stock.history(start=start_date, end=datetime.today().strftime("%Y-%m-%d"))
-        current_price = stock.fast_info.last_price 
+        # shared by every session: cached for a minute during the session and until the next
+        # open otherwise, and concurrent requests for a ticker wait on a single download
+        current_price = market_cache.get(("stock_data", ticker), lambda: load_stock_data(ticker), ttl=cache_ttl())
+
+        # the closes may have been evicted from the price store since, reload them from disk
+        hist = price_store.get(ticker)
+        if hist is None:
+            hist = load_history(ticker)
         return hist, current_price
     
     except Exception as e: # handle potential errors during data fetching
@@ -37,10 +91,12 @@ def fetch_stock_data(ticker: str) -> tuple:
 
 st.sidebar.header("Add to Watchlist")
 DEFAULT_WATCHLIST = ["AAPL", "MSFT", "TSLA", "GOOGL", "NVDA"]
+LIVE_REFRESH_SECONDS = 15
 
 # initialise watchlist
 if "watchlist" not in st.session_state:
     st.session_state.watchlist = DEFAULT_WATCHLIST.copy()
+    st.session_state.watchlist_version = 0
 
 # input field for adding a stock to the watchlist
 ticker_input = st.sidebar.text_input("Enter Ticker Symbol", max_chars=10).upper()
@@ -51,6 +107,7 @@ if st.sidebar.button("➕ Add to Watchlist"):
         ticker_input = ticker_input.strip()
         if ticker_input not in st.session_state.watchlist:
             st.session_state.watchlist.append(ticker_input)
+            st.session_state.watchlist_version += 1
             st.sidebar.success(f"Added {ticker_input} to Watchlist!")
             st.rerun() # refresh the app with updated watchlist
         else:
@@ -58,99 +115,116 @@ if st.sidebar.button("➕ Add to Watchlist"):
     else:
         st.sidebar.warning("Please enter a ticker symbol.")
 
-def get_stock_data(tickers: list) -> list:
+def get_stock_data(tickers: list) -> tuple:
     """Fetches and calculates stock price and percentage change for a list of tickers.
 
-    This function retrieves historical and intraday stock data from yfinance. It calculates
-    the percentage change based on market hours: if the market is open, it uses the change
-    from today's open to the latest price; otherwise, it uses the change from yesterday's
-    open to yesterday's close.
+    This function retrieves historical and intraday stock data from the data provider for all tickers
+    in one batched request. It calculates the percentage change based on the exchange calendar:
+    once today's session has opened, it uses the change from today's open to the latest price;
+    otherwise (before the open, on weekends and holidays), it uses the change from the last
+    session's open to its close. Quotes are cached per ticker in the shared market-data cache,
+    for a minute during the regular session and until the next open outside it, so sessions
+    with overlapping watchlists share downloads.
 
     Args:
         tickers (list): A list of stock ticker symbols (e.g., ["AAPL", "MSFT"]).
 
     Returns:
-        list: A list of dictionaries, where each dictionary contains the following information
-              for a stock:
+        tuple: A tuple containing:
+            - quotes (list): A list of dictionaries, where each dictionary contains the following
+              information for a stock:
                 - "ticker": The stock ticker symbol (str).
                 - "price": The latest price of the stock (float).
                 - "change": The percentage change in price (float).
+              Empty if no data is available.
+            - failures (dict): Maps each ticker without a quote to a message."""
+    market_open = traded_today()
+    failures = {}
 
-              Returns an empty list if no data is available."""
-    
-    stock_data = []
-    now = datetime.now(pytz.timezone("US/Eastern"))  # use US/Eastern timezone for market hours
-
-    for ticker in tickers:
-        try:
-            stock = yf.Ticker(ticker)
-            hist = stock.history(period="2d", interval="1d")  # get last 2 days' daily data
-
-            if not hist.empty:
-                # if market open today 
-                market_open_today = now.weekday() < 5 and (now.hour > 9 or (now.hour == 9 and now.minute >= 30))  
-
-                if market_open_today:  
-                    today_data = stock.history(period="1d", interval="1m") # get 1-minute data for today
-                    if not today_data.empty:
-                        today_open = today_data["Open"].iloc[0] 
-                        latest_price = today_data["Close"].iloc[-1] 
-                        percent_change = ((latest_price - today_open) / today_open) * 100
-                    else:
-                        st.warning(f"No intraday data available for {ticker} today.")
-                        continue  # if there's no data, skip this stock
-                else:  
-                    # market hasn't opened yet, use yesterday's open-close change
-                    yesterday_open = hist["Open"].iloc[-1]
-                    yesterday_close = hist["Close"].iloc[-1]
-                    percent_change = ((yesterday_close - yesterday_open) / yesterday_open) * 100
-                    latest_price = yesterday_close 
-
-                stock_data.append({"ticker": ticker, "price": latest_price, "change": percent_change})
-            else:
-                st.warning(f"No historical data available for {ticker}.")
-        except Exception as e:
-            st.error(f"Error fetching data for {ticker}: {e}")
-
-    return stock_data
+    def fetch(keys: list) -> dict:
+        quotes, errors = get_quotes([ticker for _, _, ticker in keys], market_open)
+        failures.update(errors)
+        return {("quote", market_open, quote["ticker"]): quote for quote in quotes}
 
-# display the watchlist with stock prices
-if st.session_state.watchlist:
-    stock_info = get_stock_data(st.session_state.watchlist)
+    keys = [("quote", market_open, ticker) for ticker in tickers]
+    cached = market_cache.get_many(keys, fetch, ttl=cache_ttl())
 
-    with st.sidebar:
-        col1, col2 = st.columns([3, 1])
-        col1.subheader("Your Watchlist")
+    missing = {ticker: failures.get(ticker, f"No data available for {ticker}.") for ticker, key in zip(tickers, keys) if key not in cached}
+    return [cached[key] for key in keys if key in cached], missing
 
-        if "show_watchlist_info" not in st.session_state:
-            st.session_state.show_watchlist_info = False
+def render_watchlist_rows(live: bool) -> None:
+    """Renders one row per watchlist stock with its price and percentage change.
 
-        if col2.button("ℹ️", help="Click for info"):
-            st.session_state.show_watchlist_info = not st.session_state.show_watchlist_info
+    In live mode, while the market is open, prices come from the intraday ring buffers,
+    which only download the minute bars after the last one they hold.
 
-        if st.session_state.show_watchlist_info:
-            st.info(
-                "The percentage change is calculated based on:\n"
-                "- **If the market is open:** (Current Price - Today's Open) / Today's Open * 100\n"
-                "- **If the market hasn't opened yet:** (Yesterday's Close - Yesterday's Open) / Yesterday's Open * 100"
+    Args:
+        live (bool): Whether to serve prices from the incrementally updated intraday buffers.
+    """
+    with metrics.section("watchlist rows"):
+        if live and session_at() == "regular":
+            stock_info, failures = intraday_buffer.quotes(st.session_state.watchlist)
+        else:
+            # reruns within one price window (e.g. the info button) reuse the last quotes
+            stock_info, failures = memo.get(
+                "watchlist_quotes", (st.session_state.watchlist_version, cache_epoch()),
+                lambda: get_stock_data(st.session_state.watchlist)
             )
+        for message in failures.values():
+            st.warning(message)
+
+        if stock_info: # check if stock_info is not empty
+            for stock in stock_info:
+                col1, col2, col3 = st.columns([2, 1, 1])
+                col1.write(f"**{stock['ticker']}**")
+                col2.write(f"${stock['price']:.2f}")
+                col3.write(f"**{stock['change']:.2f}%**")
+        else:
+            st.info("No data available for the stocks in your watchlist.")
 
-    if stock_info: # check if stock_info is not empty
-        for stock in stock_info:
-            col1, col2, col3 = st.sidebar.columns([2, 1, 1])
-            col1.write(f"**{stock['ticker']}**")
-            col2.write(f"${stock['price']:.2f}")
-            col3.write(f"**{stock['change']:.2f}%**")
+# display the watchlist with stock prices
+with metrics.section("watchlist"):
+    if st.session_state.watchlist:
+        with st.sidebar:
+            col1, col2 = st.columns([3, 1])
+            col1.subheader("Your Watchlist")
+
+            if "show_watchlist_info" not in st.session_state:
+                st.session_state.show_watchlist_info = False
+
+            if col2.button("ℹ️", help="Click for info"):
+                st.session_state.show_watchlist_info = not st.session_state.show_watchlist_info
+
+            if st.session_state.show_watchlist_info:
+                st.info(
+                    "The percentage change is calculated based on:\n"
+                    "- **Once the market has opened today:** (Current Price - Today's Open) / Today's Open * 100\n"
+                    "- **Before the open, on weekends and holidays:** (Last Close - Last Open) / Last Open * 100"
+                )
+
+            # live mode refreshes only the rows, in an isolated fragment, without rerunning the page
+            live = st.toggle("🔴 Live prices", help=f"Refresh the watchlist every {LIVE_REFRESH_SECONDS} seconds")
+            # nothing to refresh while the market is closed
+            market_session = session_at()
+            refresh = LIVE_REFRESH_SECONDS if live and market_session == "regular" else None
+            st.fragment(run_every=refresh)(render_watchlist_rows)(live)
+            if market_session != "regular":
+                st.caption(f"Market {market_session}, prices cached until {next_open():%a %d %b %H:%M} ET")
+
+        # reset Watchlist button
+        if st.sidebar.button("Reset Watchlist"):
+            st.session_state.watchlist = DEFAULT_WATCHLIST.copy()
+            st.session_state.watchlist_version += 1
+            st.sidebar.success("Watchlist reset to default!")
+            st.rerun()
     else:
-        st.sidebar.info("No data available for the stocks in your watchlist.")
+        st.sidebar.info("Your watchlist is empty. Add stocks to track!")
 
-    # reset Watchlist button
-    if st.sidebar.button("Reset Watchlist"):
-        st.session_state.watchlist = DEFAULT_WATCHLIST.copy()
-        st.sidebar.success("Watchlist reset to default!")
-        st.rerun()
-else:
-    st.sidebar.info("Your watchlist is empty. Add stocks to track!")
+# price cache status and invalidation
+st.sidebar.caption(
+    f"Price cache: {price_cache.stats['hits']} hits, {price_cache.stats['topups']} top-ups, "
+    f"{price_cache.stats['misses']} misses"
+)
 
 @st.dialog("Add a Stock to Your Portfolio")  # streamlit dialog 
 def add_stock() -> None:
@@ -171,10 +245,11 @@ def add_stock() -> None:
 
     if st.button("Add Stock"):  
         if ticker and buy_price:  # check if both ticker and buy price are provided
-            hist, current_price = fetch_stock_data(ticker) 
+            # a single last-price lookup is enough to validate the ticker
+            current_price = validate_tickers([ticker]).get(ticker)
 
             if current_price:  
-                st.session_state.portfolio.append({  # append the stock details to the portfolio list in session state
+                lot_store.add_lot({  # persist the lot, updating only this stock's holdings row
                     "name": name,
                     "ticker": ticker,
                     "buy_price": buy_price,
@@ -187,76 +262,111 @@ def add_stock() -> None:
             else:
                 st.error("⚠️ Invalid ticker symbol. Please try again.") 
 
+@st.dialog("Import Portfolio")
+def import_portfolio() -> None:
+    """Opens a dialog box to bulk import lots from a CSV or Parquet file."""
+    st.write(
+        "Columns: `ticker`, `buy_price`, `buy_date`, `quantity` and optionally `name`. "
+        "Files exported with 📥 Export Portfolio can be imported as they are."
+    )
+    uploaded = st.file_uploader("Portfolio file", type=["csv", "parquet"])
+
+    if st.button("Import") and uploaded is not None:
+        file_format = "parquet" if uploaded.name.lower().endswith(".parquet") else "csv"
+        status = st.empty()
+        try:
+            report = import_lots(uploaded, file_format, store=lot_store, progress=lambda r: status.write(f"{r['imported']:,} lots imported..."))
+        except ValueError as e:
+            st.error(f"⚠️ Could not import {uploaded.name}: {e}")
+            return
+
+        # a full rerun closes the dialog and redraws the page with the new lots, the report is shown there
+        st.session_state.import_report = report
+        st.rerun()
+
 # **Portfolio Value Over Time**
 st.subheader("Portfolio Value Over Time")
 
-if st.session_state.portfolio:
-    stock_data = {}
-
-    # fetch historical data for all stocks in portfolio
-    for stock in st.session_state.portfolio:
-        hist, current_price = fetch_stock_data(stock["ticker"])
-        if hist is not None:
-            hist["Value"] = hist["Close"] * stock["quantity"]  # stock value per day
-            stock_data[stock["ticker"]] = hist[["Value"]]
-
-    # combine all stocks into one df, summing values per date
-    if stock_data:
-        df = pd.concat(stock_data.values(), axis=1).sum(axis=1).reset_index()
-        df.columns = ["Date", "Total Portfolio Value"]
-
-        # dropdown for selecting timebase
-        timeframe_options = {
-            "Last 30 Days": 30,
-            "Last 3 Months": 90,
-            "Last 6 Months": 180,
-            "Last Year": 365,
-            "5 Years": 365*5,
-            "All Time": None
-        }
-        selected_timeframe = st.selectbox("Select Timeframe", list(timeframe_options.keys()))
-
-        # filter data based on selected timeframe
-        if timeframe_options[selected_timeframe]:  # if not "All Time"
-            start_date = df["Date"].max() - pd.Timedelta(days=timeframe_options[selected_timeframe])
-            df = df[df["Date"] >= start_date]
-
-        # calculate overall percentage gain/loss
-        if not df.empty:
-            initial_value = df["Total Portfolio Value"].iloc[0]
-            latest_value = df["Total Portfolio Value"].iloc[-1]
-            percentage_change = ((latest_value - initial_value) / initial_value) * 100 if initial_value != 0 else 0
-            st.metric(label="Overall % Change", value=f"{percentage_change:.2f}%", delta=f"{percentage_change:.2f}%")
-
-        # create Line Chart
-        fig = px.line(df, x="Date", y="Total Portfolio Value", title=f"Portfolio Value ({selected_timeframe})")
-        st.plotly_chart(fig)
-
-else:
-    st.info("No stocks in portfolio. Add stocks to get started.")
+with metrics.section("value chart"):
+    if not lots_df.empty:
+        # dropdown for selecting timebase, shared by both charts
+        selected_timeframe = st.selectbox("Select Timeframe", list(TIMEFRAMES.keys()))
+
+        stock_data = {}
+
+        # fetch historical data once per distinct ticker in portfolio
+        for ticker in lots_df["ticker"].unique():
+            hist, current_price = fetch_stock_data(ticker)
+            if hist is not None:
+                stock_data[ticker] = hist
+
+        # refreshed histories are new PriceSeries objects, so this key changes exactly when the
+        # lots or their prices do, and a timeframe switch only re-slices the cached rollups
+        series_key = (lots_version, tuple(stock_data.items()))
+
+        # value each date from the shares held on that date, so lots only count from their buy date
+        if stock_data:
+            values = memo.get("values", series_key,
+                              lambda: portfolio_value_series(lots_df, stock_data).set_index("Date"))
+            rollups = memo.get("value_rollups", series_key, lambda: build_rollups(values[["Total Portfolio Value"]]))
+
+            # slice the full-resolution series to the timeframe for the overall change
+            days = TIMEFRAMES[selected_timeframe]
+            daily = values
+            if days and not daily.empty:  # if not "All Time"
+                daily = daily.loc[daily.index.max() - pd.Timedelta(days=days):]
+
+            # overall gain/loss, not counting the money put into lots bought within the timeframe
+            if not daily.empty:
+                change = percentage_change(daily["Total Portfolio Value"], daily["Invested"])
+                st.metric(label="Overall % Change", value=f"{change:.2f}%", delta=f"{change:.2f}%")
+
+            # create Line Chart from the sliced and downsampled series
+            fig = memo.get(f"value_chart:{selected_timeframe}", series_key, lambda: px.line(
+                chart_frame(rollups, days, "Total Portfolio Value", var_name="Series"),
+                x="Date", y="Total Portfolio Value", title=f"Portfolio Value ({selected_timeframe})"
+            ))
+            st.plotly_chart(fig)
+
+    else:
+        st.info("No stocks in portfolio. Add stocks to get started.")
 
 # buttons for interacting with portfolio
-col1, col2, col3, col4 = st.columns(4)
+col1, col2, col3, col4, col5 = st.columns(5)
 
 with col1:
     if st.button("➕ Add Stock"):
         add_stock()
 
+with col5:
+    if st.button("📤 Import Portfolio"):
+        import_portfolio()
+
+# outcome of an import finished in the dialog, shown once
+if "import_report" in st.session_state:
+    report = st.session_state.pop("import_report")
+    st.success(f"{report['imported']:,} lots imported, {report['rejected']:,} rows skipped.")
+    if report["unknown_tickers"]:
+        st.warning(f"Unknown tickers skipped: {', '.join(report['unknown_tickers'])}")
+
 with col2:
-    if st.button("➖ Delete Last") and st.session_state.portfolio:
-        st.session_state.portfolio.pop()
+    if st.button("➖ Delete Last") and not lots_df.empty:
+        lot_store.delete_last()
         st.success("Last stock has been removed!")
         st.rerun()
 
 with col3:
     if st.button("📥 Export Portfolio"):
-        df = pd.DataFrame(st.session_state.portfolio)
-        csv = df.to_csv(index=False).encode('utf-8')
+        csv, parquet = memo.get("export", (lots_version,), lambda: (
+            lots_df.drop(columns="id").to_csv(index=False).encode('utf-8'), export_parquet(lots_df)
+        ))
         st.download_button(label="📄 Download CSV", data=csv, file_name="portfolio.csv", mime="text/csv")
+        st.download_button(label="🗃️ Download Parquet", data=parquet,
+                           file_name="portfolio.parquet", mime="application/vnd.apache.parquet")
 
 with col4:
-    if st.button("❌ Remove All") and st.session_state.portfolio:
-        st.session_state.portfolio.clear()
+    if st.button("❌ Remove All") and not lots_df.empty:
+        lot_store.clear()
         st.success("All stocks have been removed!")
         st.rerun()
 
@@ -265,89 +375,162 @@ st.divider()
 st.subheader("Idividual Stock Performance")
 
 # **Portfolio Performance Chart**
-if st.session_state.portfolio:
-    stock_data = {}
-    for stock in st.session_state.portfolio:
-        hist, current_price = fetch_stock_data(stock["ticker"])
-        if hist is not None:
-            stock_data[stock["ticker"]] = hist
-
-    if stock_data:
-        df = pd.concat([df.assign(Stock=ticker) for ticker, df in stock_data.items()])
-        df.reset_index(inplace=True)
-        fig = px.line(df, x="Date", y="Close", color="Stock")
-        st.plotly_chart(fig)
-else:
-    st.info("No stocks in portfolio. Add stocks to get started.")
+with metrics.section("performance chart"):
+    if not lots_df.empty:
+        # reuse the histories fetched for the value chart, keeping only the closes
+        if stock_data:
+            closes = memo.get("closes", series_key, lambda: build_close_matrix(stock_data))
+            rollups = memo.get("close_rollups", series_key, lambda: build_rollups(closes))
+            fig = memo.get(f"close_chart:{selected_timeframe}", series_key, lambda: px.line(
+                chart_frame(rollups, TIMEFRAMES[selected_timeframe], "Close"),
+                x="Date", y="Close", color="Stock", title=f"Closing Prices ({selected_timeframe})"
+            ))
+            st.plotly_chart(fig)
+    else:
+        st.info("No stocks in portfolio. Add stocks to get started.")
+
+st.divider()
+
+# **Risk Analytics**
+st.subheader("Risk Analytics")
+
+with metrics.section("risk analytics"):
+    if not lots_df.empty and stock_data:
+        benchmark_hist, _ = fetch_stock_data(BENCHMARK)
+        risk_key = (series_key, benchmark_hist)
+
+        def risk_inputs() -> tuple:
+            """Returns the daily returns, benchmark returns and summary over the selected timeframe."""
+            # the aligned close matrix of the performance chart, over the selected timeframe
+            days = TIMEFRAMES[selected_timeframe]
+            if days:
+                # zero-copy views of the stored closes, so only the window is aligned
+                start = closes.index.max() - pd.Timedelta(days=days)
+                window_closes = build_close_matrix({ticker: hist.slice(start) for ticker, hist in stock_data.items()})
+            else:
+                window_closes = closes
+            returns = daily_returns(window_closes)
+            returns.insert(0, "Portfolio", portfolio_returns(lots_df, window_closes))
+
+            benchmark = None
+            if benchmark_hist is not None and not benchmark_hist.empty:
+                benchmark = daily_returns(build_close_matrix({BENCHMARK: benchmark_hist}))[BENCHMARK]
+            return returns, benchmark, risk_summary(returns, benchmark)
+
+        returns, benchmark, summary = memo.get(f"risk:{selected_timeframe}", risk_key, risk_inputs)
+        portfolio = summary.loc["Portfolio"]
+
+        col1, col2, col3, col4, col5, col6 = st.columns(6)
+        col1.metric("Volatility", f"{portfolio['Volatility']:.1%}")
+        col2.metric("Sharpe", f"{portfolio['Sharpe']:.2f}")
+        col3.metric("Sortino", f"{portfolio['Sortino']:.2f}")
+        col4.metric("Max Drawdown", f"{portfolio['Max Drawdown']:.1%}")
+        col5.metric(f"Beta ({BENCHMARK})", f"{portfolio['Beta']:.2f}")
+        col6.metric("1-Day VaR (95%)", f"{portfolio['VaR (Historical)']:.2%}")
+
+        # annualised statistics of every holding, next to the portfolio
+        st.dataframe(
+            summary.rename_axis("Stock").reset_index(),
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                **{col: st.column_config.NumberColumn(format="%.2f") for col in ["Sharpe", "Sortino", "Beta"]},
+                **{col: st.column_config.NumberColumn(format="percent") for col in
+                   ["Return", "Volatility", "Max Drawdown", "VaR (Historical)", "VaR (Parametric)"]},
+            }
+        )
+
+        # rolling statistics of the portfolio, from running sums over the whole timeframe
+        windows = {"1 Month": 21, "3 Months": 63, "1 Year": 252}
+        col1, col2 = st.columns(2)
+        window = windows[col1.selectbox("Rolling Window", list(windows), index=1)]
+        statistic = col2.selectbox("Rolling Statistic", ["Volatility", "Sharpe", "Beta"] if benchmark is not None else ["Volatility", "Sharpe"])
+
+        def rolling_chart():
+            rolling = rolling_stats(returns[["Portfolio"]], window, benchmark)[statistic].dropna()
+            if rolling.empty:
+                return None
+            df = chart_frame(build_rollups(rolling), None, statistic, var_name="Series")
+            return px.line(df, x="Date", y=statistic, title=f"Rolling {statistic} ({selected_timeframe})")
+
+        fig = memo.get(f"rolling_chart:{selected_timeframe}", (risk_key, window, statistic), rolling_chart)
+        if fig is not None:
+            st.plotly_chart(fig)
+
+        if returns.shape[1] > 2:
+            with st.expander("Correlation Matrix"):
+                st.plotly_chart(memo.get(f"correlation:{selected_timeframe}", risk_key, lambda: px.imshow(
+                    correlation_matrix(returns.drop(columns="Portfolio")), zmin=-1, zmax=1,
+                    color_continuous_scale="RdBu", aspect="auto"
+                )))
+    else:
+        st.info("No stocks in portfolio. Add stocks to get started.")
 
 st.divider()
 
 # **Portfolio Table**
 st.subheader("Current Holdings")
 
-if st.session_state.portfolio:
-    portfolio_df = pd.DataFrame(st.session_state.portfolio)
-    portfolio_df["Total Cost"] = (portfolio_df["buy_price"] * portfolio_df["quantity"]).round(2)
-
-    # aggregate data by ticker symbol
-    portfolio_df = (
-        portfolio_df.groupby(["name", "ticker"], as_index=False)
-        .agg({
-            "quantity": "sum", 
-            "Total Cost": "sum",  
-            "current_price": "last", 
-            "buy_date": "first",  
-            "buy_price": "first"  
-        })
-    )
-
-    # weighted average buy price
-    portfolio_df["avg_buy_price"] = (portfolio_df["Total Cost"] / portfolio_df["quantity"]).round(2)
-
-    # reorder columns
-    portfolio_df = portfolio_df[["name", "ticker", "avg_buy_price", "current_price", "quantity", "Total Cost"]].rename(
-        columns={
-            "name": "Stock",
-            "ticker": "Ticker",
-            "avg_buy_price": "Avg Buy Price (USD)",
-            "current_price": "Current Price (USD)",
-            "quantity": "Quantity",
-            "Total Cost": "Total Cost (USD)"
-        }
-    )
+with metrics.section("holdings table"):
+    if not lots_df.empty:
+        # per-stock aggregates are maintained by the lot store on every add and delete
+        portfolio_df = memo.get("holdings", (lots_version,), lambda: format_holdings_table(lot_store.holdings_frame()))
 
-    # display df without index and full width
-    st.data_editor(portfolio_df, 
-        hide_index=True, 
-        use_container_width=True, 
-        column_config={col: st.column_config.Column(width="small") for col in portfolio_df.columns})
-else:
-    st.info("No stocks in portfolio. Add stocks to get started.")
+        # display df without index and full width
+        st.data_editor(portfolio_df, 
+            hide_index=True, 
+            use_container_width=True, 
+            column_config={col: st.column_config.Column(width="small") for col in portfolio_df.columns})
+    else:
+        st.info("No stocks in portfolio. Add stocks to get started.")
 
 st.divider()
 
 # **Purchases Table**
 st.subheader("Purchase History")
 
-if st.session_state.portfolio:
-    purchases_df = pd.DataFrame(st.session_state.portfolio)
-    purchases_df["Profit %"] = (((purchases_df["current_price"] - purchases_df["buy_price"]) / purchases_df["buy_price"]) * 100).round(2)
-    
-    purchases_df = purchases_df[["name", "ticker", "buy_price", "buy_date", "quantity", "Profit %"]].rename(
-        columns={
-            "name": "Stock",
-            "ticker": "Ticker",
-            "buy_price": "Buy Price (USD)",
-            "buy_date": "Buy Date",
-            "quantity": "Quantity",
-            "Profit %": "Profit (%)"
-        }
-    )
-
-    # display df without index and full width
-    st.data_editor(purchases_df, 
-        hide_index=True, 
-        use_container_width=True, 
-        column_config={col: st.column_config.Column(width="small") for col in portfolio_df.columns})
-else:
-    st.info("No purchases recorded.")
\ No newline at end of file
+with metrics.section("purchase table"):
+    if not lots_df.empty:
+        purchases_df = memo.get("purchases", (lots_version,), lambda: build_purchases_table(lots_df))
+
+        # display df without index and full width, rows are selected in the table itself
+        # so only the selected row positions are sent back, not one option per purchase
+        purchases_event = st.dataframe(purchases_df, 
+            hide_index=True, 
+            use_container_width=True, 
+            column_config={col: st.column_config.Column(width="small") for col in purchases_df.columns},
+            on_select="rerun",
+            selection_mode="multi-row",
+            key="purchases_table")
+
+        # delete the selected lots, table rows follow the order of lots_df
+        selected_rows = [row for row in purchases_event.selection.rows if row < len(lots_df)]
+        selected_lots = lots_df["id"].iloc[selected_rows].tolist()
+        col1, col2 = st.columns([3, 1])
+        col1.caption(f"{len(selected_lots)} purchase(s) selected" if selected_lots else "Select rows in the table to delete purchases.")
+        if col2.button("🗑️ Delete Selected") and selected_lots:
+            lot_store.delete_lots([int(lot_id) for lot_id in selected_lots])
+            # the remaining rows shift up, so the old selection would point at other purchases
+            del st.session_state["purchases_table"]
+            st.success(f"{len(selected_lots)} purchase(s) removed!")
+            st.rerun()
+    else:
+        st.info("No purchases recorded.")
+
+# **Debug Panel**
+if st.sidebar.toggle("🐞 Debug Panel", help="Show timings, network calls and cache hit rates"):
+    with st.sidebar.expander("Instrumentation", expanded=True):
+        snapshot = metrics.to_dict()
+        st.caption("Section timings (s)")
+        st.dataframe(pd.DataFrame(snapshot["sections"]), hide_index=True)
+        st.caption("Provider calls")
+        st.dataframe(pd.DataFrame(snapshot["calls"]), hide_index=True)
+        st.caption("Caches")
+        st.dataframe(pd.DataFrame(snapshot["caches"]), hide_index=True)
+
+        col1, col2 = st.columns(2)
+        col1.download_button("JSON", metrics.to_json(), file_name="metrics.json", mime="application/json")
+        col2.download_button("Prometheus", metrics.to_prometheus(), file_name="metrics.prom", mime="text/plain")
+        if st.button("Reset Metrics"):
+            metrics.reset()
+            st.rerun()
@@ -0,0 +1,88 @@
+"""Recorded market-data fixtures and the replay layer used by the benchmarks.
+
+Fixtures live in benchmarks/fixtures/:
+
+    history/<TICKER>.parquet   daily bars as returned by yf.Ticker(...).history
+    intraday/<TICKER>.parquet  one session of 1-minute bars
+    news/<TICKER>.json         a raw NewsAPI /v2/everything response
+
+Record real ones with benchmarks/record_fixtures.py, or generate deterministic synthetic
+ones offline with generate_fixtures(). Any ticker without its own fixture (e.g. the
+synthetic T0001..T0500 universe used for scaling) replays one of the recorded tickers.
+The replay itself is utils.market_data.ReplayProvider, the same source the app runs on
+with MARKET_DATA_PROVIDER=replay.
+"""
+import os
+import json
+from contextlib import contextmanager
+from unittest import mock
+from utils.market_data import ReplayProvider, synthetic_bars
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+BASE_TICKERS = ["AAPL", "MSFT", "TSLA", "GOOGL", "NVDA"]
+
+def generate_fixtures(fixture_dir: str = FIXTURE_DIR, tickers: list = BASE_TICKERS, years: int = 15) -> None:
+    """Writes deterministic random-walk fixtures in the recorded format."""
+    for sub in ("history", "intraday", "news"):
+        os.makedirs(os.path.join(fixture_dir, sub), exist_ok=True)
+
+    for ticker in tickers:
+        daily, intraday = synthetic_bars(ticker, years)
+        daily.to_parquet(os.path.join(fixture_dir, "history", f"{ticker}.parquet"))
+        intraday.to_parquet(os.path.join(fixture_dir, "intraday", f"{ticker}.parquet"))
+
+        words = ["surges", "slumps", "beats estimates", "misses targets", "announces buyback", "faces probe"]
+        articles = [{
+            "title": f"{ticker} {words[i % len(words)]} as markets move ({i})",
+            "description": f"Shares of {ticker} {words[(i * 7) % len(words)]} in a volatile session.",
+            "url": f"https://example.com/{ticker.lower()}/{i}",
+        } for i in range(100)]
+        with open(os.path.join(fixture_dir, "news", f"{ticker}.json"), "w", encoding="utf-8") as f:
+            json.dump({"status": "ok", "totalResults": len(articles), "articles": articles}, f)
+
+def ensure_fixtures(fixture_dir: str = FIXTURE_DIR) -> None:
+    """Generates synthetic fixtures if none have been recorded yet."""
+    if not os.path.isdir(os.path.join(fixture_dir, "history")) or not os.listdir(os.path.join(fixture_dir, "history")):
+        generate_fixtures(fixture_dir)
+
+class FixtureResponse:
+    """Replays a NewsAPI response in place of ``requests.Response``."""
+
+    def __init__(self, payload: dict, status_code: int = 200) -> None:
+        self._payload = payload
+        self.status_code = status_code
+        self.content = json.dumps(payload).encode("utf-8")
+
+    def json(self) -> dict:
+        return self._payload
+
+def fixture_news(url: str, params: dict = None, provider: ReplayProvider = None, **kwargs) -> FixtureResponse:
+    """Replays ``requests.get``/``Session.get`` against NewsAPI from the fixtures."""
+    provider = provider or ReplayProvider(FIXTURE_DIR)
+    provider.calls["news"] = provider.calls.get("news", 0) + 1
+    params = params or {}
+    symbol = params.get("q", "")
+    with open(os.path.join(provider.data_dir, "news", f"{provider.source(symbol)}.json"), "r", encoding="utf-8") as f:
+        payload = json.load(f)
+
+    page_size, page = int(params.get("pageSize", 100)), int(params.get("page", 1))
+    articles = payload["articles"][(page - 1) * page_size:page * page_size]
+    return FixtureResponse({**payload, "articles": articles})
+
+@contextmanager
+def replay(fixture_dir: str = FIXTURE_DIR):
+    """Routes market-data and NewsAPI calls to the fixtures for the duration of the block.
+
+    Yields:
+        dict: Counters of replayed calls by kind ("history", "download", "news", ...).
+    """
+    from utils import market_data, sentiment_analysis
+    from utils.fetch_scheduler import scheduler, TokenBucket
+
+    ensure_fixtures(fixture_dir)
+    provider = ReplayProvider(fixture_dir)
+    # nothing goes upstream, so the scheduler's rate limit doesn't apply
+    with mock.patch.object(scheduler, "bucket", TokenBucket(float("inf"), 1_000_000)), \
+         mock.patch.object(market_data, "_provider", provider), \
+         mock.patch.object(sentiment_analysis._session, "get", lambda *a, **k: fixture_news(*a, provider=provider, **k)):
+        yield provider.calls
@@ -0,0 +1,81 @@
+"""Cold-start import benchmark for every Streamlit page.
+
+Runs the module-level imports of each page in a fresh interpreter and reports how long
+they take, so changes to the import graph show up as a number rather than a feeling.
+
+    python benchmarks/import_time.py --repeat 5 --output import_times.json
+"""
+import os
+import ast
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES = ["Portfolio.py", "pages/Notify Me.py", "pages/Sentiment Analysis.py"]
+
+# extra cold-start steps worth tracking on their own
+EXTRA = {
+    "sentiment analyzer": "from utils.sentiment_analysis import get_analyzer\nget_analyzer()",
+}
+
+def page_imports(path: str) -> str:
+    """Returns the source of a page's module-level imports and lazy_import assignments."""
+    with open(path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+
+    statements = []
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            statements.append(node)
+        elif isinstance(node, ast.Assign) and isinstance(node.value, ast.Call) \
+                and getattr(node.value.func, "id", None) == "lazy_import":
+            statements.append(node)
+    return "\n".join(ast.unparse(node) for node in statements)
+
+def time_cold(code: str) -> float:
+    """Runs code in a fresh interpreter and returns its wall time in seconds."""
+    script = (
+        "import time\n"
+        "_start = time.perf_counter()\n"
+        f"{code}\n"
+        "print(time.perf_counter() - _start)\n"
+    )
+    result = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        lines = [line for line in result.stderr.splitlines() if line.strip(" *")]
+        raise RuntimeError(lines[-1] if lines else f"exit code {result.returncode}")
+    return float(result.stdout.strip().splitlines()[-1])
+
+def run(repeat: int) -> dict:
+    """Times every page and extra step repeat times.
+
+    Returns:
+        dict: Maps each name to its "median", "min" and "max" seconds, or to an "error".
+    """
+    targets = {page: page_imports(os.path.join(ROOT, page)) for page in PAGES}
+    targets.update(EXTRA)
+
+    results = {}
+    for name, code in targets.items():
+        try:
+            timings = [time_cold(code) for _ in range(repeat)]
+            results[name] = {"median": statistics.median(timings), "min": min(timings), "max": max(timings)}
+        except RuntimeError as e:
+            results[name] = {"error": str(e)}
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure cold-start import cost per page.")
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per page")
+    parser.add_argument("--output", help="write the JSON results to this file instead of stdout")
+    args = parser.parse_args()
+
+    report = json.dumps({"python": sys.version.split()[0], "results": run(args.repeat)}, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report)
+    else:
+        print(report)
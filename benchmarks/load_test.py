@@ -0,0 +1,164 @@
+"""Offline load test: many concurrent Streamlit sessions against a local market-data provider.
+
+Every session is a streamlit.testing AppTest running in its own thread of one process,
+the same way a Streamlit server runs its sessions. A session loads a page and then keeps
+interacting with it (switching the first selectbox, or rerunning), and every run is
+timed. Market data comes from the replay or synthetic provider, so nothing goes to
+Yahoo or NewsAPI:
+
+    python benchmarks/load_test.py --sessions 20 --runs 5 --provider synthetic
+    python benchmarks/load_test.py --sessions 50 --pages Portfolio.py --output load.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import platform
+import threading
+from datetime import datetime
+from contextlib import contextmanager
+from unittest import mock
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+PAGES = ["Portfolio.py", "pages/Sentiment Analysis.py", "pages/Notify Me.py"]
+PERCENTILES = [50, 95, 99]
+# every session opens the same portfolio, like users of one shared account
+PORTFOLIO_ID = "load-test"
+
+@contextmanager
+def shared_runtime():
+    """Serves every AppTest from one mock Streamlit runtime, like the single runtime of a server.
+
+    AppTest installs a fresh mock runtime for each run and removes it afterwards, which
+    pulls it from under any run still going in another thread. It also gives each run its
+    own st.cache_data storage, which a server shares between sessions.
+    """
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+
+    runtime = mock.MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    with mock.patch.object(Runtime, "instance", classmethod(lambda cls: runtime)), \
+         mock.patch.object(Runtime, "exists", classmethod(lambda cls: True)):
+        yield
+
+def page_run(at, run: int) -> None:
+    """Runs the next interaction of a session: the first load, then selectbox switches."""
+    if run == 0 or not at.selectbox:
+        at.run()
+        return
+    box = at.selectbox[0]
+    options = list(box.options)
+    box.set_value(options[run % len(options)]).run()
+
+def session(page: str, runs: int, start: threading.Barrier, latencies: list, errors: list) -> None:
+    """Simulates one user of a page and appends the wall time of each run."""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(os.path.join(ROOT, page), default_timeout=600)
+    at.session_state["portfolio_id"] = PORTFOLIO_ID
+    start.wait()
+    for run in range(runs):
+        began = time.perf_counter()
+        try:
+            page_run(at, run)
+        except Exception as e:
+            errors.append(f"{page}: {type(e).__name__}: {e}")
+            return
+        latencies.append((page, run == 0, time.perf_counter() - began))
+        errors.extend(f"{page}: {exception.value}" for exception in at.exception)
+
+def summarise(latencies: list) -> dict:
+    """Returns the count and p50/p95/p99 latency in seconds of a list of timings."""
+    values = np.array(latencies)
+    if not len(values):
+        return {"runs": 0}
+    return {"runs": len(values), **{f"p{p}": float(np.percentile(values, p)) for p in PERCENTILES},
+            "max": float(values.max())}
+
+def run(sessions: int, runs: int, pages: list, provider: str, tickers: int, lots: int) -> dict:
+    """Runs concurrent sessions spread round-robin over the pages and reports latencies."""
+    # every session shares one throwaway price cache, lot store and sentiment cache, like one server
+    data_dir = tempfile.mkdtemp(prefix="load_test_")
+    os.environ["PRICE_CACHE_DIR"] = os.path.join(data_dir, "prices")
+    os.environ["PORTFOLIO_DB_PATH"] = os.path.join(data_dir, "portfolio.db")
+    os.environ["SENTIMENT_CACHE_PATH"] = os.path.join(data_dir, "sentiment.db")
+    os.environ["ALERT_BOOK_PATH"] = os.path.join(data_dir, "alert_book.json")
+    os.chdir(ROOT)
+
+    from benchmarks.fixtures import replay, ensure_fixtures
+    from benchmarks.run_benchmarks import universe, make_lots
+    from utils import market_data
+    from utils.lot_store import get_lot_store
+
+    ensure_fixtures()
+    get_lot_store(PORTFOLIO_ID).add_lots(make_lots(lots, universe(tickers)))
+
+    start = threading.Barrier(sessions)
+    latencies, errors = [], []
+    threads = [
+        threading.Thread(target=session, args=(pages[i % len(pages)], runs, start, latencies, errors), daemon=True)
+        for i in range(sessions)
+    ]
+
+    # replay() also stubs NewsAPI and lifts the scheduler's rate limit
+    with replay() as calls, shared_runtime():
+        if provider != "replay":
+            market_data.set_provider(market_data.PROVIDERS[provider]())
+        began = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - began
+
+    report = {"all": summarise([t for _, _, t in latencies]),
+              "first_load": summarise([t for _, first, t in latencies if first]),
+              "rerun": summarise([t for _, first, t in latencies if not first])}
+    for page in pages:
+        report[page] = summarise([t for p, _, t in latencies if p == page])
+
+    return {
+        "sessions": sessions, "runs_per_session": runs, "provider": provider, "tickers": tickers, "lots": lots,
+        "elapsed": elapsed, "throughput": len(latencies) / elapsed if elapsed else 0.0,
+        "latency": report, "replayed_calls": dict(calls), "errors": errors[:20],
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the app with concurrent sessions against local market data.")
+    parser.add_argument("--sessions", type=int, default=10, help="concurrent sessions")
+    parser.add_argument("--runs", type=int, default=3, help="timed runs per session (first load plus reruns)")
+    parser.add_argument("--pages", nargs="+", default=PAGES, help="pages the sessions are spread over")
+    parser.add_argument("--provider", choices=["replay", "synthetic"], default="replay", help="market-data provider")
+    parser.add_argument("--tickers", type=int, default=20, help="distinct tickers in the shared portfolio")
+    parser.add_argument("--lots", type=int, default=100, help="lots in the shared portfolio")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    result = run(args.sessions, args.runs, args.pages, args.provider, args.tickers, args.lots)
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        **result,
+    }
+
+    print(f"{args.sessions} sessions x {args.runs} runs in {result['elapsed']:.1f}s "
+          f"({result['throughput']:.2f} runs/s, provider {args.provider})")
+    for name, stats in result["latency"].items():
+        if stats["runs"]:
+            print(f"{name:<30} runs {stats['runs']:>5}  " + "  ".join(f"p{p} {stats[f'p{p}']:.3f}s" for p in PERCENTILES))
+    if result["errors"]:
+        print(f"{len(result['errors'])} errors, e.g. {result['errors'][0]}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
@@ -0,0 +1,49 @@
+"""Records live yfinance and NewsAPI responses as benchmark fixtures.
+
+    python benchmarks/record_fixtures.py AAPL MSFT TSLA GOOGL NVDA
+
+Needs network access and NEWS_API_KEY. Use --synthetic to write deterministic
+random-walk fixtures in the same format without any network access.
+"""
+import os
+import sys
+import json
+import argparse
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import FIXTURE_DIR, BASE_TICKERS, generate_fixtures  # noqa: E402
+
+def record(tickers: list, fixture_dir: str = FIXTURE_DIR) -> None:
+    """Downloads 15 years of daily bars, today's minute bars and recent news for each ticker."""
+    import requests
+    import yfinance as yf
+    from utils.sentiment_analysis import NEWS_API_KEY, NEWS_API_URL
+
+    for sub in ("history", "intraday", "news"):
+        os.makedirs(os.path.join(fixture_dir, sub), exist_ok=True)
+
+    start_date = (datetime.today() - timedelta(days=15*365)).strftime("%Y-%m-%d")
+    for ticker in tickers:
+        stock = yf.Ticker(ticker)
+        stock.history(start=start_date).to_parquet(os.path.join(fixture_dir, "history", f"{ticker}.parquet"))
+        stock.history(period="1d", interval="1m").to_parquet(os.path.join(fixture_dir, "intraday", f"{ticker}.parquet"))
+
+        params = {"q": ticker, "language": "en", "pageSize": 100, "apiKey": NEWS_API_KEY}
+        response = requests.get(NEWS_API_URL, params=params, timeout=10)
+        response.raise_for_status()
+        with open(os.path.join(fixture_dir, "news", f"{ticker}.json"), "w", encoding="utf-8") as f:
+            json.dump(response.json(), f)
+        print(f"Recorded {ticker}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record market data and news fixtures for the benchmarks.")
+    parser.add_argument("tickers", nargs="*", default=BASE_TICKERS, help="tickers to record")
+    parser.add_argument("--synthetic", action="store_true", help="generate random-walk fixtures offline")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        generate_fixtures(tickers=args.tickers)
+    else:
+        record(args.tickers)
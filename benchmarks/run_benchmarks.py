@@ -0,0 +1,186 @@
+"""Offline benchmark suite for the app's hot paths.
+
+Every case replays recorded market data and news (see benchmarks/fixtures.py), so it
+runs without network access. Results are written as JSON and can be compared against
+an earlier run to spot regressions:
+
+    python benchmarks/run_benchmarks.py --output bench.json
+    python benchmarks/run_benchmarks.py --compare bench.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import tempfile
+from datetime import datetime, timedelta
+from unittest import mock
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import replay  # noqa: E402
+from utils import sentiment_analysis  # noqa: E402
+from utils.price_cache import PriceCache  # noqa: E402
+from utils.quotes import get_quotes  # noqa: E402
+from utils.market_data import get_provider  # noqa: E402
+from utils.valuation import build_close_matrix, portfolio_value_series  # noqa: E402
+from utils.charting import TIMEFRAMES, build_rollups, chart_frame  # noqa: E402
+from utils.risk import daily_returns, portfolio_returns, risk_summary, rolling_stats, correlation_matrix  # noqa: E402
+from utils.holdings import format_holdings_table, build_purchases_table  # noqa: E402
+from utils.lot_store import LotStore  # noqa: E402
+from utils.email_alerts import build_alert_message, build_digest_message  # noqa: E402
+
+TICKER_SCALES = [5, 50, 500]
+LOT_SCALES = [10, 1_000, 100_000]
+
+def universe(n: int) -> list:
+    """Returns n synthetic ticker symbols, replayed from the recorded fixtures."""
+    return [f"T{i:04d}" for i in range(n)]
+
+def make_lots(n: int, tickers: list, seed: int = 0) -> list:
+    """Returns n random purchase lots spread over the given tickers and the last 15 years."""
+    rng = np.random.default_rng(seed)
+    today = datetime.today()
+    offsets = rng.integers(0, 15 * 365, n)
+    picks = rng.integers(0, len(tickers), n)
+    prices = rng.uniform(5, 500, n).round(2)
+    return [{
+        "name": tickers[t], "ticker": tickers[t], "buy_price": float(p),
+        "current_price": float(p * rng.uniform(0.5, 2.0)),
+        "buy_date": (today - timedelta(days=int(o))).strftime("%Y-%m-%d"),
+        "quantity": int(rng.integers(1, 100)),
+    } for t, o, p in zip(picks, offsets, prices)]
+
+def measure(fn, repeat: int, setup=None) -> dict:
+    """Times fn repeat times (calling setup before each run, untimed)."""
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return {"median": statistics.median(timings), "min": min(timings), "max": max(timings), "repeat": repeat}
+
+def run(ticker_scales: list, lot_scales: list, repeat: int) -> list:
+    """Runs every benchmark case and returns one result dictionary per case."""
+    results = []
+    start_date = (datetime.today() - timedelta(days=15*365)).strftime("%Y-%m-%d")
+
+    def record(name: str, params: dict, fn, calls: dict, setup=None) -> None:
+        before = dict(calls)
+        try:
+            timing = measure(fn, repeat, setup)
+        except Exception as e:
+            timing = {"error": f"{type(e).__name__}: {e}"}
+        replayed = {k: v - before.get(k, 0) for k, v in calls.items() if v - before.get(k, 0)}
+        results.append({"name": name, "params": params, **timing, "replayed_calls": replayed})
+        print(f"{name:<28} {json.dumps(params):<36} {timing.get('median', float('nan')):.4f}s", file=sys.stderr)
+
+    with replay() as calls, tempfile.TemporaryDirectory() as tmp:
+        for n in ticker_scales:
+            tickers = universe(n)
+
+            # fetch_stock_data: 15 years of history plus the last price, cold and warm cache
+            cache = PriceCache(os.path.join(tmp, f"prices_{n}"))
+            provider = get_provider()
+            fetch_all = lambda: [(cache.get_history(t, start_date), provider.last_price(t)) for t in tickers]
+            record("fetch_stock_data.cold", {"tickers": n}, fetch_all, calls, setup=cache.invalidate)
+            record("fetch_stock_data.warm", {"tickers": n}, fetch_all, calls)
+
+            # get_stock_data: batched watchlist quotes, before and after the open
+            for market_open in (False, True):
+                record("get_stock_data", {"tickers": n, "market_open": market_open},
+                       lambda: get_quotes(tickers, market_open), calls)
+
+            # fetch_news scoring: cold and warm article score cache
+            db_path = os.path.join(tmp, f"sentiment_{n}.db")
+            reset_db = lambda: os.path.exists(db_path) and os.remove(db_path)
+            with mock.patch.object(sentiment_analysis, "SENTIMENT_CACHE_PATH", db_path):
+                record("fetch_news.cold", {"tickers": n},
+                       lambda: sentiment_analysis.fetch_news_batch(tickers), calls, setup=reset_db)
+                record("fetch_news.warm", {"tickers": n},
+                       lambda: sentiment_analysis.fetch_news_batch(tickers), calls)
+
+            histories = {t: h for t, (h, _) in zip(tickers, fetch_all())}
+
+            # performance chart data: rollups once, then one downsampled frame per timeframe
+            closes = build_close_matrix(histories)
+            record("chart_rollups", {"tickers": n}, lambda: build_rollups(closes), calls)
+            rollups = build_rollups(closes)
+            record("chart_frame", {"tickers": n},
+                   lambda: [chart_frame(rollups, days, "Close") for days in TIMEFRAMES.values()], calls)
+            for n_lots in lot_scales:
+                lots = make_lots(n_lots, tickers)
+                params = {"tickers": n, "lots": n_lots}
+                record("portfolio_value_series", params, lambda: portfolio_value_series(lots, histories), calls)
+
+                # the page's path: the store's maintained aggregates, formatted for display
+                store = LotStore(os.path.join(tmp, f"lots_{n}_{n_lots}.db"))
+                store.add_lots(lots)
+                record("holdings_table.store", params, lambda: format_holdings_table(store.holdings_frame()), calls)
+                record("purchases_table", params, lambda: build_purchases_table(lots), calls)
+
+                # risk analytics over the full matrix, the first ticker standing in for the benchmark
+                def risk() -> None:
+                    returns = daily_returns(closes)
+                    returns.insert(0, "Portfolio", portfolio_returns(lots, closes))
+                    benchmark = returns[tickers[0]]
+                    risk_summary(returns, benchmark)
+                    rolling_stats(returns, 63, benchmark)
+                    correlation_matrix(returns)
+                record("risk_analytics", params, risk, calls)
+
+            # send_email_alert rendering: one message per trigger, and one digest for all
+            triggers = [(t, 101.5, 100.0) for t in tickers]
+            record("email_render.single", {"tickers": n},
+                   lambda: [build_alert_message("user@example.com", *trigger).as_string() for trigger in triggers], calls)
+            record("email_render.digest", {"tickers": n},
+                   lambda: build_digest_message("user@example.com", triggers).as_string(), calls)
+
+    return results
+
+def compare(results: list, baseline_path: str, threshold: float) -> list:
+    """Returns a line for every case that got slower than threshold x its baseline median."""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {(r["name"], json.dumps(r["params"], sort_keys=True)): r for r in json.load(f)["results"]}
+
+    regressions = []
+    for result in results:
+        before = baseline.get((result["name"], json.dumps(result["params"], sort_keys=True)))
+        if before and "median" in before and "median" in result and result["median"] > before["median"] * threshold:
+            regressions.append(
+                f"{result['name']} {result['params']}: {before['median']:.4f}s -> {result['median']:.4f}s"
+            )
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the app's hot paths against recorded fixtures.")
+    parser.add_argument("--tickers", type=int, nargs="+", default=TICKER_SCALES, help="ticker counts to run")
+    parser.add_argument("--lots", type=int, nargs="+", default=LOT_SCALES, help="lot counts to run")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case")
+    parser.add_argument("--output", help="write the JSON results to this file instead of stdout")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=1.2, help="slowdown factor reported as a regression")
+    args = parser.parse_args()
+
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": run(args.tickers, args.lots, args.repeat),
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    elif not args.compare:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        regressions = compare(report["results"], args.compare, args.threshold)
+        print("\n".join(regressions) if regressions else "No regressions.")
+        sys.exit(1 if regressions else 0)
@@ -1,13 +1,10 @@
 import streamlit as st
-import yfinance as yf
 import pandas as pd
-from utils.email_alerts import send_email_alert
+from utils.alert_book import load_book, add_alert, remove_alerts
+from utils.alert_worker import run_tick, session_prices
+from utils.alert_backtest import RESOLUTIONS, load_bars, backtest_alerts, threshold_rules
 
 # initialise session state
-if "alerts" not in st.session_state:
-    st.session_state.alerts = {}  # active alerts
-if "sent_alerts" not in st.session_state:
-    st.session_state.sent_alerts = []  # list of sent alerts
 if "email" not in st.session_state:
     st.session_state.email = ""
 
@@ -18,6 +15,7 @@ st.write("Set target prices and get notified when your stocks reach them.")
 # sidebar: email input
 st.sidebar.header("Notification Settings")
 st.session_state.email = st.sidebar.text_input("Enter your email for alerts", st.session_state.email)
+st.sidebar.caption("Alerts are checked in the background by `python -m utils.alert_worker`, even when this page is closed.")
 
 st.header("Price Alerts")
 
@@ -33,74 +31,117 @@ def add_alert_dialog() -> None:
     alert_type = st.radio("Alert Type", ["Above", "Below"], horizontal=True)
 
     if st.button("Add Alert"):
-        if new_stock and target_price:
-            st.session_state.alerts[new_stock] = {"price": target_price, "type": alert_type}
+        if not st.session_state.email.strip():
+            st.error("⚠️ Enter your email in the sidebar first, your alerts are kept under it.")
+        elif new_stock and target_price:
+            add_alert(new_stock, target_price, alert_type, st.session_state.email)
             st.rerun()
 
 st.button("➕ Add Alert", on_click=add_alert_dialog)
 
+# alerts persisted in the alert book, shared with the background worker
+alert_book = load_book()
+
+# the book holds every user's alerts, this page only shows and edits the ones of this user's address
+email = st.session_state.email.strip().lower()
+
+def is_own(alert: dict) -> bool:
+    """Returns whether an active or sent alert goes to the email entered in the sidebar."""
+    return bool(email) and alert["email"].strip().lower() == email
+
+active = [alert for alert in alert_book["alerts"] if is_own(alert)]
+
 # remove alerts
-if st.session_state.alerts:
+if active:
     col1, col2 = st.columns([3, 1])
     with col1:
-        remove_stock = st.selectbox("Remove Alert", list(st.session_state.alerts.keys()))
+        remove_alert_data = st.multiselect(
+            "Remove Alerts", active,
+            format_func=lambda alert: f"{alert['ticker']} {alert['type']} ${alert['price']:.2f}"
+        )
     with col2:
-        if st.button("Remove"):
-            st.session_state.alerts.pop(remove_stock, None)
+        if st.button("Remove") and remove_alert_data:
+            remove_alerts([alert["id"] for alert in remove_alert_data])
             st.rerun()
 
 st.divider()
 
-# function to fetch stock prices
-def get_stock_price(ticker: str) -> float:
-    stock = yf.Ticker(ticker)
-    price = stock.info.get("regularMarketPrice")
-
-    if price is None:  # if regularMarketPrice is unavailable, fetch last closing price
-        hist = stock.history(period="1d")
-        if not hist.empty:
-            price = hist["Close"].iloc[-1]  # use last available closing price
-    return price
-
 # display active stock alerts
-if st.session_state.alerts:
-    st.subheader("Active Alerts")
+if active:
+    col1, col2 = st.columns([3, 1])
+    col1.subheader("Active Alerts")
 
-    for stock, alert_data in list(st.session_state.alerts.items()):
-        target = alert_data["price"]
-        alert_type = alert_data["type"]
-        price = get_stock_price(stock)
+    # evaluate every alert once and refresh the page a single time
+    if col2.button("🔄 Check Now"):
+        for alert, price in run_tick():
+            if is_own(alert):
+                st.toast(f"Alert triggered for {alert['ticker']} at ${price:.2f}")
+        st.rerun()
 
-        col1, col2 = st.columns([2, 1])
-        col1.metric(stock, f"${price:.2f}" if price else "N/A", f"Target {alert_type}: ${target}")
+    # fetch prices for all alerted stocks in one batch, cached for the other sessions of this app server
+    prices = session_prices(sorted({alert["ticker"] for alert in active}))
 
-        # check alert condition
-        if price is not None:
-            if (alert_type == "Above" and price >= target) or (alert_type == "Below" and price <= target):
-                if st.session_state.email:
-                    send_email_alert(st.session_state.email, f"{stock}", price, target)
-                    st.success(f"Alert sent for {stock} to {st.session_state.email}!")
+    for alert in active:
+        price = prices.get(alert["ticker"])
 
-                st.session_state.sent_alerts.append(
-                    {"stock": stock, "target": target, "alert_type": alert_type, "triggered_at": price}
-                )
-                del st.session_state.alerts[stock]  # remove from active alerts
-                st.rerun()
+        col1, col2 = st.columns([2, 1])
+        col1.metric(alert["ticker"], f"${price:.2f}" if price else "N/A", f"Target {alert['type']}: ${alert['price']}")
 
 else:
-    st.info("No active alerts. Add stocks to track price targets.")
+    st.info("No active alerts. Add stocks to track price targets." if email else "Enter your email in the sidebar to see your alerts.")
 
 st.divider()
 
-# display sent alerts
-if st.session_state.sent_alerts:
+# display the sent alerts of this user's address only
+sent = [alert for alert in alert_book["sent"] if is_own(alert)]
+if sent:
     st.subheader("Sent Alerts")
-    sent_df = pd.DataFrame(st.session_state.sent_alerts).rename(
+    sent_df = pd.DataFrame(sent).rename(
         columns={
             "stock": "Stock",
             "target": "Target Price",
             "alert_type": "Alert Type",
-            "triggered_at": "Triggered at Price"
+            "triggered_at": "Triggered at Price",
+            "email": "Email",
+            "sent_at": "Sent At"
         }
     )
     st.dataframe(sent_df, use_container_width=True, hide_index=True)
+
+st.divider()
+
+# backtest alert rules against past prices
+st.header("Backtest Alerts")
+st.write("See when and how often alert rules would have triggered in past prices.")
+
+col1, col2 = st.columns(2)
+resolution = col1.selectbox("Price History", list(RESOLUTIONS))
+rule_source = col2.radio("Rules", ["Active alerts", "Threshold sweep"], horizontal=True)
+
+if rule_source == "Active alerts":
+    rules = pd.DataFrame(active, columns=["ticker", "price", "type"])
+else:
+    col1, col2, col3, col4, col5 = st.columns([2, 2, 2, 2, 2])
+    sweep_stock = col1.text_input("Stock Symbol", max_chars=10, key="sweep_stock").upper()
+    sweep_type = col2.radio("Alert Type", ["Above", "Below"], horizontal=True, key="sweep_type")
+    sweep_low = col3.number_input("From ($)", min_value=0.01, value=50.0, format="%.2f")
+    sweep_high = col4.number_input("To ($)", min_value=0.01, value=200.0, format="%.2f")
+    sweep_count = col5.number_input("Rules", min_value=2, max_value=10_000, value=100)
+    rules = (
+        threshold_rules(sweep_stock, sweep_type, sweep_low, sweep_high, int(sweep_count))
+        if sweep_stock and sweep_high > sweep_low else pd.DataFrame(columns=["ticker", "price", "type"])
+    )
+
+if rules.empty:
+    st.info("Add alerts, or enter a stock and a price range to sweep.")
+elif st.button("▶️ Run Backtest"):
+    with st.spinner("Loading price history..."):
+        bars = load_bars(sorted(rules["ticker"].unique()), resolution)
+    missing = sorted(set(rules["ticker"]) - set(bars))
+    if missing:
+        st.warning(f"No price history for {', '.join(missing)}.")
+
+    results = backtest_alerts(rules, bars)
+    if rule_source == "Threshold sweep" and not results.empty:
+        st.line_chart(results, x="Target Price", y="Triggers")
+    st.dataframe(results, use_container_width=True, hide_index=True)
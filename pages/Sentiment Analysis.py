@@ -1,5 +1,6 @@
 import streamlit as st
-from utils.sentiment_analysis import fetch_news
+from utils.sentiment_analysis import fetch_news, fetch_portfolio_sentiment, sentiment_label
+from utils.lot_store import get_lot_store
 
 st.set_page_config(page_title="Stock Sentiment", layout="wide", page_icon="📰")
 st.title("Stock Sentiment Analysis")
@@ -52,4 +53,32 @@ if st.button("Analyze Sentiment") and stock_symbol:
 
     else:
         # if nothing found
-        st.warning("No news articles found. Try a different stock symbol.")
\ No newline at end of file
+        st.warning("No news articles found. Try a different stock symbol.")
+
+st.divider()
+
+# **Portfolio-wide Sentiment**
+st.subheader("Portfolio & Watchlist Sentiment")
+
+# tickers from this session's saved portfolio and watchlist
+portfolio_id = st.session_state.get("portfolio_id")
+portfolio_tickers = get_lot_store(portfolio_id).tickers() if portfolio_id else []
+overview_symbols = list(dict.fromkeys(portfolio_tickers + st.session_state.get("watchlist", [])))
+
+article_limit: int = st.number_input("Articles per stock", min_value=1, max_value=500, value=10, step=10)
+
+if st.button("Analyze Portfolio Sentiment") and overview_symbols:
+
+    with st.spinner(f"Fetching news for {len(overview_symbols)} stocks..."):
+        overview_df = fetch_portfolio_sentiment(overview_symbols, limit=article_limit)
+
+    if not overview_df.empty:
+        # average score per stock
+        summary_df = overview_df.groupby("Symbol", as_index=False).agg(Articles=("Score", "size"), Score=("Score", "mean"))
+        summary_df["Sentiment"] = summary_df["Score"].map(sentiment_label)
+        st.dataframe(summary_df.sort_values("Score", ascending=False), hide_index=True)
+        st.dataframe(overview_df, hide_index=True)
+    else:
+        st.warning("No news articles found for your portfolio or watchlist.")
+elif not overview_symbols:
+    st.info("Add stocks to your portfolio or watchlist to analyze them here.")
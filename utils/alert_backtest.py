@@ -0,0 +1,143 @@
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from utils.price_cache import price_cache
+from utils.quotes import _bulk_download, _ticker_frame
+from utils.shared_cache import market_cache
+from utils.market_calendar import cache_ttl
+from utils.fetch_scheduler import priority, BACKFILL
+
+# bar histories a backtest can run over, (yfinance interval, lookback)
+RESOLUTIONS = {
+    "Daily (15 years)": ("1d", 15*365),
+    "1-minute (7 days)": ("1m", 7),
+}
+RESULT_COLUMNS = ["Stock", "Alert Type", "Target Price", "First Trigger", "Triggers", "Time in Condition (%)"]
+
+def load_bars(tickers: list, resolution: str = "Daily (15 years)") -> dict:
+    """Loads the bar history of every ticker for a backtest.
+
+    Daily bars come from the on-disk price cache, minute bars from one bulk download shared
+    through the market-data cache.
+
+    Args:
+        tickers (list): A list of stock ticker symbols (e.g., ["AAPL", "MSFT"]).
+        resolution (str): A key of RESOLUTIONS.
+
+    Returns:
+        dict: Maps each ticker with data to a DataFrame with "High", "Low" and "Close".
+    """
+    interval, days = RESOLUTIONS[resolution]
+    bars = {}
+    with priority(BACKFILL):
+        if interval == "1d":
+            start_date = (datetime.today() - timedelta(days=days)).strftime("%Y-%m-%d")
+            for ticker in tickers:
+                bars[ticker] = price_cache.get_history(ticker, start_date)
+        else:
+            data = market_cache.get(
+                ("bars", tuple(sorted(tickers)), interval),
+                lambda: _bulk_download(sorted(tickers), period=f"{days}d", interval=interval),
+                ttl=cache_ttl()
+            )
+            bars = {ticker: _ticker_frame(data, ticker) for ticker in tickers}
+
+    return {ticker: frame for ticker, frame in bars.items() if frame is not None and not frame.empty}
+
+def crossing_stats(prices: np.ndarray, thresholds: np.ndarray, alert_type: str) -> tuple:
+    """Finds when and how often every threshold triggers over one price series.
+
+    Nothing loops over bars or thresholds. The first trigger of every threshold is a
+    binary search in the running maximum ("Above") or minimum ("Below") of the prices. A
+    step between two bars triggers every threshold between the two prices, so each step
+    adds one to a contiguous range of the sorted thresholds. The ranges are accumulated
+    in a difference array and summed once. The cost is O((bars + thresholds) log thresholds).
+
+    An alert triggers when the price is at or beyond its threshold after a bar where it
+    wasn't (or on the first bar, if the condition already holds there).
+
+    Args:
+        prices (numpy.ndarray): The price of each bar. "Above" rules should get bar highs and
+            "Below" rules bar lows, so intrabar touches count.
+        thresholds (numpy.ndarray): The target prices to test.
+        alert_type (str): "Above" or "Below".
+
+    Returns:
+        tuple: A tuple containing:
+            - first (numpy.ndarray): The bar index of each threshold's first trigger, -1 if never.
+            - counts (numpy.ndarray): How many times each threshold triggers.
+            - share (numpy.ndarray): The fraction of bars on which each condition holds.
+    """
+    prices = np.asarray(prices, dtype=float)
+    prices = prices[~np.isnan(prices)]
+    thresholds = np.asarray(thresholds, dtype=float)
+    n, m = len(prices), len(thresholds)
+    if n == 0:
+        return np.full(m, -1), np.zeros(m, dtype=np.int64), np.zeros(m)
+
+    order = np.argsort(thresholds, kind="stable")
+    ts = thresholds[order]
+    previous, current = prices[:-1], prices[1:]
+
+    if alert_type == "Above":
+        # the condition price >= t first holds where the running maximum reaches t
+        first = np.searchsorted(np.maximum.accumulate(prices), thresholds, side="left")
+        # a rising step from a to b triggers every t in (a, b], the first bar every t <= p0
+        step = current > previous
+        lo = np.append(np.searchsorted(ts, previous[step], side="right"), 0)
+        hi = np.append(np.searchsorted(ts, current[step], side="right"), np.searchsorted(ts, prices[0], side="right"))
+        held = n - np.searchsorted(np.sort(prices), thresholds, side="left")
+    else:
+        # the running minimum is non-increasing, so search it negated
+        first = np.searchsorted(-np.minimum.accumulate(prices), -thresholds, side="left")
+        # a falling step from a to b triggers every t in [b, a), the first bar every t >= p0
+        step = current < previous
+        lo = np.append(np.searchsorted(ts, current[step], side="left"), np.searchsorted(ts, prices[0], side="left"))
+        hi = np.append(np.searchsorted(ts, previous[step], side="left"), m)
+        held = np.searchsorted(np.sort(prices), thresholds, side="right")
+
+    diff = np.bincount(lo, minlength=m + 1) - np.bincount(hi, minlength=m + 1)
+    counts = np.empty(m, dtype=np.int64)
+    counts[order] = np.cumsum(diff)[:m]
+    first = np.where(first < n, first, -1)
+    return first, counts, held / n
+
+def backtest_alerts(rules: pd.DataFrame, bars: dict) -> pd.DataFrame:
+    """Backtests alert rules against historical bars, one vectorised pass per ticker and type.
+
+    Args:
+        rules (pandas.DataFrame): One row per rule with "ticker", "price" and "type" ("Above"/"Below").
+        bars (dict): Maps tickers to bar DataFrames, e.g. from ``load_bars``.
+
+    Returns:
+        pandas.DataFrame: One row per rule, in the rules' order, with RESULT_COLUMNS. The
+        first trigger is the timestamp of the bar, NaT if the rule never triggered. Rules
+        of tickers without bars are left out.
+    """
+    results = []
+    for (ticker, alert_type), group in rules.groupby(["ticker", "type"], sort=False):
+        frame = bars.get(ticker)
+        if frame is None or frame.empty:
+            continue
+        column = "High" if alert_type == "Above" else "Low"
+        frame = frame.dropna(subset=[column if column in frame else "Close"])
+        prices = frame[column if column in frame else "Close"].to_numpy(dtype=float)
+
+        first, counts, share = crossing_stats(prices, group["price"].to_numpy(), alert_type)
+        index = frame.index.tz_localize(None) if getattr(frame.index, "tz", None) is not None else frame.index
+        results.append(pd.DataFrame({
+            "Stock": ticker,
+            "Alert Type": alert_type,
+            "Target Price": group["price"].to_numpy(),
+            "First Trigger": pd.DatetimeIndex(index)[np.maximum(first, 0)].where(first >= 0),
+            "Triggers": counts,
+            "Time in Condition (%)": (share * 100).round(2),
+        }, index=group.index))
+
+    if not results:
+        return pd.DataFrame(columns=RESULT_COLUMNS)
+    return pd.concat(results).sort_index()[RESULT_COLUMNS]
+
+def threshold_rules(ticker: str, alert_type: str, low: float, high: float, count: int) -> pd.DataFrame:
+    """Builds count evenly spaced rules between two target prices, for tuning a threshold."""
+    return pd.DataFrame({"ticker": ticker, "type": alert_type, "price": np.linspace(low, high, count).round(4)})
@@ -0,0 +1,101 @@
+import os
+import json
+from datetime import datetime
+from filelock import FileLock
+
+# alerts are shared between the Notify Me page and the background worker through this file
+ALERT_BOOK_PATH = os.getenv("ALERT_BOOK_PATH", os.path.join(os.path.dirname(os.path.dirname(__file__)), ".alert_book.json"))
+
+def _empty_book() -> dict:
+    return {"next_id": 1, "alerts": [], "sent": []}
+
+def book_lock(path: str = ALERT_BOOK_PATH) -> FileLock:
+    """Returns the inter-process lock guarding the alert book at path."""
+    return FileLock(path + ".lock")
+
+def load_book(path: str = ALERT_BOOK_PATH) -> dict:
+    """Reads the alert book from disk.
+
+    Args:
+        path (str, optional): Location of the alert book. Defaults to ALERT_BOOK_PATH.
+
+    Returns:
+        dict: A book with "next_id", "alerts" (active alerts) and "sent" (triggered alerts).
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return _empty_book()
+
+def save_book(book: dict, path: str = ALERT_BOOK_PATH) -> None:
+    """Atomically writes the alert book to disk."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(book, f)
+    os.replace(tmp_path, path)
+
+def add_alert(ticker: str, price: float, alert_type: str, email: str, path: str = ALERT_BOOK_PATH) -> dict:
+    """Adds an "Above" or "Below" price alert to the book.
+
+    Args:
+        ticker (str): The stock ticker symbol (e.g., "AAPL").
+        price (float): The target price.
+        alert_type (str): "Above" or "Below".
+        email (str): Recipient of the notification, may be empty.
+        path (str, optional): Location of the alert book. Defaults to ALERT_BOOK_PATH.
+
+    Returns:
+        dict: The stored alert, including its id.
+    """
+    with book_lock(path):
+        book = load_book(path)
+        alert = {"id": book["next_id"], "ticker": ticker, "price": price, "type": alert_type, "email": email}
+        book["next_id"] += 1
+        book["alerts"].append(alert)
+        save_book(book, path)
+    return alert
+
+def add_alerts(alerts: list, path: str = ALERT_BOOK_PATH) -> list:
+    """Adds many alerts in one write.
+
+    Args:
+        alerts (list): Dictionaries with "ticker", "price", "type" and "email".
+        path (str, optional): Location of the alert book. Defaults to ALERT_BOOK_PATH.
+
+    Returns:
+        list: The stored alerts, including their ids.
+    """
+    with book_lock(path):
+        book = load_book(path)
+        stored = [
+            {"id": book["next_id"] + n, "ticker": a["ticker"], "price": a["price"], "type": a["type"], "email": a["email"]}
+            for n, a in enumerate(alerts)
+        ]
+        book["next_id"] += len(stored)
+        book["alerts"].extend(stored)
+        save_book(book, path)
+    return stored
+
+def remove_alerts(alert_ids: list, path: str = ALERT_BOOK_PATH) -> None:
+    """Removes active alerts from the book by id."""
+    alert_ids = set(alert_ids)
+    with book_lock(path):
+        book = load_book(path)
+        book["alerts"] = [alert for alert in book["alerts"] if alert["id"] not in alert_ids]
+        save_book(book, path)
+
+def remove_alert(alert_id: int, path: str = ALERT_BOOK_PATH) -> None:
+    """Removes an active alert from the book by id."""
+    remove_alerts([alert_id], path)
+
+def record_sent(book: dict, alert: dict, price: float) -> None:
+    """Moves a triggered alert from the active list to the sent history of book (in memory)."""
+    book["sent"].append({
+        "stock": alert["ticker"],
+        "target": alert["price"],
+        "alert_type": alert["type"],
+        "triggered_at": price,
+        "email": alert["email"],
+        "sent_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    })
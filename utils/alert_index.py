@@ -0,0 +1,117 @@
+from bisect import bisect_left, bisect_right
+
+class AlertIndex:
+    """Per-ticker sorted index of "Above" and "Below" alert thresholds.
+
+    For every ticker the thresholds of each alert type are kept in a sorted list next to a
+    parallel list of alert ids. Given a new price, the crossed alerts are a prefix ("Above",
+    threshold <= price) or a suffix ("Below", threshold >= price) of those lists, found with
+    a single bisect instead of checking every alert.
+    """
+
+    def __init__(self, alerts: list = None) -> None:
+        self._sides = {"Above": {}, "Below": {}}  # type -> ticker -> (thresholds, ids)
+        self._alerts = {}  # id -> alert
+        if alerts:
+            self.add_many(alerts)
+
+    def __len__(self) -> int:
+        return len(self._alerts)
+
+    def __iter__(self):
+        return iter(self._alerts.values())
+
+    def tickers(self) -> list:
+        """Returns the sorted tickers that have at least one alert."""
+        return sorted({ticker for side in self._sides.values() for ticker, (thresholds, _) in side.items() if thresholds})
+
+    def _lists(self, alert: dict) -> tuple:
+        return self._sides[alert["type"]].setdefault(alert["ticker"], ([], []))
+
+    def add(self, alert: dict) -> None:
+        """Adds one alert with "id", "ticker", "price" and "type" ("Above"/"Below")."""
+        thresholds, ids = self._lists(alert)
+        position = bisect_right(thresholds, alert["price"])
+        thresholds.insert(position, alert["price"])
+        ids.insert(position, alert["id"])
+        self._alerts[alert["id"]] = alert
+
+    def add_many(self, alerts: list) -> None:
+        """Adds many alerts at once, re-sorting each affected ticker only once."""
+        touched = set()
+        for alert in alerts:
+            thresholds, ids = self._lists(alert)
+            thresholds.append(alert["price"])
+            ids.append(alert["id"])
+            self._alerts[alert["id"]] = alert
+            touched.add((alert["type"], alert["ticker"]))
+
+        for alert_type, ticker in touched:
+            thresholds, ids = self._sides[alert_type][ticker]
+            order = sorted(range(len(thresholds)), key=thresholds.__getitem__)
+            thresholds[:] = [thresholds[i] for i in order]
+            ids[:] = [ids[i] for i in order]
+
+    def remove(self, alert_id: int) -> None:
+        """Removes one alert by id, ignoring unknown ids."""
+        alert = self._alerts.pop(alert_id, None)
+        if alert is None:
+            return
+        thresholds, ids = self._lists(alert)
+        position = bisect_left(thresholds, alert["price"])
+        while ids[position] != alert_id:  # step over other alerts with the same threshold
+            position += 1
+        del thresholds[position]
+        del ids[position]
+
+    def remove_many(self, alert_ids: list) -> None:
+        """Removes many alerts by id, rebuilding each affected ticker only once."""
+        removed = {alert_id for alert_id in alert_ids if alert_id in self._alerts}
+        touched = {(self._alerts[i]["type"], self._alerts[i]["ticker"]) for i in removed}
+        for alert_id in removed:
+            del self._alerts[alert_id]
+
+        for alert_type, ticker in touched:
+            thresholds, ids = self._sides[alert_type][ticker]
+            kept = [(t, i) for t, i in zip(thresholds, ids) if i not in removed]
+            thresholds[:] = [t for t, _ in kept]
+            ids[:] = [i for _, i in kept]
+
+    def match(self, ticker: str, price: float) -> list:
+        """Returns every alert for ticker whose condition holds at price.
+
+        Args:
+            ticker (str): The stock ticker symbol (e.g., "AAPL").
+            price (float): The latest price of the stock.
+
+        Returns:
+            list: The crossed alerts, "Above" alerts first.
+        """
+        matched = []
+        thresholds, ids = self._sides["Above"].get(ticker, ([], []))
+        matched.extend(self._alerts[i] for i in ids[:bisect_right(thresholds, price)])
+        thresholds, ids = self._sides["Below"].get(ticker, ([], []))
+        matched.extend(self._alerts[i] for i in ids[bisect_left(thresholds, price):])
+        return matched
+
+    def pop_triggered(self, prices: dict) -> list:
+        """Removes and returns every alert crossed by the given prices.
+
+        Args:
+            prices (dict): Maps ticker symbols to their latest price.
+
+        Returns:
+            list: (alert, price) pairs for every triggered alert.
+        """
+        triggered = []
+        for ticker, price in prices.items():
+            thresholds, ids = self._sides["Above"].get(ticker, ([], []))
+            cut = bisect_right(thresholds, price)
+            triggered.extend((self._alerts.pop(i), price) for i in ids[:cut])
+            del thresholds[:cut], ids[:cut]
+
+            thresholds, ids = self._sides["Below"].get(ticker, ([], []))
+            cut = bisect_left(thresholds, price)
+            triggered.extend((self._alerts.pop(i), price) for i in ids[cut:])
+            del thresholds[cut:], ids[cut:]
+        return triggered
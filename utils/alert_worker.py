@@ -0,0 +1,192 @@
+"""Background alert evaluation service.
+
+Run from the project root with:
+
+    python -m utils.alert_worker --interval 60
+
+Every tick brings a persistent alert index up to date with the alert book (only when the
+book file changed), fetches prices for all alerted symbols in one batch (only once per
+symbol while the market is closed), bisects the index for the crossed rules and queues
+triggered alerts on the mail dispatcher, which folds simultaneous triggers for one
+recipient into a single email.
+"""
+import os
+import time
+import logging
+import argparse
+import threading
+from utils.alert_index import AlertIndex
+from utils.alert_book import ALERT_BOOK_PATH, book_lock, load_book, save_book, record_sent
+from utils.email_alerts import queue_email_alert, get_dispatcher
+from utils.quotes import get_last_prices
+from utils.market_calendar import cache_ttl
+from utils.shared_cache import market_cache
+from utils.fetch_scheduler import priority, ALERT
+
+logger = logging.getLogger(__name__)
+
+def session_prices(tickers: list) -> dict:
+    """Fetches the latest prices through the shared market-data cache.
+
+    Prices are cached for a minute during the regular session and until the next open
+    outside it. The cache lives in the calling process: the Notify Me pages of every session
+    of one app server share it, and their concurrent requests for the same tickers share one
+    download. The background worker runs in its own process and keeps its own cache.
+
+    Args:
+        tickers (list): A list of stock ticker symbols (e.g., ["AAPL", "MSFT"]).
+
+    Returns:
+        dict: Maps each ticker to its latest price (float). Tickers without any data are left out.
+    """
+    def fetch(keys: list) -> dict:
+        with priority(ALERT):  # alert checks go ahead of every other queued request
+            prices = get_last_prices([ticker for _, ticker in keys])
+        return {("last_price", ticker): price for ticker, price in prices.items()}
+
+    cached = market_cache.get_many([("last_price", ticker) for ticker in tickers], fetch, ttl=cache_ttl())
+    return {ticker: cached[("last_price", ticker)] for ticker in tickers if ("last_price", ticker) in cached}
+
+def evaluate_alerts(alerts: list, prices: dict) -> tuple:
+    """Splits alerts into the ones triggered at the given prices and the ones still active.
+
+    Builds a throwaway index, for one-off evaluations such as batch reports; the worker
+    keeps an ``AlertMonitor`` instead.
+
+    Args:
+        alerts (list): Alert dictionaries with "id", "ticker", "price" and "type" ("Above"/"Below").
+        prices (dict): Maps ticker symbols to their latest price.
+
+    Returns:
+        tuple: A tuple containing:
+            - triggered (list): (alert, price) pairs for every alert whose condition holds.
+            - remaining (list): The alerts that did not trigger.
+    """
+    index = AlertIndex(alerts)
+    triggered = index.pop_triggered(prices)
+    remaining = list(index)
+    return triggered, remaining
+
+class AlertMonitor:
+    """Keeps an AlertIndex of an alert book up to date between ticks.
+
+    The book file is only read again when its modification time or size changed, and
+    the index is then updated with just the added and removed alerts.
+
+    Args:
+        path (str): Location of the alert book.
+    """
+
+    def __init__(self, path: str = ALERT_BOOK_PATH) -> None:
+        self.path = path
+        self.index = AlertIndex()
+        self._stamp = None
+
+    def _file_stamp(self) -> tuple:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def sync(self) -> None:
+        """Applies the changes made to the book since the last sync. Call under book_lock."""
+        stamp = self._file_stamp()
+        if stamp == self._stamp:
+            return
+        alerts = {alert["id"]: alert for alert in load_book(self.path)["alerts"]}
+        indexed = {alert["id"] for alert in self.index}
+        self.index.remove_many([alert_id for alert_id in indexed if alert_id not in alerts])
+        self.index.add_many([alert for alert_id, alert in alerts.items() if alert_id not in indexed])
+        self._stamp = stamp
+
+    def reset(self) -> None:
+        """Forgets the index, so the next sync rebuilds it from the book."""
+        self.index = AlertIndex()
+        self._stamp = None
+
+    def mark_saved(self) -> None:
+        """Records a book write of our own, whose changes the index already holds."""
+        self._stamp = self._file_stamp()
+
+_monitors = {}
+_monitors_lock = threading.Lock()
+
+def get_monitor(path: str = ALERT_BOOK_PATH) -> AlertMonitor:
+    """Returns the process-wide monitor of the alert book at path."""
+    with _monitors_lock:
+        if path not in _monitors:
+            _monitors[path] = AlertMonitor(path)
+        return _monitors[path]
+
+def run_tick(path: str = ALERT_BOOK_PATH) -> list:
+    """Evaluates every active alert in the book once and sends notifications.
+
+    The book lock is only held to sync the index and to record triggered alerts, never
+    during the price fetch, so adding or removing alerts does not wait on the network.
+    Triggered alerts are moved to the sent history before any email goes out, so an alert
+    is never sent twice even if the page and the worker evaluate at the same time.
+
+    Args:
+        path (str, optional): Location of the alert book. Defaults to ALERT_BOOK_PATH.
+
+    Returns:
+        list: (alert, price) pairs for the alerts triggered in this tick.
+    """
+    monitor = get_monitor(path)
+    with book_lock(path):
+        monitor.sync()
+        tickers = monitor.index.tickers()
+    if not tickers:
+        return []
+
+    prices = session_prices(tickers)
+
+    with book_lock(path):
+        # alerts added or removed during the fetch are picked up before matching
+        monitor.sync()
+        triggered = monitor.index.pop_triggered(prices)
+        if triggered:
+            try:
+                book = load_book(path)
+                fired = {alert["id"] for alert, _ in triggered}
+                book["alerts"] = [alert for alert in book["alerts"] if alert["id"] not in fired]
+                for alert, price in triggered:
+                    record_sent(book, alert, price)
+                save_book(book, path)
+            except Exception:
+                monitor.reset()  # the popped alerts are still in the book
+                raise
+            monitor.mark_saved()
+
+    for alert, price in triggered:
+        if alert["email"]:
+            queue_email_alert(alert["email"], alert["ticker"], price, alert["price"])
+
+    return triggered
+
+def run_forever(interval: float, path: str = ALERT_BOOK_PATH) -> None:
+    """Runs run_tick every interval seconds until interrupted."""
+    while True:
+        started = time.monotonic()
+        try:
+            triggered = run_tick(path)
+            if triggered:
+                logger.info("Triggered %d alert(s)", len(triggered))
+        except Exception:  # keep the scheduler alive through transient data errors
+            logger.exception("Alert tick failed")
+        time.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluate stock price alerts in the background.")
+    parser.add_argument("--interval", type=float, default=60, help="seconds between evaluations")
+    parser.add_argument("--book", default=ALERT_BOOK_PATH, help="path of the alert book")
+    parser.add_argument("--once", action="store_true", help="run a single evaluation and exit")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    if args.once:
+        run_tick(args.book)
+        get_dispatcher().flush()
+    else:
+        run_forever(args.interval, args.book)
@@ -0,0 +1,221 @@
+"""Headless batch reports for many portfolio files.
+
+Run from the project root with:
+
+    python -m utils.batch_report portfolios/*.csv --output reports --alerts .alert_book.json --sentiment
+
+Market data for every distinct ticker across all portfolios is loaded once, through the
+price cache, and written to a shared Parquet close matrix that each worker process reads
+once. Portfolios are then valued in parallel on a process pool. Each portfolio gets its
+own folder with value.csv, holdings.csv and purchases.csv, and summary.csv lists one row
+per portfolio. Triggered alerts and sentiment summaries are written next to it. Alerts are
+only reported, no emails are sent.
+"""
+import os
+import argparse
+from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from utils.portfolio_io import read_lot_chunks, coerce_lots
+from utils.price_cache import get_price_cache
+from utils.quotes import get_last_prices
+from utils.valuation import build_close_matrix, value_series_from_closes
+from utils.holdings import build_holdings_table, build_purchases_table
+from utils.alert_book import load_book
+from utils.alert_worker import evaluate_alerts
+from utils.fetch_scheduler import priority, BACKFILL
+
+HISTORY_YEARS = 15
+
+# market data loaded once per worker process by _init_worker
+_shared = {}
+
+def _file_format(path: str) -> str:
+    return "parquet" if path.lower().endswith(".parquet") else "csv"
+
+def portfolio_tickers(path: str) -> set:
+    """Collects the distinct tickers of a portfolio file, empty if it can't be read."""
+    tickers = set()
+    try:
+        for chunk in read_lot_chunks(path, _file_format(path)):
+            if "ticker" in chunk:
+                tickers.update(chunk["ticker"].dropna().astype(str).str.strip().str.upper())
+    except Exception:
+        pass  # the worker reports the error in summary.csv
+    return tickers - {""}
+
+def load_portfolio(path: str) -> pd.DataFrame:
+    """Reads and coerces every lot of a CSV or Parquet portfolio file."""
+    chunks = [coerce_lots(chunk) for chunk in read_lot_chunks(path, _file_format(path))]
+    return pd.concat(chunks, ignore_index=True) if chunks else coerce_lots(pd.DataFrame(columns=["ticker", "buy_price", "buy_date", "quantity"]))
+
+def load_market_data(tickers: list) -> tuple:
+    """Loads the history and latest price of every ticker once, for all portfolios.
+
+    Args:
+        tickers (list): The distinct tickers of every portfolio.
+
+    Returns:
+        tuple: A tuple containing:
+            - closes (pandas.DataFrame): The aligned date x ticker close matrix.
+            - prices (dict): The latest price of each ticker, falling back to its last close.
+    """
+    start_date = (datetime.today() - timedelta(days=HISTORY_YEARS*365)).strftime("%Y-%m-%d")
+    histories = {}
+    with priority(BACKFILL):
+        for ticker in tickers:
+            try:
+                histories[ticker] = get_price_cache().get_history(ticker, start_date)
+            except Exception as e:
+                print(f"Skipping history of {ticker}: {e}")
+        prices = get_last_prices(tickers)
+
+    closes = build_close_matrix(histories)
+    for ticker in closes.columns:
+        last = closes[ticker].dropna()
+        if ticker not in prices and not last.empty:
+            prices[ticker] = float(last.iloc[-1])
+    return closes, prices
+
+def sentiment_summary(tickers: list, limit: int = 10) -> pd.DataFrame:
+    """Scores recent news of every ticker once and summarises it per ticker.
+
+    Returns:
+        pandas.DataFrame: Columns "Symbol", "Score", "Sentiment" and "Articles".
+    """
+    from utils.sentiment_analysis import fetch_news_batch, sentiment_label
+
+    rows = [
+        {"Symbol": symbol, "Score": score, "Sentiment": sentiment_label(score), "Articles": len(news_df)}
+        for symbol, (news_df, score, _) in fetch_news_batch(tickers, limit=limit).items()
+    ]
+    return pd.DataFrame(rows, columns=["Symbol", "Score", "Sentiment", "Articles"])
+
+def triggered_alerts(book_path: str, prices: dict) -> pd.DataFrame:
+    """Evaluates the alert book at the given prices without sending or recording anything."""
+    triggered, _ = evaluate_alerts(load_book(book_path)["alerts"], prices)
+    return pd.DataFrame(
+        [{"Stock": a["ticker"], "Alert Type": a["type"], "Target Price": a["price"], "Price": p, "Email": a["email"]}
+         for a, p in triggered],
+        columns=["Stock", "Alert Type", "Target Price", "Price", "Email"]
+    )
+
+def _init_worker(closes_path: str, prices: dict, sentiment: dict) -> None:
+    _shared["closes"] = pd.read_parquet(closes_path)
+    _shared["prices"] = prices
+    _shared["sentiment"] = sentiment
+
+def report_portfolio(job: tuple) -> dict:
+    """Values one portfolio and writes its tables, runs in a worker process.
+
+    Args:
+        job (tuple): The portfolio file path and its output folder.
+
+    Returns:
+        dict: The portfolio's row of summary.csv.
+    """
+    path, out_dir = job
+    closes, prices, sentiment = _shared["closes"], _shared["prices"], _shared["sentiment"]
+    summary = {"Portfolio": os.path.basename(out_dir), "File": path}
+
+    try:
+        lots = load_portfolio(path)
+        lots["current_price"] = lots["ticker"].map(prices)
+        os.makedirs(out_dir, exist_ok=True)
+
+        # only this portfolio's columns of the shared matrix are valued
+        held = [ticker for ticker in lots["ticker"].unique() if ticker in closes.columns]
+        value = value_series_from_closes(lots, closes[held])
+        value = value[value["Total Portfolio Value"] > 0]
+        value.to_csv(os.path.join(out_dir, "value.csv"), index=False)
+
+        build_holdings_table(lots).to_csv(os.path.join(out_dir, "holdings.csv"), index=False)
+        build_purchases_table(lots).to_csv(os.path.join(out_dir, "purchases.csv"), index=False)
+
+        market_value = (lots["quantity"] * lots["current_price"]).sum()
+        total_cost = (lots["quantity"] * lots["buy_price"]).sum()
+        summary.update({
+            "Lots": len(lots),
+            "Stocks": lots["ticker"].nunique(),
+            "Total Cost (USD)": round(total_cost, 2),
+            "Market Value (USD)": round(market_value, 2),
+            "Profit (%)": round((market_value - total_cost) / total_cost * 100, 2) if total_cost else 0.0,
+            "Unpriced Stocks": int(lots.loc[lots["current_price"].isna(), "ticker"].nunique()),
+        })
+
+        if sentiment:
+            # market-value weighted news sentiment of the holdings
+            weights = (lots["quantity"] * lots["current_price"]).groupby(lots["ticker"]).sum()
+            scores = weights.index.map(sentiment)
+            known = scores.notna() & (weights > 0)
+            summary["Sentiment Score"] = round(float((weights[known] * scores[known]).sum() / weights[known].sum()), 4) if known.any() else None
+    except Exception as e:  # one bad file shouldn't stop the batch
+        summary["Error"] = f"{type(e).__name__}: {e}"
+
+    return summary
+
+def run(paths: list, output: str, workers: int = None, alerts_path: str = None, sentiment: bool = False,
+        news_limit: int = 10) -> pd.DataFrame:
+    """Writes reports for every portfolio file and returns the summary table.
+
+    Args:
+        paths (list): The CSV or Parquet portfolio files.
+        output (str): The folder to write the reports to.
+        workers (int, optional): Worker processes. Defaults to the number of CPUs.
+        alerts_path (str, optional): An alert book to evaluate at the latest prices.
+        sentiment (bool): Whether to fetch and summarise news sentiment of every ticker.
+        news_limit (int): Maximum number of articles per ticker.
+
+    Returns:
+        pandas.DataFrame: One summary row per portfolio.
+    """
+    os.makedirs(output, exist_ok=True)
+
+    tickers = set()
+    for path in paths:
+        tickers |= portfolio_tickers(path)
+    alert_book = load_book(alerts_path) if alerts_path else {"alerts": []}
+    tickers = sorted(tickers | {alert["ticker"] for alert in alert_book["alerts"]})
+    print(f"Loading market data for {len(tickers)} tickers across {len(paths)} portfolios")
+
+    closes, prices = load_market_data(tickers)
+    closes_path = os.path.join(output, "closes.parquet")
+    closes.to_parquet(closes_path)
+
+    scores = {}
+    if sentiment:
+        news = sentiment_summary(tickers, limit=news_limit)
+        news.to_csv(os.path.join(output, "sentiment.csv"), index=False)
+        scores = dict(zip(news["Symbol"], news["Score"]))
+
+    if alerts_path:
+        triggered_alerts(alerts_path, prices).to_csv(os.path.join(output, "alerts.csv"), index=False)
+
+    # one output folder per portfolio, named after the file
+    names, jobs = {}, []
+    for path in paths:
+        name = os.path.splitext(os.path.basename(path))[0]
+        names[name] = names.get(name, 0) + 1
+        jobs.append((path, os.path.join(output, name if names[name] == 1 else f"{name}_{names[name]}")))
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(closes_path, prices, scores)) as pool:
+        rows = list(pool.map(report_portfolio, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+
+    summary = pd.DataFrame(rows)
+    summary.to_csv(os.path.join(output, "summary.csv"), index=False)
+    return summary
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write valuation, holdings, alert and sentiment reports for many portfolios.")
+    parser.add_argument("portfolios", nargs="+", help="CSV or Parquet portfolio files")
+    parser.add_argument("--output", default="reports", help="folder to write the reports to")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--alerts", help="alert book to evaluate at the latest prices")
+    parser.add_argument("--sentiment", action="store_true", help="summarise news sentiment of every ticker")
+    parser.add_argument("--news-limit", type=int, default=10, help="articles per ticker for --sentiment")
+    args = parser.parse_args()
+
+    summary = run(args.portfolios, args.output, args.workers, args.alerts, args.sentiment, args.news_limit)
+    failed = summary["Error"].notna().sum() if "Error" in summary else 0
+    print(f"Wrote reports for {len(summary) - failed} portfolios to {args.output}" + (f", {failed} failed" if failed else ""))
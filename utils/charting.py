@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+
+# points sent to the browser per chart, split evenly across its lines
+POINT_BUDGET = 20_000
+MIN_POINTS_PER_LINE = 50
+# a resolution is only downsampled if it has at most this many times the per-line budget,
+# otherwise the next coarser rollup is used
+ROLLUP_FACTOR = 4
+
+TIMEFRAMES = {
+    "Last 30 Days": 30,
+    "Last 3 Months": 90,
+    "Last 6 Months": 180,
+    "Last Year": 365,
+    "5 Years": 365*5,
+    "All Time": None
+}
+
+# pandas period of each rollup, from finest to coarsest
+ROLLUP_PERIODS = {"daily": None, "weekly": "W-FRI", "monthly": "M"}
+
+def build_rollups(frame: pd.DataFrame) -> dict:
+    """Precomputes weekly and monthly rollups of a date-indexed frame.
+
+    Each rollup keeps the last row of every period (the period's close), with its real
+    date, so the rollups can be sliced with the same timeframe as the daily data.
+
+    Args:
+        frame (pandas.DataFrame): A sorted date index and one column per line to plot.
+
+    Returns:
+        dict: "daily", "weekly" and "monthly" frames.
+    """
+    rollups = {}
+    for resolution, period in ROLLUP_PERIODS.items():
+        if period is None or frame.empty:
+            rollups[resolution] = frame
+        else:
+            rollups[resolution] = frame[~frame.index.to_period(period).duplicated(keep="last")]
+    return rollups
+
+def lttb(values: np.ndarray, threshold: int) -> np.ndarray:
+    """Picks the positions of the points that best keep the shape of each line.
+
+    Largest-Triangle-Three-Buckets: the first and last points are always kept, the rest
+    are split into threshold - 2 buckets and from each bucket the point forming the largest
+    triangle with the previously kept point and the average of the next bucket is kept.
+    Every column of a 2D array is downsampled at once.
+
+    Args:
+        values (numpy.ndarray): The y values, evenly spaced along x, one line per column.
+        threshold (int): The number of points to keep per line.
+
+    Returns:
+        numpy.ndarray: The sorted positions of the kept points, one column per line.
+    """
+    values = values.reshape(len(values), -1)
+    n, lines = values.shape
+    if threshold >= n or threshold < 3:
+        return np.repeat(np.arange(n)[:, None], lines, axis=1)
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty((threshold, lines), dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+
+    columns = np.arange(lines)
+    a = np.zeros(lines, dtype=np.int64)
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x = (edges[i + 1] + edges[i + 2] - 1) / 2
+            next_y = values[edges[i + 1]:edges[i + 2]].mean(axis=0)
+        else:  # the last bucket is followed by the last point
+            next_x, next_y = n - 1, values[-1]
+
+        x = np.arange(start, end)[:, None]
+        a_y = values[a, columns]
+        area = np.abs((a - next_x) * (values[start:end] - a_y) - (a - x) * (next_y - a_y))
+        a = start + np.argmax(area, axis=0)
+        selected[i + 1] = a
+
+    return selected
+
+def chart_frame(rollups: dict, days: int, value_name: str, var_name: str = "Stock", budget: int = POINT_BUDGET) -> pd.DataFrame:
+    """Builds the long-format data for a line chart of one timeframe.
+
+    The rollups are sliced to the timeframe first, the finest resolution that fits the
+    point budget is picked, and every line is downsampled with LTTB. Leading gaps (e.g.
+    before a listing) are dropped per line.
+
+    Args:
+        rollups (dict): The output of ``build_rollups``.
+        days (int): The number of days to show, or None for all time.
+        value_name (str): The name of the value column (e.g. "Close").
+        var_name (str): The name of the column identifying each line.
+        budget (int): The total number of points for the chart.
+
+    Returns:
+        pandas.DataFrame: Columns "Date", var_name and value_name.
+    """
+    daily = rollups["daily"]
+    if daily.empty:
+        return pd.DataFrame(columns=["Date", var_name, value_name])
+
+    start = None if days is None else daily.index.max() - pd.Timedelta(days=days)
+    per_line = max(MIN_POINTS_PER_LINE, budget // daily.shape[1])
+
+    for resolution in ROLLUP_PERIODS:
+        frame = rollups[resolution] if start is None else rollups[resolution].loc[start:]
+        if len(frame) <= per_line * ROLLUP_FACTOR:
+            break
+
+    # leading gaps are back filled so all lines are downsampled together, then dropped
+    values = frame.to_numpy(dtype=float)
+    missing = np.isnan(values)
+    selected = lttb(frame.bfill().to_numpy(dtype=float), per_line)
+
+    columns = np.broadcast_to(np.arange(values.shape[1]), selected.shape)
+    keep = ~missing[selected, columns]
+    rows, columns = selected.T[keep.T], columns.T[keep.T]  # grouped by line, in date order
+
+    return pd.DataFrame({
+        "Date": frame.index.to_numpy()[rows],
+        var_name: frame.columns.to_numpy()[columns],
+        value_name: values[rows, columns],
+    })
@@ -1,21 +1,142 @@
 import os
+import time
+import queue
+import random
 import smtplib
 import ssl
+import threading
+from functools import lru_cache
 from email.message import EmailMessage
 from dotenv import load_dotenv
 from string import Template
+from utils.instrumentation import metrics
 
 # load environment variables from.env file
 load_dotenv()
 EMAIL_USER = os.getenv("EMAIL_USER")
 EMAIL_PASS = os.getenv("EMAIL_PASS")
 
+# SMTP server settings, point these at a local stand-in (e.g. SMTP_HOST=localhost SMTP_PORT=1025 SMTP_SSL=0) for testing
+SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "465"))
+SMTP_SSL = os.getenv("SMTP_SSL", "1") not in ("0", "false", "False")
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), "templates")
+
+@lru_cache(maxsize=None)
+def load_template(name: str) -> Template:
+    """Reads and compiles an email template once, returning None if the file is missing."""
+    try:
+        with open(os.path.join(TEMPLATE_DIR, name), "r", encoding="utf-8") as f:
+            return Template(f.read())
+    except FileNotFoundError:
+        return None
+
+class SMTPConnection:
+    """A persistent, authenticated SMTP connection that is reused across messages.
+
+    The connection is opened (and logged in) on first use and kept open. If the server
+    drops it between messages, it is re-established once before giving up.
+    """
+
+    def __init__(self, host: str = SMTP_HOST, port: int = SMTP_PORT, use_ssl: bool = SMTP_SSL,
+                 user: str = EMAIL_USER, password: str = EMAIL_PASS) -> None:
+        self.host, self.port, self.use_ssl = host, port, use_ssl
+        self.user, self.password = user, password
+        self._context = ssl.create_default_context() if use_ssl else None
+        self._server = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> None:
+        if self.use_ssl:
+            self._server = smtplib.SMTP_SSL(self.host, self.port, context=self._context)
+        else:
+            self._server = smtplib.SMTP(self.host, self.port)
+        if self.user and self.password:
+            self._server.login(self.user, self.password)
+
+    def send(self, message: EmailMessage) -> None:
+        """Sends a message, reconnecting once if the connection has gone stale."""
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._server is None:
+                        self._connect()
+                    with metrics.call("smtp", "send") as call:
+                        body = message.as_string()
+                        call.bytes = len(body)
+                        self._server.sendmail(self.user or "", message["To"], body)
+                    return
+                except (smtplib.SMTPServerDisconnected, ConnectionError):
+                    self._server = None
+                    if attempt:
+                        raise
+
+    def close(self) -> None:
+        """Closes the connection if it is open."""
+        with self._lock:
+            if self._server is not None:
+                try:
+                    self._server.quit()
+                except smtplib.SMTPException:
+                    pass
+                self._server = None
+
+# connection shared by every sender in this process
+_connection = SMTPConnection()
+
+def build_alert_message(to_email: str, stock: str, current_price: float, target_price: float) -> EmailMessage:
+    """Builds the HTML notification for a single triggered alert."""
+    message = EmailMessage()
+    message["From"] = EMAIL_USER
+    message["To"] = to_email
+    message["Subject"] = f"📈 Stock Alert: {stock} has hit ${current_price:.2f}!"
+
+    # populate the pre-compiled HTML template
+    template = load_template("email_template.html")
+    if template is not None:
+        html_content = template.substitute(stock=stock, current_price=f"{current_price:.2f}", target_price=target_price)
+    else:
+        # if template not found
+        html_content = f"<p>{stock} has hit ${current_price:.2f}, reaching your target of ${target_price:.2f}.</p>"
+
+    message.add_alternative(html_content, subtype="html")
+    return message
+
+def build_digest_message(to_email: str, triggers: list) -> EmailMessage:
+    """Builds one HTML email listing several triggered alerts for the same recipient.
+
+    Args:
+        to_email (str): The recipient's email address.
+        triggers (list): (stock, current_price, target_price) tuples.
+    """
+    if len(triggers) == 1:
+        return build_alert_message(to_email, *triggers[0])
+
+    message = EmailMessage()
+    message["From"] = EMAIL_USER
+    message["To"] = to_email
+    message["Subject"] = f"📈 Stock Alerts: {len(triggers)} of your targets were hit"
+
+    rows = "".join(
+        f"<tr><td>{stock}</td><td>${current_price:.2f}</td><td>${target_price:.2f}</td></tr>"
+        for stock, current_price, target_price in triggers
+    )
+    template = load_template("digest_template.html")
+    if template is not None:
+        html_content = template.substitute(count=len(triggers), rows=rows)
+    else:
+        html_content = f"<table>{rows}</table>"
+
+    message.add_alternative(html_content, subtype="html")
+    return message
+
 def send_email_alert(
-        to_email: str, 
-        stock: str, 
-        current_price: float, 
+        to_email: str,
+        stock: str,
+        current_price: float,
         target_price: float) -> None:
-    
+
     """Sends an email notification when a stock hits the target price.
 
     Args:
@@ -30,39 +151,124 @@ def send_email_alert(
         print("⚠️ No recipient email provided. Skipping email alert.")
         return
 
-    # create email message
-    message = EmailMessage()
-    message["From"] = EMAIL_USER
-    message["To"] = to_email
-    message["Subject"] = f"📈 Stock Alert: {stock} has hit ${current_price:.2f}!"
-
-    # construct path to the email template file
-    template_path = os.path.join(os.path.dirname(__file__), "templates/email_template.html")
-
-    # load and populate the HTML template
-    try:
-        with open(template_path, "r", encoding="utf-8") as f:
-            template = Template(f.read())
-        html_content = template.substitute(stock=stock, current_price=f"{current_price:.2f}", target_price=target_price)
-    
-    # if template not found
-    except FileNotFoundError:
-        html_content = f"<p>{stock} has hit ${current_price:.2f}, reaching your target of ${target_price:.2f}.</p>"
-
-    # add the HTML content to the email
-    message.add_alternative(html_content, subtype="html")
-
-    # create a secure SSL context for sending the email
-    context = ssl.create_default_context()
     try:
-        # connect to the gmail SMTP server and send the email
-        with smtplib.SMTP_SSL("smtp.gmail.com", 465, context=context) as server:
-            server.login(EMAIL_USER, EMAIL_PASS)
-            server.sendmail(EMAIL_USER, to_email, message.as_string())
+        # send over the shared, already authenticated connection
+        _connection.send(build_alert_message(to_email, stock, current_price, target_price))
         print(f"Email successfully sent to {to_email}")
     except Exception as e:
         print(f"Failed to send email: {e}")
 
+class MailDispatcher:
+    """Background queue that sends alert emails off the caller's thread.
+
+    Messages are sent over one persistent SMTPConnection and retried with exponential
+    backoff. In digest mode, triggers queued within digest_window seconds of each other
+    are folded into one email per recipient.
+
+    Args:
+        connection (SMTPConnection, optional): Connection to send through. Defaults to the shared one.
+        digest (bool, optional): Whether to group triggers per recipient. Defaults to True.
+        digest_window (float, optional): Seconds to wait for more triggers before sending. Defaults to 2.
+        max_retries (int, optional): Attempts per email before it is dropped. Defaults to 4.
+        backoff (float, optional): Base delay in seconds between attempts. Defaults to 1.
+    """
+
+    def __init__(self, connection: SMTPConnection = None, digest: bool = True, digest_window: float = 2.0,
+                 max_retries: int = 4, backoff: float = 1.0) -> None:
+        self.connection = connection or _connection
+        self.digest, self.digest_window = digest, digest_window
+        self.max_retries, self.backoff = max_retries, backoff
+        self.stats = {"queued": 0, "sent": 0, "failed": 0, "retries": 0}
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="mail-dispatcher", daemon=True)
+        self._thread.start()
+
+    def enqueue(self, to_email: str, stock: str, current_price: float, target_price: float) -> None:
+        """Queues an alert email and returns immediately."""
+        if not to_email:
+            print("⚠️ No recipient email provided. Skipping email alert.")
+            return
+        self.stats["queued"] += 1
+        self._queue.put((to_email, stock, current_price, target_price))
+
+    def flush(self) -> None:
+        """Blocks until every queued email has been sent or given up on."""
+        self._queue.join()
+
+    def _drain(self) -> list:
+        # take the first trigger, then keep collecting until the digest window closes
+        batch = [self._queue.get()]
+        if self.digest:
+            deadline = time.monotonic() + self.digest_window
+            while (remaining := deadline - time.monotonic()) > 0:
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._drain()
+            try:
+                # one email per recipient in digest mode, one per trigger otherwise
+                if self.digest:
+                    grouped = {}
+                    for to_email, *trigger in batch:
+                        grouped.setdefault(to_email, []).append(tuple(trigger))
+                    jobs = [(build_digest_message, (to_email, triggers)) for to_email, triggers in grouped.items()]
+                else:
+                    jobs = [(build_alert_message, item) for item in batch]
+
+                # a message that fails to build or send is dropped, the rest of the batch still goes out
+                for build, args in jobs:
+                    try:
+                        self._send_with_retry(build(*args))
+                    except Exception as e:
+                        self.stats["failed"] += 1
+                        print(f"Failed to send email to {args[0]}: {e}")
+            finally:
+                # always mark the batch done, or flush() would wait forever
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _send_with_retry(self, message: EmailMessage) -> None:
+        for attempt in range(self.max_retries):
+            try:
+                self.connection.send(message)
+                self.stats["sent"] += 1
+                print(f"Email successfully sent to {message['To']}")
+                return
+            except Exception as e:
+                if attempt == self.max_retries - 1:
+                    self.stats["failed"] += 1
+                    print(f"Failed to send email: {e}")
+                    return
+                self.stats["retries"] += 1
+                time.sleep(self.backoff * 2 ** attempt * (1 + random.random()))
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+def get_dispatcher() -> MailDispatcher:
+    """Returns the process-wide MailDispatcher, starting it on first use."""
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = MailDispatcher()
+        return _dispatcher
+
+def queue_email_alert(to_email: str, stock: str, current_price: float, target_price: float) -> None:
+    """Queues an alert email on the shared dispatcher instead of sending it inline.
+
+    Args:
+        to_email (str): The recipient's email address.
+        stock (str): The stock symbol (e.g., AAPL, MSFT).
+        current_price (float): The current price of the stock.
+        target_price (float): The target price that triggered the alert.
+    """
+    get_dispatcher().enqueue(to_email, stock, current_price, target_price)
+
 # test
 if __name__ == "__main__":
-    send_email_alert(EMAIL_USER, "AAPL", 224.05, 224.59)
\ No newline at end of file
+    send_email_alert(EMAIL_USER, "AAPL", 224.05, 224.59)
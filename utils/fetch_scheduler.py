@@ -0,0 +1,196 @@
+import os
+import time
+import heapq
+import random
+import itertools
+import threading
+import contextvars
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+# priority classes, lower runs first
+ALERT = 0
+WATCHLIST = 1
+BACKFILL = 2
+
+# upstream request budget, can be overridden with FETCH_RATE_PER_SEC and FETCH_BURST
+FETCH_RATE = float(os.getenv("FETCH_RATE_PER_SEC", "4"))
+FETCH_BURST = int(os.getenv("FETCH_BURST", "8"))
+FETCH_WORKERS = 4
+MAX_RETRIES = 4
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 60.0
+
+_priority = contextvars.ContextVar("fetch_priority", default=WATCHLIST)
+
+@contextmanager
+def priority(level: int):
+    """Runs the fetches made inside the block at the given priority class."""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+def current_priority() -> int:
+    """Returns the priority class of fetches made from the calling context."""
+    return _priority.get()
+
+def is_rate_limited(error: Exception) -> bool:
+    """Returns True if an error means the upstream is throttling us (HTTP 429).
+
+    Matches yfinance's YFRateLimitError (by name, so yfinance isn't imported for it) and
+    HTTP errors whose response has status 429.
+    """
+    if any(cls.__name__ == "YFRateLimitError" for cls in type(error).__mro__):
+        return True
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", None) == 429
+
+class TokenBucket:
+    """Allows rate requests per second on average, in bursts of up to capacity."""
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Blocks until a request may be sent."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if now >= self._paused_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = max(self._paused_until - now, (1 - self._tokens) / self.rate)
+            time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Stops handing out tokens for a while, e.g. after the upstream throttled us."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+
+class _Job:
+    def __init__(self, key, fn, priority: int) -> None:
+        self.key = key
+        self.fn = fn
+        self.priority = priority
+        self.future = Future()
+        self.started = False
+
+class FetchScheduler:
+    """Central queue for upstream market-data requests.
+
+    Requests run on a few worker threads in priority order (alerts, then watchlist quotes,
+    then history backfills) at a rate set by a token bucket. A request with the same key
+    as one already queued or running shares its future instead of being sent twice.
+    Throttled requests are retried with exponential backoff and jitter, and the whole
+    bucket pauses meanwhile so other requests don't make the throttling worse.
+
+    Attributes:
+        stats (dict): Counts of "submitted", "deduplicated", "retried" and "failed" requests.
+    """
+
+    def __init__(self, rate: float = FETCH_RATE, burst: int = FETCH_BURST, workers: int = FETCH_WORKERS,
+                 max_retries: int = MAX_RETRIES) -> None:
+        self.bucket = TokenBucket(rate, burst)
+        self.workers = workers
+        self.max_retries = max_retries
+        self.stats = {"submitted": 0, "deduplicated": 0, "retried": 0, "failed": 0}
+        self._heap = []
+        self._jobs = {}
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._threads = []
+
+    def _start(self) -> None:
+        """Starts the worker threads on first use. Needs the condition's lock."""
+        if not self._threads:
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"fetch-scheduler-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, key, fn, priority: int = None) -> Future:
+        """Queues a request and returns a future for its result.
+
+        Args:
+            key (hashable): Identifies the request, e.g. ("history", "AAPL", "2010-01-01").
+            fn (callable): Sends the request, called without arguments on a worker thread.
+            priority (int, optional): ALERT, WATCHLIST or BACKFILL. Defaults to the calling
+                context's priority.
+
+        Returns:
+            concurrent.futures.Future: Resolves to fn's result or exception.
+        """
+        priority = current_priority() if priority is None else priority
+        with self._cond:
+            self._start()
+            job = self._jobs.get(key)
+            if job is not None:
+                self.stats["deduplicated"] += 1
+                if not job.started and priority < job.priority:
+                    # requeue at the more urgent class, the stale heap entry is skipped
+                    job.priority = priority
+                    heapq.heappush(self._heap, (priority, next(self._counter), job))
+                return job.future
+
+            job = self._jobs[key] = _Job(key, fn, priority)
+            heapq.heappush(self._heap, (priority, next(self._counter), job))
+            self.stats["submitted"] += 1
+            self._cond.notify()
+            return job.future
+
+    def run(self, key, fn, priority: int = None, timeout: float = None):
+        """Queues a request and waits for its result (see ``submit``)."""
+        return self.submit(key, fn, priority).result(timeout)
+
+    def _work(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    while not self._heap:
+                        self._cond.wait()
+                    entry_priority, _, job = heapq.heappop(self._heap)
+                    if not job.started and entry_priority == job.priority:
+                        job.started = True
+                        break
+
+            try:
+                job.future.set_result(self._call(job.fn))
+            except Exception as e:
+                with self._cond:
+                    self.stats["failed"] += 1
+                job.future.set_exception(e)
+            finally:
+                with self._cond:
+                    self._jobs.pop(job.key, None)
+
+    def _call(self, fn):
+        """Runs fn within the rate limit, backing off and retrying while throttled."""
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire()
+            try:
+                return fn()
+            except Exception as e:
+                if not is_rate_limited(e) or attempt == self.max_retries:
+                    raise
+                delay = min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt) * random.uniform(0.5, 1.5)
+                with self._cond:
+                    self.stats["retried"] += 1
+                self.bucket.pause(delay)
+
+def run_with_priority(level: int, fn, *args):
+    """Calls fn with args at a priority class, for handing the caller's class to pool threads."""
+    with priority(level):
+        return fn(*args)
+
+# process-wide scheduler for every yfinance request
+scheduler = FetchScheduler()
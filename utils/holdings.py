@@ -0,0 +1,81 @@
+import pandas as pd
+
+def build_holdings_table(lots: list) -> pd.DataFrame:
+    """Aggregates purchase lots into one row per stock for the "Current Holdings" table.
+
+    Args:
+        lots (list): Lot dictionaries with "name", "ticker", "buy_price", "current_price",
+            "buy_date" and "quantity".
+
+    Returns:
+        pandas.DataFrame: Columns "Stock", "Ticker", "Avg Buy Price (USD)", "Current Price (USD)",
+        "Quantity" and "Total Cost (USD)".
+    """
+    portfolio_df = pd.DataFrame(lots)
+    portfolio_df["Total Cost"] = (portfolio_df["buy_price"] * portfolio_df["quantity"]).round(2)
+
+    # aggregate data by ticker symbol
+    portfolio_df = (
+        portfolio_df.groupby(["name", "ticker"], as_index=False)
+        .agg({
+            "quantity": "sum", 
+            "Total Cost": "sum",  
+            "current_price": "last", 
+            "buy_date": "first",  
+            "buy_price": "first"  
+        })
+    )
+
+    return format_holdings_table(portfolio_df)
+
+def format_holdings_table(portfolio_df: pd.DataFrame) -> pd.DataFrame:
+    """Turns per-stock aggregates into the "Current Holdings" table.
+
+    Args:
+        portfolio_df (pandas.DataFrame): One row per stock with "name", "ticker", "quantity",
+            "Total Cost" and "current_price", e.g. from ``LotStore.holdings_frame``.
+
+    Returns:
+        pandas.DataFrame: The table described in build_holdings_table.
+    """
+    portfolio_df = portfolio_df.copy()
+
+    # weighted average buy price
+    portfolio_df["avg_buy_price"] = (portfolio_df["Total Cost"] / portfolio_df["quantity"]).round(2)
+
+    # reorder columns
+    return portfolio_df[["name", "ticker", "avg_buy_price", "current_price", "quantity", "Total Cost"]].rename(
+        columns={
+            "name": "Stock",
+            "ticker": "Ticker",
+            "avg_buy_price": "Avg Buy Price (USD)",
+            "current_price": "Current Price (USD)",
+            "quantity": "Quantity",
+            "Total Cost": "Total Cost (USD)"
+        }
+    )
+
+def build_purchases_table(lots: list) -> pd.DataFrame:
+    """Lists every purchase lot with its profit for the "Purchase History" table.
+
+    Args:
+        lots (list): Lot dictionaries with "name", "ticker", "buy_price", "current_price",
+            "buy_date" and "quantity".
+
+    Returns:
+        pandas.DataFrame: Columns "Stock", "Ticker", "Buy Price (USD)", "Buy Date", "Quantity"
+        and "Profit (%)".
+    """
+    purchases_df = pd.DataFrame(lots)
+    purchases_df["Profit %"] = (((purchases_df["current_price"] - purchases_df["buy_price"]) / purchases_df["buy_price"]) * 100).round(2)
+
+    return purchases_df[["name", "ticker", "buy_price", "buy_date", "quantity", "Profit %"]].rename(
+        columns={
+            "name": "Stock",
+            "ticker": "Ticker",
+            "buy_price": "Buy Price (USD)",
+            "buy_date": "Buy Date",
+            "quantity": "Quantity",
+            "Profit %": "Profit (%)"
+        }
+    )
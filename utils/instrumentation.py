@@ -0,0 +1,141 @@
+import json
+import time
+import threading
+from contextlib import contextmanager
+import pandas as pd
+
+def estimate_bytes(result) -> int:
+    """Roughly sizes a provider response: DataFrame memory, or the raw HTTP body."""
+    if isinstance(result, pd.DataFrame):
+        return int(result.memory_usage(index=True).sum())
+    content = getattr(result, "content", None)
+    if isinstance(content, (bytes, bytearray)):
+        return len(content)
+    return 0
+
+class CallRecord:
+    """Mutable record handed to the body of a ``Metrics.call`` block."""
+
+    def __init__(self) -> None:
+        self.bytes = 0
+        self.frame_bytes = 0
+        self.error = False
+
+class Metrics:
+    """Process-wide counters for provider calls, page sections and caches.
+
+    Attributes:
+        calls (dict): (provider, operation) -> {"count", "seconds", "bytes", "frame_bytes", "errors"}.
+            "bytes" are response or message bodies as sent over the wire, "frame_bytes" the
+            in-memory size of the DataFrames returned by market-data providers.
+        sections (dict): section name -> {"count", "seconds", "last"}.
+        caches (dict): cache name -> {"hits", "misses"}.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Clears every counter."""
+        with self._lock:
+            self.calls, self.sections, self.caches = {}, {}, {}
+
+    @contextmanager
+    def call(self, provider: str, operation: str):
+        """Times one data-provider call.
+
+        Inside the block, set ``record.bytes`` to the size of the body sent or received, or
+        ``record.frame_bytes`` to the memory of a returned DataFrame when the body isn't seen
+        (e.g. yfinance).
+
+        Args:
+            provider (str): The upstream service (e.g. "yfinance", "newsapi", "smtp").
+            operation (str): The endpoint or method (e.g. "history", "fast_info").
+        """
+        record = CallRecord()
+        start = time.perf_counter()
+        try:
+            yield record
+        except Exception:
+            record.error = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                stats = self.calls.setdefault((provider, operation), {"count": 0, "seconds": 0.0, "bytes": 0, "frame_bytes": 0, "errors": 0})
+                stats["count"] += 1
+                stats["seconds"] += elapsed
+                stats["bytes"] += record.bytes
+                stats["frame_bytes"] += record.frame_bytes
+                stats["errors"] += record.error
+
+    @contextmanager
+    def section(self, name: str):
+        """Times one page section (e.g. "watchlist", "value chart")."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                stats = self.sections.setdefault(name, {"count": 0, "seconds": 0.0, "last": 0.0})
+                stats["count"] += 1
+                stats["seconds"] += elapsed
+                stats["last"] = elapsed
+
+    def record_cache(self, name: str, hit: bool, count: int = 1) -> None:
+        """Counts cache hits or misses for the named cache."""
+        with self._lock:
+            stats = self.caches.setdefault(name, {"hits": 0, "misses": 0})
+            stats["hits" if hit else "misses"] += count
+
+    def to_dict(self) -> dict:
+        """Returns a JSON-serialisable snapshot of every counter."""
+        with self._lock:
+            return {
+                "calls": [{"provider": p, "operation": o, **stats} for (p, o), stats in self.calls.items()],
+                "sections": [{"section": name, **stats} for name, stats in self.sections.items()],
+                "caches": [
+                    {"cache": name, **stats, "hit_rate": stats["hits"] / max(1, stats["hits"] + stats["misses"])}
+                    for name, stats in self.caches.items()
+                ],
+            }
+
+    def to_json(self) -> str:
+        """Returns the snapshot as JSON text."""
+        return json.dumps(self.to_dict(), indent=2)
+
+    def to_prometheus(self) -> str:
+        """Returns the snapshot in the Prometheus text exposition format."""
+        snapshot = self.to_dict()
+        lines = []
+
+        def metric(name: str, kind: str, help_text: str, samples: list) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                label_text = ",".join(f'{k}="{v}"' for k, v in labels.items())
+                lines.append(f"{name}{{{label_text}}} {value}")
+
+        calls = [({"provider": c["provider"], "operation": c["operation"]}, c) for c in snapshot["calls"]]
+        metric("app_provider_calls_total", "counter", "Data-provider calls.", [(l, c["count"]) for l, c in calls])
+        metric("app_provider_call_seconds_total", "counter", "Wall time spent in data-provider calls.", [(l, c["seconds"]) for l, c in calls])
+        metric("app_provider_bytes_total", "counter", "Body bytes exchanged with data providers.", [(l, c["bytes"]) for l, c in calls])
+        metric("app_provider_frame_bytes_total", "counter", "In-memory bytes of DataFrames returned by data providers.",
+               [(l, c["frame_bytes"]) for l, c in calls])
+        metric("app_provider_errors_total", "counter", "Failed data-provider calls.", [(l, c["errors"]) for l, c in calls])
+
+        sections = [({"section": s["section"]}, s) for s in snapshot["sections"]]
+        metric("app_section_runs_total", "counter", "Page section renders.", [(l, s["count"]) for l, s in sections])
+        metric("app_section_seconds_total", "counter", "Wall time spent rendering page sections.", [(l, s["seconds"]) for l, s in sections])
+        metric("app_section_last_seconds", "gauge", "Wall time of the latest render of each section.", [(l, s["last"]) for l, s in sections])
+
+        caches = [({"cache": c["cache"]}, c) for c in snapshot["caches"]]
+        metric("app_cache_hits_total", "counter", "Cache hits.", [(l, c["hits"]) for l, c in caches])
+        metric("app_cache_misses_total", "counter", "Cache misses.", [(l, c["misses"]) for l, c in caches])
+
+        return "\n".join(lines) + "\n"
+
+# process-wide registry shared by every page and helper
+metrics = Metrics()
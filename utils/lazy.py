@@ -0,0 +1,46 @@
+import sys
+import types
+import importlib
+import importlib.util
+import threading
+
+_import_lock = threading.RLock()
+
+class LazyModule(types.ModuleType):
+    """Stands in for a module and imports it on first attribute access.
+
+    The import runs once under a lock, so sessions touching the module at the same time
+    all see the fully initialised module (``importlib.util.LazyLoader`` can hand a second
+    thread a half-executed one).
+    """
+
+    def __init__(self, name: str) -> None:
+        super().__init__(name)
+        self.__dict__["_module"] = None
+
+    def __getattr__(self, attr: str):
+        module = self.__dict__["_module"]
+        if module is None:
+            with _import_lock:
+                module = self.__dict__["_module"] or importlib.import_module(self.__name__)
+                self.__dict__["_module"] = module
+        return getattr(module, attr)
+
+def lazy_import(name: str):
+    """Returns a module that is only actually imported on first attribute access.
+
+    Used for heavy dependencies (yfinance, plotly, nltk) so that a page only pays for
+    the modules it ends up using during a run.
+
+    Args:
+        name (str): The fully qualified module name (e.g., "plotly.express").
+
+    Returns:
+        module: The module if it is already imported, otherwise a LazyModule for it.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+
+    if importlib.util.find_spec(name) is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+    return LazyModule(name)
@@ -0,0 +1,139 @@
+import threading
+from collections import deque
+import pandas as pd
+from utils.quotes import _bulk_download, _ticker_frame
+from utils.instrumentation import metrics, estimate_bytes
+from utils.fetch_scheduler import scheduler
+from utils.market_data import get_provider
+
+# one regular session plus pre and post market of 1-minute bars
+RING_SIZE = 960
+
+class IntradayBuffer:
+    """Per-ticker ring buffers of today's 1-minute bars, topped up with only the new bars.
+
+    The first update of a ticker downloads the whole day once; every later update asks for
+    the bars after the oldest "last timestamp" held across the requested tickers, in one
+    bulk request, and merges them in: the bar of the current minute is downloaded again
+    while it is still forming, so it replaces the buffer's last bar. Today's open is kept
+    next to the buffer, so it survives bars rolling out of the ring.
+
+    Attributes:
+        bars (dict): Maps tickers to a deque of (timestamp, close) tuples.
+        day_open (dict): Maps tickers to (session date, open of the first bar).
+        stats (dict): Counts of "full" and "delta" downloads and "bars" appended.
+    """
+
+    def __init__(self, ring_size: int = RING_SIZE) -> None:
+        self.ring_size = ring_size
+        self.bars = {}
+        self.day_open = {}
+        self.stats = {"full": 0, "delta": 0, "bars": 0}
+        self._lock = threading.Lock()
+
+    def _append(self, ticker: str, frame: pd.DataFrame) -> None:
+        """Merges the bars of frame from the ticker's last bar on, replacing that bar."""
+        if frame.empty:
+            return
+
+        session = frame.index[-1].date()
+        if ticker not in self.bars or self.day_open[ticker][0] != session:
+            # first bars of a ticker, or a new session: start a fresh buffer
+            frame = frame[frame.index.date == session]
+            self.bars[ticker] = deque(maxlen=self.ring_size)
+            self.day_open[ticker] = (session, float(frame["Open"].iloc[0]))
+
+        buffer = self.bars[ticker]
+        if buffer:
+            frame = frame[frame.index >= buffer[-1][0]]
+            if not frame.empty and frame.index[0] == buffer[-1][0]:
+                buffer.pop()  # the last bar was still forming when it was downloaded
+        buffer.extend(zip(frame.index, frame["Close"].astype(float)))
+        self.stats["bars"] += len(frame)
+
+    def _download_since(self, tickers: list, since: pd.Timestamp) -> pd.DataFrame:
+        provider = get_provider()
+
+        def fetch() -> pd.DataFrame:
+            with metrics.call(provider.name, "download") as call:
+                data = provider.download(tickers, start=since, interval="1m")
+                call.frame_bytes = estimate_bytes(data)
+            return data
+
+        return scheduler.run(("download", tuple(tickers), str(since), "1m"), fetch)
+
+    def update(self, tickers: list) -> None:
+        """Brings the buffers of the given tickers up to date.
+
+        Args:
+            tickers (list): A list of stock ticker symbols (e.g., ["AAPL", "MSFT"]).
+        """
+        # the lock is only held to read and merge the buffers, never during a download
+        with self._lock:
+            new = [ticker for ticker in tickers if not self.bars.get(ticker)]
+            known = [ticker for ticker in tickers if self.bars.get(ticker)]
+            # one request from the stalest buffer covers every known ticker
+            since = min((self.bars[ticker][-1][0] for ticker in known), default=None)
+
+        if new:
+            try:
+                data = _bulk_download(new, period="1d", interval="1m")
+                with self._lock:
+                    self.stats["full"] += 1
+            except Exception:
+                data = pd.DataFrame()
+            with self._lock:
+                for ticker in new:
+                    self._append(ticker, _ticker_frame(data, ticker))
+
+        if known:
+            try:
+                data = self._download_since(known, since)
+                with self._lock:
+                    self.stats["delta"] += 1
+            except Exception:
+                data = pd.DataFrame()
+            with self._lock:
+                for ticker in known:
+                    self._append(ticker, _ticker_frame(data, ticker))
+
+    def quotes(self, tickers: list) -> tuple:
+        """Updates the buffers and returns the change of each ticker since today's open.
+
+        Args:
+            tickers (list): A list of stock ticker symbols (e.g., ["AAPL", "MSFT"]).
+
+        Returns:
+            tuple: A tuple containing:
+                - quotes (list): Dictionaries with "ticker", "price" and "change", in the
+                  same order as tickers.
+                - failures (dict): Maps each ticker without intraday bars to a message.
+        """
+        self.update(tickers)
+
+        quotes, failures = [], {}
+        with self._lock:
+            for ticker in tickers:
+                buffer = self.bars.get(ticker)
+                if not buffer:
+                    failures[ticker] = f"No intraday data available for {ticker} today."
+                    continue
+                today_open = self.day_open[ticker][1]
+                latest_price = buffer[-1][1]
+                percent_change = ((latest_price - today_open) / today_open) * 100
+                quotes.append({"ticker": ticker, "price": latest_price, "change": percent_change})
+
+        return quotes, failures
+
+    def clear(self, ticker: str = None) -> None:
+        """Drops the buffer of one ticker, or of every ticker."""
+        with self._lock:
+            if ticker is None:
+                self.bars.clear()
+                self.day_open.clear()
+            else:
+                self.bars.pop(ticker, None)
+                self.day_open.pop(ticker, None)
+
+# process-wide buffers shared by every session
+intraday_buffer = IntradayBuffer()
@@ -0,0 +1,252 @@
+import os
+import sqlite3
+import threading
+import pandas as pd
+
+# default location of the portfolio database, can be overridden with PORTFOLIO_DB_PATH
+LOT_STORE_PATH = os.getenv("PORTFOLIO_DB_PATH", os.path.join(os.path.dirname(os.path.dirname(__file__)), ".portfolio.db"))
+
+LOT_COLUMNS = ["name", "ticker", "buy_price", "current_price", "buy_date", "quantity"]
+
+# portfolio of callers that don't pick one, e.g. the benchmarks and the load test
+DEFAULT_PORTFOLIO = "default"
+
+_databases = {}
+_databases_lock = threading.Lock()
+
+def _open_database(path: str) -> tuple:
+    """Returns the connection and lock shared by every portfolio of the database at path.
+
+    Creates the schema on first use and migrates databases written before lots had an
+    owner: their lots and holdings move to DEFAULT_PORTFOLIO.
+    """
+    with _databases_lock:
+        if path in _databases:
+            return _databases[path]
+
+        connection = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with connection:
+            lot_columns = [row[1] for row in connection.execute("PRAGMA table_info(lots)")]
+            if lot_columns and "portfolio_id" not in lot_columns:
+                connection.executescript(f"""
+                    ALTER TABLE lots ADD COLUMN portfolio_id TEXT NOT NULL DEFAULT '{DEFAULT_PORTFOLIO}';
+                    ALTER TABLE holdings RENAME TO holdings_unscoped;
+                    DROP INDEX IF EXISTS idx_lots_ticker_date;
+                    DROP INDEX IF EXISTS idx_lots_buy_date;
+                """)
+            connection.executescript("""
+                CREATE TABLE IF NOT EXISTS lots (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT NOT NULL,
+                    ticker TEXT NOT NULL,
+                    buy_price REAL NOT NULL,
+                    current_price REAL,
+                    buy_date TEXT NOT NULL,
+                    quantity INTEGER NOT NULL,
+                    portfolio_id TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_lots_portfolio_ticker_date ON lots (portfolio_id, ticker, buy_date);
+                CREATE INDEX IF NOT EXISTS idx_lots_portfolio_id ON lots (portfolio_id, id);
+                CREATE TABLE IF NOT EXISTS holdings (
+                    portfolio_id TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    ticker TEXT NOT NULL,
+                    quantity INTEGER NOT NULL,
+                    total_cost REAL NOT NULL,
+                    current_price REAL,
+                    PRIMARY KEY (portfolio_id, name, ticker)
+                );
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                );
+            """)
+            if connection.execute("SELECT name FROM sqlite_master WHERE name = 'holdings_unscoped'").fetchone():
+                connection.executescript(f"""
+                    INSERT INTO holdings SELECT '{DEFAULT_PORTFOLIO}', * FROM holdings_unscoped;
+                    DROP TABLE holdings_unscoped;
+                """)
+
+        _databases[path] = (connection, threading.Lock())
+        return _databases[path]
+
+class LotStore:
+    """Persistent store of one portfolio's purchase lots with incrementally maintained holdings.
+
+    Lots live in a SQLite table indexed by portfolio, ticker and buy date. A second table
+    keeps one aggregate row per (portfolio, name, ticker) with the total quantity, total
+    cost and latest current price, updated in the same transaction as every insert or
+    delete so the holdings never have to be re-aggregated from all lots.
+
+    Many portfolios share one database, and every query and change of a store only touches
+    the lots of its own portfolio_id. Stores of the same database share one connection.
+
+    Attributes:
+        path (str): Location of the SQLite database.
+        portfolio_id (str): The owner of the lots, e.g. the key a user entered.
+    """
+
+    def __init__(self, path: str = LOT_STORE_PATH, portfolio_id: str = DEFAULT_PORTFOLIO) -> None:
+        self.path = path
+        self.portfolio_id = portfolio_id
+        self._connection, self._lock = _open_database(path)
+        self._version_key = f"version:{portfolio_id}"
+        with self._lock, self._connection:
+            self._connection.execute("INSERT OR IGNORE INTO meta (key, value) VALUES (?, 0)", (self._version_key,))
+
+    @property
+    def version(self) -> int:
+        """Counter bumped in the transaction of every change to this portfolio, by any process.
+
+        Callers compare it between runs to tell when lots or holdings must be read again.
+        """
+        with self._lock:
+            return self._connection.execute("SELECT value FROM meta WHERE key = ?", (self._version_key,)).fetchone()[0]
+
+    def _bump_version(self) -> None:
+        # called inside the write transaction, so the counter commits with the change
+        self._connection.execute("UPDATE meta SET value = value + 1 WHERE key = ?", (self._version_key,))
+
+    def _lot_totals(self, where: str, params) -> list:
+        # one rounding path (SQLite's ROUND) for the cost added and removed per lot, so the
+        # maintained totals always equal the sum over the lots
+        return self._connection.execute(f"""
+            SELECT name, ticker, SUM(quantity), SUM(ROUND(buy_price * quantity, 2))
+            FROM lots WHERE portfolio_id = ? AND {where} GROUP BY name, ticker
+        """, (self.portfolio_id, *params)).fetchall()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM lots WHERE portfolio_id = ?", (self.portfolio_id,)).fetchone()[0]
+
+    def add_lot(self, lot: dict) -> int:
+        """Adds one lot and returns its id."""
+        return self.add_lots([lot])[0]
+
+    def add_lots(self, lots: list) -> list:
+        """Adds many lots in one transaction, updating only the affected holdings rows.
+
+        Args:
+            lots (list): Dictionaries with "name", "ticker", "buy_price", "current_price",
+                "buy_date" ("%Y-%m-%d") and "quantity".
+
+        Returns:
+            list: The ids of the new lots, in order.
+        """
+        if not lots:
+            return []
+
+        rows = [tuple(lot[column] for column in LOT_COLUMNS) + (self.portfolio_id,) for lot in lots]
+
+        # the latest lot's price of each holding wins, like "last" in a groupby
+        latest_prices = {(name, ticker): current_price for name, ticker, _, current_price, _, _, _ in rows}
+
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT INTO lots (name, ticker, buy_price, current_price, buy_date, quantity, portfolio_id) VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            # ids of one locked insert are consecutive and end at the table's sequence value
+            last_id = self._connection.execute("SELECT seq FROM sqlite_sequence WHERE name = 'lots'").fetchone()[0]
+            first_id = last_id - len(rows) + 1
+
+            # fold the new lots into one delta per holding
+            deltas = self._lot_totals("id BETWEEN ? AND ?", (first_id, last_id))
+            self._connection.executemany("""
+                INSERT INTO holdings (portfolio_id, name, ticker, quantity, total_cost, current_price) VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (portfolio_id, name, ticker) DO UPDATE SET
+                    quantity = quantity + excluded.quantity,
+                    total_cost = total_cost + excluded.total_cost,
+                    current_price = excluded.current_price
+            """, [(self.portfolio_id, name, ticker, q, cost, latest_prices[(name, ticker)]) for name, ticker, q, cost in deltas])
+            self._bump_version()
+
+        return list(range(first_id, first_id + len(rows)))
+
+    def delete_lots(self, lot_ids: list) -> None:
+        """Deletes lots by id in one transaction, updating only the affected holdings rows.
+
+        Ids of other portfolios' lots are ignored.
+        """
+        if not lot_ids:
+            return
+
+        lot_ids = list(lot_ids)
+        with self._lock, self._connection:
+            # chunk the ids to stay below SQLite's parameter limit
+            removed = {}
+            for i in range(0, len(lot_ids), 500):
+                chunk = lot_ids[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                for name, ticker, quantity, cost in self._lot_totals(f"id IN ({placeholders})", chunk):
+                    total = removed.setdefault((name, ticker), [0, 0.0])
+                    total[0] += quantity
+                    total[1] += cost
+                self._connection.execute(f"DELETE FROM lots WHERE portfolio_id = ? AND id IN ({placeholders})",
+                                         (self.portfolio_id, *chunk))
+
+            for (name, ticker), (quantity, cost) in removed.items():
+                latest = self._connection.execute(
+                    "SELECT current_price FROM lots WHERE portfolio_id = ? AND name = ? AND ticker = ? ORDER BY id DESC LIMIT 1",
+                    (self.portfolio_id, name, ticker)
+                ).fetchone()
+                if latest is None:  # last lot of this holding is gone
+                    self._connection.execute("DELETE FROM holdings WHERE portfolio_id = ? AND name = ? AND ticker = ?",
+                                             (self.portfolio_id, name, ticker))
+                else:
+                    self._connection.execute("""
+                        UPDATE holdings SET quantity = quantity - ?, total_cost = total_cost - ?, current_price = ?
+                        WHERE portfolio_id = ? AND name = ? AND ticker = ?
+                    """, (quantity, cost, latest[0], self.portfolio_id, name, ticker))
+            self._bump_version()
+
+    def delete_last(self) -> None:
+        """Deletes the most recently added lot."""
+        with self._lock:
+            row = self._connection.execute("SELECT MAX(id) FROM lots WHERE portfolio_id = ?", (self.portfolio_id,)).fetchone()
+        if row[0] is not None:
+            self.delete_lots([row[0]])
+
+    def clear(self) -> None:
+        """Deletes every lot and holding of this portfolio."""
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM lots WHERE portfolio_id = ?", (self.portfolio_id,))
+            self._connection.execute("DELETE FROM holdings WHERE portfolio_id = ?", (self.portfolio_id,))
+            self._bump_version()
+
+    def lots_frame(self, ticker: str = None) -> pd.DataFrame:
+        """Returns the lots (optionally of one ticker) in insertion order, with their "id"."""
+        query = f"SELECT id, {', '.join(LOT_COLUMNS)} FROM lots WHERE portfolio_id = ?"
+        params = (self.portfolio_id,)
+        if ticker:
+            query += " AND ticker = ?"
+            params += (ticker,)
+        with self._lock:
+            return pd.read_sql_query(query + " ORDER BY id", self._connection, params=params)
+
+    def holdings_frame(self) -> pd.DataFrame:
+        """Returns the maintained aggregates: name, ticker, quantity, Total Cost and current_price."""
+        with self._lock:
+            return pd.read_sql_query(
+                'SELECT name, ticker, quantity, total_cost AS "Total Cost", current_price FROM holdings '
+                'WHERE portfolio_id = ? ORDER BY name, ticker',
+                self._connection, params=(self.portfolio_id,)
+            )
+
+    def tickers(self) -> list:
+        """Returns the distinct tickers held, in order of first purchase."""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT ticker FROM lots WHERE portfolio_id = ? GROUP BY ticker ORDER BY MIN(id)", (self.portfolio_id,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+def get_lot_store(portfolio_id: str = DEFAULT_PORTFOLIO) -> LotStore:
+    """Returns the store of one portfolio in the app's database, opened on first use.
+
+    Importing this module doesn't touch the database, so tools that only need LOT_COLUMNS
+    (e.g. the batch report) never open it.
+
+    Args:
+        portfolio_id (str): The owner of the lots, e.g. the portfolio key of a session.
+    """
+    return LotStore(LOT_STORE_PATH, portfolio_id)
@@ -0,0 +1,168 @@
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+import pytz
+
+EASTERN = pytz.timezone("US/Eastern")
+
+# NYSE trading hours, US/Eastern
+PRE_MARKET_OPEN = time(4, 0)
+MARKET_OPEN = time(9, 30)
+MARKET_CLOSE = time(16, 0)
+EARLY_CLOSE = time(13, 0)
+POST_MARKET_CLOSE = time(20, 0)
+EARLY_POST_MARKET_CLOSE = time(17, 0)
+
+# seconds prices are cached during the regular session, while they can still change
+INTRADAY_TTL = 60
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """Returns the nth (1-based, or -1 for the last) given weekday of a month."""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+def _easter(year: int) -> date:
+    """Returns Easter Sunday (anonymous Gregorian algorithm)."""
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = b // 4, b % 4
+    g = (8 * b + 13) // 25
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 19 * l) // 433
+    month = (h + l - 7 * m + 90) // 25
+    return date(year, month, (h + l - 7 * m + 33 * month + 19) % 32)
+
+def _observed(day: date) -> date:
+    """Moves a fixed-date holiday on a weekend to the nearest weekday."""
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+@lru_cache(maxsize=None)
+def holidays(year: int) -> frozenset:
+    """Returns the NYSE full-day holidays of a year.
+
+    Args:
+        year (int): The calendar year.
+
+    Returns:
+        frozenset: The dates the exchange is closed on, other than weekends.
+    """
+    days = {
+        _nth_weekday(year, 1, 0, 3),  # Martin Luther King Jr. Day
+        _nth_weekday(year, 2, 0, 3),  # Washington's Birthday
+        _easter(year) - timedelta(days=2),  # Good Friday
+        _nth_weekday(year, 5, 0, -1),  # Memorial Day
+        _observed(date(year, 7, 4)),  # Independence Day
+        _nth_weekday(year, 9, 0, 1),  # Labor Day
+        _nth_weekday(year, 11, 3, 4),  # Thanksgiving
+        _observed(date(year, 12, 25)),  # Christmas
+    }
+    # New Year's Day on a Saturday is not observed on the Friday before
+    if date(year, 1, 1).weekday() != 5:
+        days.add(_observed(date(year, 1, 1)))
+    if year >= 2022:
+        days.add(_observed(date(year, 6, 19)))  # Juneteenth
+    return frozenset(days)
+
+@lru_cache(maxsize=None)
+def early_closes(year: int) -> frozenset:
+    """Returns the days the NYSE closes at 13:00: before Independence Day, after Thanksgiving and Christmas Eve."""
+    days = {_nth_weekday(year, 11, 3, 4) + timedelta(days=1)}
+    for day in (date(year, 7, 3), date(year, 12, 24)):
+        if day.weekday() < 5 and day not in holidays(year):
+            days.add(day)
+    return frozenset(days)
+
+def is_trading_day(day: date) -> bool:
+    """Returns True if the exchange has a regular session on the given day."""
+    return day.weekday() < 5 and day not in holidays(day.year)
+
+def _now(now: datetime = None) -> datetime:
+    """Returns now (or the given time) in US/Eastern."""
+    if now is None:
+        return datetime.now(EASTERN)
+    return EASTERN.localize(now) if now.tzinfo is None else now.astimezone(EASTERN)
+
+def session_at(now: datetime = None) -> str:
+    """Returns the market session at a given time.
+
+    Args:
+        now (datetime, optional): The time to check, naive times are read as US/Eastern.
+            Defaults to now.
+
+    Returns:
+        str: One of "pre", "regular", "post", "closed" (nights and weekends) or "holiday".
+    """
+    now = _now(now)
+    today = now.date()
+    if today.weekday() >= 5:
+        return "closed"
+    if today in holidays(today.year):
+        return "holiday"
+
+    early = today in early_closes(today.year)
+    clock = now.time()
+    if PRE_MARKET_OPEN <= clock < MARKET_OPEN:
+        return "pre"
+    if MARKET_OPEN <= clock < (EARLY_CLOSE if early else MARKET_CLOSE):
+        return "regular"
+    if MARKET_OPEN <= clock < (EARLY_POST_MARKET_CLOSE if early else POST_MARKET_CLOSE):
+        return "post"
+    return "closed"
+
+def traded_today(now: datetime = None) -> bool:
+    """Returns True once today's regular session has opened, so today has intraday bars."""
+    now = _now(now)
+    return is_trading_day(now.date()) and now.time() >= MARKET_OPEN
+
+def next_open(now: datetime = None) -> datetime:
+    """Returns the start of the next regular session after now (US/Eastern)."""
+    now = _now(now)
+    day = now.date()
+    if now.time() >= MARKET_OPEN:
+        day += timedelta(days=1)
+    while not is_trading_day(day):
+        day += timedelta(days=1)
+    return EASTERN.localize(datetime.combine(day, MARKET_OPEN))
+
+def cache_ttl(now: datetime = None) -> int:
+    """Returns how many seconds prices fetched now stay valid.
+
+    Prices only move during the regular session (the app doesn't request extended-hours
+    bars), so anything fetched outside it is valid until the next open.
+
+    Args:
+        now (datetime, optional): The time of the fetch. Defaults to now.
+
+    Returns:
+        int: Seconds until the cached prices should be refreshed.
+    """
+    now = _now(now)
+    if session_at(now) == "regular":
+        return INTRADAY_TTL
+    return max(1, int((next_open(now) - now).total_seconds()))
+
+def cache_epoch(now: datetime = None, ttl: int = INTRADAY_TTL) -> str:
+    """Returns a key that only changes when cached prices may have changed.
+
+    Pass it to cached fetch functions: during the regular session it changes every ttl
+    seconds, outside it stays the same until the next open.
+
+    Args:
+        now (datetime, optional): The time of the fetch. Defaults to now.
+        ttl (int): Seconds per epoch during the regular session.
+
+    Returns:
+        str: A time bucket during the session (e.g. "regular:29301234"), otherwise the
+        next open (e.g. "closed:2025-01-02T09:30:00-05:00").
+    """
+    now = _now(now)
+    if session_at(now) == "regular":
+        return f"regular:{int(now.timestamp()) // ttl}"
+    return f"closed:{next_open(now).isoformat()}"
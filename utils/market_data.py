@@ -0,0 +1,198 @@
+import os
+import abc
+import zlib
+import threading
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+from utils.lazy import lazy_import
+
+# "yfinance", "replay" (recorded Parquet bars) or "synthetic" (random walks), set with MARKET_DATA_PROVIDER
+PROVIDER = os.getenv("MARKET_DATA_PROVIDER", "yfinance")
+# bars replayed by the "replay" provider, in the layout of benchmarks/fixtures
+REPLAY_DIR = os.getenv("MARKET_DATA_DIR", os.path.join(os.path.dirname(os.path.dirname(__file__)), "benchmarks", "fixtures"))
+SYNTHETIC_YEARS = 15
+EXCHANGE_TZ = "America/New_York"
+
+# rows of a daily history returned for a yfinance period
+PERIOD_ROWS = {"1d": 1, "2d": 2, "5d": 5, "1mo": 21, "3mo": 63, "6mo": 126, "1y": 252}
+
+class YFinanceProvider:
+    """Market data from Yahoo Finance."""
+
+    name = "yfinance"
+
+    def __init__(self) -> None:
+        self._yf = lazy_import("yfinance")
+
+    def history(self, ticker: str, **kwargs) -> pd.DataFrame:
+        """Returns OHLCV bars of one ticker, taking the arguments of ``yf.Ticker.history``."""
+        return self._yf.Ticker(ticker).history(**kwargs)
+
+    def download(self, tickers: list, **kwargs) -> pd.DataFrame:
+        """Returns OHLCV bars of many tickers in one request, grouped by ticker like ``yf.download``."""
+        return self._yf.download(tickers, group_by="ticker", auto_adjust=True, threads=True, progress=False, **kwargs)
+
+    def last_price(self, ticker: str) -> float:
+        """Returns the latest traded price of a ticker."""
+        return self._yf.Ticker(ticker).fast_info.last_price
+
+class FrameProvider(abc.ABC):
+    """Serves yfinance-shaped requests from whole daily and 1-minute frames per ticker.
+
+    Subclasses only produce the frames; slicing by period, start and end and the bulk
+    download layout are shared.
+
+    Attributes:
+        calls (dict): Counts of served "history", "download" and "last_price" requests.
+    """
+
+    name = "frames"
+
+    def __init__(self) -> None:
+        self.calls = {}
+        self._lock = threading.Lock()
+
+    def _count(self, kind: str) -> None:
+        with self._lock:
+            self.calls[kind] = self.calls.get(kind, 0) + 1
+
+    @abc.abstractmethod
+    def daily(self, ticker: str) -> pd.DataFrame:
+        """Returns all daily bars of a ticker, indexed by "Date" in exchange time."""
+
+    @abc.abstractmethod
+    def intraday(self, ticker: str) -> pd.DataFrame:
+        """Returns the 1-minute bars of a ticker's last session, indexed by "Datetime"."""
+
+    def _bars(self, ticker: str, period: str = None, interval: str = "1d", start=None, end=None, **kwargs) -> pd.DataFrame:
+        frame = self.intraday(ticker) if interval == "1m" else self.daily(ticker)
+        if start is None and end is None:
+            return frame.copy() if interval == "1m" else frame.iloc[-PERIOD_ROWS.get(period, 1):].copy()
+
+        mask = np.ones(len(frame), dtype=bool)
+        if start is not None:
+            mask &= frame.index >= _as_exchange_time(start, frame.index.tz)
+        if end is not None:
+            mask &= frame.index < _as_exchange_time(end, frame.index.tz)
+        return frame[mask].copy()
+
+    def history(self, ticker: str, **kwargs) -> pd.DataFrame:
+        self._count("history")
+        return self._bars(ticker, **kwargs)
+
+    def download(self, tickers: list, **kwargs) -> pd.DataFrame:
+        self._count("download")
+        tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+        return pd.concat({ticker: self._bars(ticker, **kwargs) for ticker in tickers}, axis=1)
+
+    def last_price(self, ticker: str) -> float:
+        self._count("last_price")
+        return float(self.daily(ticker)["Close"].iloc[-1])
+
+def _as_exchange_time(value, tz) -> pd.Timestamp:
+    """Converts a naive or aware timestamp to the timezone of a frame's index."""
+    value = pd.Timestamp(value)
+    return value.tz_convert(tz) if value.tz is not None else value.tz_localize(tz)
+
+class ReplayProvider(FrameProvider):
+    """Replays recorded bars from history/<TICKER>.parquet and intraday/<TICKER>.parquet.
+
+    Tickers without a recording replay one of the recorded ones, chosen by a hash of the
+    symbol, so any universe size can be served from a handful of files.
+    """
+
+    name = "replay"
+
+    def __init__(self, data_dir: str = REPLAY_DIR) -> None:
+        super().__init__()
+        self.data_dir = data_dir
+        self.recorded = sorted(name[:-len(".parquet")] for name in os.listdir(os.path.join(data_dir, "history")))
+
+    def source(self, ticker: str) -> str:
+        """Returns the recorded ticker replayed for a symbol."""
+        return ticker if ticker in self.recorded else self.recorded[zlib.crc32(ticker.encode()) % len(self.recorded)]
+
+    def daily(self, ticker: str) -> pd.DataFrame:
+        return _read_bars(self.data_dir, "history", self.source(ticker))
+
+    def intraday(self, ticker: str) -> pd.DataFrame:
+        return _read_bars(self.data_dir, "intraday", self.source(ticker))
+
+@lru_cache(maxsize=None)
+def _read_bars(data_dir: str, kind: str, ticker: str) -> pd.DataFrame:
+    return pd.read_parquet(os.path.join(data_dir, kind, f"{ticker}.parquet"))
+
+class SyntheticProvider(FrameProvider):
+    """Deterministic random-walk bars for any ticker, generated in memory.
+
+    Each ticker gets SYNTHETIC_YEARS of business-day bars up to today and one session of
+    1-minute bars for today, seeded by its symbol so every process sees the same prices.
+    """
+
+    name = "synthetic"
+
+    def daily(self, ticker: str) -> pd.DataFrame:
+        return synthetic_bars(ticker)[0]
+
+    def intraday(self, ticker: str) -> pd.DataFrame:
+        return synthetic_bars(ticker)[1]
+
+@lru_cache(maxsize=4096)
+def synthetic_bars(ticker: str, years: int = SYNTHETIC_YEARS, end: pd.Timestamp = None) -> tuple:
+    """Returns deterministic (daily, intraday) OHLCV frames for a ticker.
+
+    Args:
+        ticker (str): The stock ticker symbol, used as the random seed.
+        years (int): Length of the daily history.
+        end (pandas.Timestamp, optional): The last day. Defaults to today.
+
+    Returns:
+        tuple: The daily bars (index "Date") and 1-minute bars of the last day (index
+        "Datetime"), both in exchange time, with the columns yfinance returns.
+    """
+    end = (end or pd.Timestamp.today()).normalize()
+    days = pd.bdate_range(end - pd.DateOffset(years=years), end, tz=EXCHANGE_TZ)
+    minutes = pd.date_range(end + pd.Timedelta(hours=9, minutes=30), periods=390, freq="min", tz=EXCHANGE_TZ)
+
+    rng = np.random.default_rng(zlib.crc32(ticker.encode()))
+    close = 50 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, len(days))))
+    spread = np.abs(rng.normal(0, 0.01, len(days))) * close
+    daily = pd.DataFrame({
+        "Open": close + rng.normal(0, 0.5, len(days)) * spread,
+        "High": close + spread,
+        "Low": close - spread,
+        "Close": close,
+        "Volume": rng.integers(1_000_000, 50_000_000, len(days)),
+        "Dividends": 0.0,
+        "Stock Splits": 0.0,
+    }, index=days.rename("Date"))
+
+    minute_close = close[-1] * np.exp(np.cumsum(rng.normal(0, 0.001, len(minutes))))
+    intraday = pd.DataFrame({
+        "Open": minute_close, "High": minute_close * 1.0005, "Low": minute_close * 0.9995,
+        "Close": minute_close, "Volume": rng.integers(1_000, 100_000, len(minutes)),
+        "Dividends": 0.0, "Stock Splits": 0.0,
+    }, index=minutes.rename("Datetime"))
+    return daily, intraday
+
+PROVIDERS = {"yfinance": YFinanceProvider, "replay": ReplayProvider, "synthetic": SyntheticProvider}
+
+_provider = None
+_provider_lock = threading.Lock()
+
+def get_provider():
+    """Returns the process-wide market-data provider, created from MARKET_DATA_PROVIDER on first use."""
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            if PROVIDER not in PROVIDERS:
+                raise ValueError(f"Unknown MARKET_DATA_PROVIDER {PROVIDER!r}, expected one of {', '.join(PROVIDERS)}")
+            _provider = PROVIDERS[PROVIDER]()
+        return _provider
+
+def set_provider(provider) -> None:
+    """Replaces the process-wide provider, e.g. with a ReplayProvider for benchmarks."""
+    global _provider
+    with _provider_lock:
+        _provider = provider
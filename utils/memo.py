@@ -0,0 +1,48 @@
+from collections.abc import MutableMapping
+from utils.instrumentation import metrics
+
+class Memo:
+    """Per-session store of derived artifacts, each remembered with the inputs it came from.
+
+    Every artifact has one slot holding its dependency key and its value. A lookup with an
+    equal key returns the stored value without recomputing. A different key (a new lot
+    store version, a refreshed price series, another timeframe) recomputes the artifact and
+    replaces the slot, so only the latest version of each artifact is kept. Keys are
+    compared with ``==``, so they should hold versions, parameters and objects compared by
+    identity (e.g. PriceSeries), never DataFrames.
+
+    Args:
+        store (MutableMapping): Where the slots live, e.g. ``st.session_state``.
+        namespace (str): The key of the slots in store.
+    """
+
+    def __init__(self, store: MutableMapping, namespace: str = "_memo") -> None:
+        if namespace not in store:
+            store[namespace] = {}
+        self._slots = store[namespace]
+
+    def get(self, name: str, deps: tuple, compute):
+        """Returns the artifact called name, computing it only if deps changed.
+
+        Args:
+            name (str): Identifies the artifact, e.g. "holdings" or "value_chart:1 Year".
+            deps (tuple): Everything the artifact depends on.
+            compute (callable): Called without arguments to build the artifact.
+
+        Returns:
+            The stored or newly computed artifact.
+        """
+        slot = self._slots.get(name)
+        if slot is not None and slot[0] == deps:
+            metrics.record_cache("memo", hit=True)
+            return slot[1]
+
+        metrics.record_cache("memo", hit=False)
+        value = compute()
+        self._slots[name] = (deps, value)
+        return value
+
+    def invalidate(self, prefix: str = "") -> None:
+        """Drops every artifact whose name starts with prefix (all of them by default)."""
+        for name in [name for name in self._slots if name.startswith(prefix)]:
+            del self._slots[name]
@@ -0,0 +1,134 @@
+import io
+import pandas as pd
+from utils.lot_store import LOT_COLUMNS, get_lot_store
+from utils.quotes import get_last_prices
+from utils.fetch_scheduler import priority, BACKFILL
+
+# rows parsed, validated and stored per step of an import
+IMPORT_CHUNK_ROWS = 50_000
+
+def read_lot_chunks(source, file_format: str, chunk_rows: int = IMPORT_CHUNK_ROWS):
+    """Streams a CSV or Parquet file of lots in chunks, so it never has to fit in memory.
+
+    Args:
+        source (str or file-like): The file path or an open (uploaded) file.
+        file_format (str): "csv" or "parquet".
+        chunk_rows (int): Rows per chunk.
+
+    Yields:
+        pandas.DataFrame: The raw lot columns present in the file, as read.
+    """
+    if file_format == "csv":
+        yield from pd.read_csv(source, chunksize=chunk_rows, usecols=lambda column: column in LOT_COLUMNS, dtype=str)
+    elif file_format == "parquet":
+        import pyarrow.parquet as pq  # only needed for parquet imports
+
+        parquet_file = pq.ParquetFile(source)
+        columns = [column for column in parquet_file.schema_arrow.names if column in LOT_COLUMNS]
+        for batch in parquet_file.iter_batches(batch_size=chunk_rows, columns=columns):
+            yield batch.to_pandas()
+    else:
+        raise ValueError(f"Unsupported file format: {file_format}")
+
+def coerce_lots(chunk: pd.DataFrame) -> pd.DataFrame:
+    """Converts raw lot columns to the stored types in one vectorised pass per column.
+
+    Rows without a ticker, with a non-positive price or quantity, or with an unparseable
+    date are dropped. A missing name defaults to the ticker.
+
+    Args:
+        chunk (pandas.DataFrame): Raw columns with at least "ticker", "buy_price",
+            "buy_date" and "quantity".
+
+    Returns:
+        pandas.DataFrame: The valid rows, with LOT_COLUMNS ("current_price" left empty).
+    """
+    missing = {"ticker", "buy_price", "buy_date", "quantity"} - set(chunk.columns)
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(sorted(missing))}")
+
+    ticker = chunk["ticker"].astype("string").str.strip().str.upper()
+    name = chunk["name"].astype("string").str.strip() if "name" in chunk else ticker
+    lots = pd.DataFrame({
+        "name": name.mask(name.isna() | (name == ""), ticker),
+        "ticker": ticker,
+        "buy_price": pd.to_numeric(chunk["buy_price"], errors="coerce").round(2),
+        "current_price": None,
+        "buy_date": pd.to_datetime(chunk["buy_date"], errors="coerce", format="mixed").dt.strftime("%Y-%m-%d"),
+        "quantity": pd.to_numeric(chunk["quantity"], errors="coerce"),
+    })
+
+    valid = (
+        lots["ticker"].notna() & (lots["ticker"] != "")
+        & (lots["buy_price"] > 0) & lots["buy_date"].notna()
+        & (lots["quantity"] > 0) & (lots["quantity"] % 1 == 0)
+    )
+    lots = lots[valid.fillna(False)]
+    return lots.astype({"name": object, "ticker": object, "quantity": "int64"})
+
+def validate_tickers(tickers: list) -> dict:
+    """Looks up the latest price of many tickers in one batched request.
+
+    Args:
+        tickers (list): A list of stock ticker symbols (e.g., ["AAPL", "MSFT"]).
+
+    Returns:
+        dict: Maps every known ticker to its latest price. Unknown tickers are left out.
+    """
+    return get_last_prices(list(tickers))
+
+def import_lots(source, file_format: str, store=None, chunk_rows: int = IMPORT_CHUNK_ROWS, progress=None) -> dict:
+    """Imports lots from a CSV or Parquet file into the lot store, chunk by chunk.
+
+    Each chunk is coerced in bulk, the tickers not seen in earlier chunks are validated in
+    one batched lookup, and the valid lots are stored in one transaction.
+
+    Args:
+        source (str or file-like): The file path or an open (uploaded) file.
+        file_format (str): "csv" or "parquet".
+        store (LotStore, optional): The store to add the lots to. Defaults to the shared lot store.
+        chunk_rows (int): Rows per chunk.
+        progress (callable, optional): Called with the running report after every chunk.
+
+    Returns:
+        dict: "imported" and "rejected" row counts and the sorted "unknown_tickers".
+    """
+    store = get_lot_store() if store is None else store
+    prices, unknown = {}, set()
+    report = {"imported": 0, "rejected": 0, "unknown_tickers": []}
+
+    for chunk in read_lot_chunks(source, file_format, chunk_rows):
+        lots = coerce_lots(chunk)
+        report["rejected"] += len(chunk) - len(lots)
+
+        new_tickers = set(lots["ticker"].unique()) - prices.keys() - unknown
+        if new_tickers:
+            with priority(BACKFILL):  # bulk imports queue behind interactive requests
+                found = validate_tickers(sorted(new_tickers))
+            prices.update(found)
+            unknown |= new_tickers - found.keys()
+
+        known = lots["ticker"].isin(prices.keys())
+        report["rejected"] += int((~known).sum())
+        lots = lots[known].assign(current_price=lots["ticker"].map(prices))
+
+        store.add_lots(lots[LOT_COLUMNS].to_dict("records"))
+        report["imported"] += len(lots)
+        if progress:
+            progress(report)
+
+    report["unknown_tickers"] = sorted(unknown)
+    return report
+
+def export_parquet(lots: pd.DataFrame) -> bytes:
+    """Serialises lots to Parquet (columnar, typed and compressed) for download.
+
+    Args:
+        lots (pandas.DataFrame): Lots with LOT_COLUMNS, e.g. from ``LotStore.lots_frame``.
+
+    Returns:
+        bytes: The Parquet file contents.
+    """
+    buffer = io.BytesIO()
+    lots[LOT_COLUMNS].to_parquet(buffer, index=False)
+    return buffer.getvalue()
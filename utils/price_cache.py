@@ -0,0 +1,210 @@
+import os
+import json
+import argparse
+import threading
+from datetime import datetime, timedelta
+import pandas as pd
+from utils.instrumentation import metrics, estimate_bytes
+from utils.fetch_scheduler import scheduler, BACKFILL
+from utils.market_data import get_provider
+
+# default location of the on-disk price store, can be overridden with PRICE_CACHE_DIR
+CACHE_DIR = os.getenv("PRICE_CACHE_DIR", os.path.join(os.path.dirname(os.path.dirname(__file__)), ".price_cache"))
+
+class PriceCache:
+    """Persistent, per-ticker store of daily OHLCV history backed by Parquet files.
+
+    Each ticker is kept in its own Parquet file. A small JSON index records the earliest
+    requested start date and the date the ticker was last topped up, so that repeat lookups
+    on the same day are served from disk and later lookups only download the bars after
+    the last stored date.
+
+    Attributes:
+        cache_dir (str): Directory that holds the Parquet files and the index.
+        stats (dict): Counters for "hits" (served from disk), "topups" (only new bars
+            downloaded), "misses" (full download) and "errors".
+    """
+
+    def __init__(self, cache_dir: str = CACHE_DIR) -> None:
+        self.cache_dir = cache_dir
+        self.stats = {"hits": 0, "topups": 0, "misses": 0, "errors": 0}
+        self._index_path = os.path.join(cache_dir, "index.json")
+        self._lock = threading.Lock()
+        self._ticker_locks = {}
+        os.makedirs(cache_dir, exist_ok=True)
+        self._index = self._load_index()
+
+    def _load_index(self) -> dict:
+        try:
+            with open(self._index_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save_index(self) -> None:
+        # write to a temp file first so a crash never leaves a half-written index
+        tmp_path = self._index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, self._index_path)
+
+    def _path(self, ticker: str) -> str:
+        return os.path.join(self.cache_dir, f"{ticker.replace(os.sep, '_')}.parquet")
+
+    def _download(self, ticker: str, start: str, end: str) -> pd.DataFrame:
+        provider = get_provider()
+
+        def fetch() -> pd.DataFrame:
+            with metrics.call(provider.name, "history") as call:
+                hist = provider.history(ticker, start=start, end=end)
+                call.frame_bytes = estimate_bytes(hist)
+            return hist
+
+        # long histories queue behind alert checks and watchlist quotes
+        return scheduler.run(("history", ticker, start, end), fetch, priority=BACKFILL)
+
+    def _ticker_lock(self, ticker: str) -> threading.Lock:
+        with self._lock:
+            return self._ticker_locks.setdefault(ticker, threading.Lock())
+
+    def _count(self, stat: str, hit: bool = None) -> None:
+        with self._lock:
+            self.stats[stat] += 1
+        if hit is not None:
+            metrics.record_cache("price_cache", hit=hit)
+
+    def get_history(self, ticker: str, start: str, end: str = None) -> pd.DataFrame:
+        """Returns daily history for a ticker, downloading only what is not stored yet.
+
+        Bars are stored as downloaded (split and dividend adjusted as of the download date),
+        so a top-up whose new bars contain a split or dividend downloads the whole stored
+        range again instead of appending bars adjusted on a different basis.
+
+        Args:
+            ticker (str): The stock ticker symbol (e.g., "AAPL").
+            start (str): First date to return, formatted "%Y-%m-%d".
+            end (str, optional): Exclusive end date, formatted "%Y-%m-%d". Defaults to today.
+
+        Returns:
+            pandas.DataFrame: The history between start and end, in the same shape
+            as returned by ``yf.Ticker(ticker).history``.
+        """
+        end = end or datetime.today().strftime("%Y-%m-%d")
+
+        # one lock per ticker, so a slow backfill only holds up lookups of the same ticker
+        with self._ticker_lock(ticker):
+            with self._lock:
+                entry = self._index.get(ticker)
+            path = self._path(ticker)
+            stored = None
+
+            if entry and os.path.exists(path) and entry["start"] <= start:
+                stored = pd.read_parquet(path)
+
+            try:
+                if stored is not None and entry["fetched_through"] >= end:
+                    # everything up to end was already downloaded
+                    self._count("hits", hit=True)
+                    hist = stored
+                elif stored is not None and not stored.empty:
+                    # only download the bars after the last stored date and merge them in
+                    top_up_start = (stored.index.max() + timedelta(days=1)).strftime("%Y-%m-%d")
+                    if top_up_start >= end:
+                        self._count("hits", hit=True)
+                        hist = stored
+                        self._store(ticker, None, entry["start"], end)
+                    else:
+                        new_bars = self._download(ticker, top_up_start, end)
+                        if _has_corporate_action(new_bars):
+                            # the stored bars were adjusted before this action, so adjust them all again
+                            hist = self._download(ticker, entry["start"], end)
+                            self._count("misses", hit=False)
+                        else:
+                            hist = pd.concat([stored, new_bars]) if not new_bars.empty else stored
+                            hist = hist[~hist.index.duplicated(keep="last")].sort_index()
+                            self._count("topups", hit=False)
+                        self._store(ticker, hist, entry["start"], end)
+                else:
+                    hist = self._download(ticker, start, end)
+                    self._count("misses", hit=False)
+                    if not hist.empty:
+                        self._store(ticker, hist, start, end)
+            except Exception:
+                self._count("errors")
+                raise
+
+        if hist.empty:
+            return hist
+        start_ts = pd.Timestamp(start, tz=hist.index.tz)
+        end_ts = pd.Timestamp(end, tz=hist.index.tz)
+        return hist[(hist.index >= start_ts) & (hist.index < end_ts)]
+
+    def _store(self, ticker: str, hist: pd.DataFrame, start: str, fetched_through: str) -> None:
+        # callers hold the ticker's lock, so only the shared index needs the cache lock
+        if hist is not None:
+            hist.to_parquet(self._path(ticker))
+        with self._lock:
+            self._index[ticker] = {"start": start, "fetched_through": fetched_through}
+            self._save_index()
+
+    def invalidate(self, ticker: str = None) -> None:
+        """Removes a single ticker, or the whole cache when no ticker is given.
+
+        Each ticker is dropped under its own lock, so a concurrent lookup of it either reads
+        the file before it is removed or downloads the history again, never a missing file.
+
+        Args:
+            ticker (str, optional): The ticker to drop. Defaults to None (drop everything).
+        """
+        with self._lock:
+            tickers = [ticker] if ticker else list(self._index.keys())
+        for symbol in tickers:
+            with self._ticker_lock(symbol):
+                with self._lock:
+                    self._index.pop(symbol, None)
+                try:
+                    os.remove(self._path(symbol))
+                except FileNotFoundError:
+                    pass
+        with self._lock:
+            self._save_index()
+
+    def hit_rate(self) -> float:
+        """Returns the share of lookups that needed no full download (hits and top-ups)."""
+        total = self.stats["hits"] + self.stats["topups"] + self.stats["misses"]
+        return (self.stats["hits"] + self.stats["topups"]) / total if total else 0.0
+
+def _has_corporate_action(bars: pd.DataFrame) -> bool:
+    """Returns whether downloaded bars contain a split or dividend."""
+    return any(column in bars and bars[column].fillna(0).ne(0).any() for column in ("Stock Splits", "Dividends"))
+
+_price_cache = None
+_price_cache_lock = threading.Lock()
+
+def get_price_cache() -> PriceCache:
+    """Returns the process-wide cache shared by every page, created on first use."""
+    global _price_cache
+    with _price_cache_lock:
+        if _price_cache is None:
+            _price_cache = PriceCache()
+        return _price_cache
+
+def __getattr__(name: str):
+    # ``from utils.price_cache import price_cache`` keeps working and creates the cache lazily
+    if name == "price_cache":
+        return get_price_cache()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the on-disk price cache shared by every session.")
+    parser.add_argument("--clear", nargs="*", metavar="TICKER",
+                        help="drop the given tickers, or the whole cache when none are given")
+    args = parser.parse_args()
+
+    cache = get_price_cache()
+    if args.clear is None:
+        print(f"{len(cache._index)} tickers cached in {cache.cache_dir}")
+    else:
+        for ticker in args.clear or [None]:
+            cache.invalidate(ticker.upper() if ticker else None)
+        print(f"Cleared {', '.join(args.clear) if args.clear else 'every ticker'} from {cache.cache_dir}")
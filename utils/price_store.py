@@ -0,0 +1,150 @@
+import os
+import hashlib
+import threading
+import weakref
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from utils.instrumentation import metrics
+
+# memory budget of the in-memory price store, can be overridden with PRICE_STORE_MB
+PRICE_STORE_BYTES = int(os.getenv("PRICE_STORE_MB", "256")) * 1024 * 1024
+
+class PriceSeries:
+    """Compact daily closing prices of one ticker.
+
+    Closes are kept as a float32 array next to a tz-naive, normalised date index, which is
+    shared by every series with the same trading days. Slices are views, not copies.
+
+    Attributes:
+        dates (pandas.DatetimeIndex): The (shared) dates of the closes.
+        close (numpy.ndarray): The float32 closing prices.
+    """
+
+    __slots__ = ("dates", "close")
+
+    def __init__(self, dates: pd.DatetimeIndex, close: np.ndarray) -> None:
+        self.dates = dates
+        self.close = close
+
+    def __len__(self) -> int:
+        return len(self.close)
+
+    @property
+    def empty(self) -> bool:
+        return len(self.close) == 0
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the closes (the date index is shared, so it isn't counted)."""
+        return self.close.nbytes
+
+    def slice(self, start=None, end=None) -> "PriceSeries":
+        """Returns a zero-copy view of the closes from start (inclusive) to end (exclusive)."""
+        left = self.dates.searchsorted(pd.Timestamp(start)) if start is not None else 0
+        right = self.dates.searchsorted(pd.Timestamp(end)) if end is not None else len(self.dates)
+        return PriceSeries(self.dates[left:right], self.close[left:right])
+
+    def to_series(self) -> pd.Series:
+        """Returns the closes as a float32 Series over the dates, without copying."""
+        return pd.Series(self.close, index=self.dates, name="Close", copy=False)
+
+class PriceStore:
+    """Process-wide, memory-bounded store of compact price series.
+
+    Only the closing prices of a history are kept (as float32), and tickers that trade on
+    the same days share one date index. The least recently used series are evicted once
+    the store grows past its budget; they can be rebuilt from the on-disk price cache.
+
+    Attributes:
+        max_bytes (int): The memory budget of the stored closes and date indexes.
+        stats (dict): Counts of "hits", "misses", "puts" and "evictions".
+    """
+
+    def __init__(self, max_bytes: int = PRICE_STORE_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self.stats = {"hits": 0, "misses": 0, "puts": 0, "evictions": 0}
+        self._series = OrderedDict()
+        # date indexes by content digest, dropped once no series uses them
+        self._indexes = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._series)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the stored closes plus every distinct date index."""
+        with self._lock:
+            indexes = {id(series.dates): series.dates.nbytes for series in self._series.values()}
+            return sum(series.nbytes for series in self._series.values()) + sum(indexes.values())
+
+    def _shared_index(self, dates: np.ndarray) -> pd.DatetimeIndex:
+        """Returns the stored date index with the same dates, or stores this one. Needs the lock."""
+        digest = hashlib.blake2b(dates.tobytes(), digest_size=16).hexdigest()
+        index = self._indexes.get(digest)
+        if index is None:
+            index = pd.DatetimeIndex(dates, name="Date")
+            self._indexes[digest] = index
+        return index
+
+    def put(self, ticker: str, hist: pd.DataFrame) -> PriceSeries:
+        """Stores the closes of a yfinance history and returns them as a compact series.
+
+        Args:
+            ticker (str): The stock ticker symbol (e.g., "AAPL").
+            hist (pandas.DataFrame): A history with a "Close" column and a date index.
+
+        Returns:
+            PriceSeries: The stored series.
+        """
+        if hist is None or hist.empty:
+            dates, close = np.array([], dtype="datetime64[ns]"), np.array([], dtype=np.float32)
+        else:
+            index = hist.index.tz_localize(None) if hist.index.tz is not None else hist.index
+            keep = ~index.normalize().duplicated(keep="last")
+            dates = index.normalize()[keep].to_numpy(dtype="datetime64[ns]")
+            close = hist["Close"].to_numpy(dtype=np.float32)[keep]
+
+        with self._lock:
+            series = PriceSeries(self._shared_index(dates), close)
+            self._series.pop(ticker, None)
+            self._series[ticker] = series
+            self.stats["puts"] += 1
+            self._evict()
+        return series
+
+    def get(self, ticker: str, start=None) -> PriceSeries:
+        """Returns the stored series of a ticker (a view from start, if given), or None."""
+        with self._lock:
+            series = self._series.get(ticker)
+            if series is None:
+                self.stats["misses"] += 1
+                metrics.record_cache("price_store", hit=False)
+                return None
+            self._series.move_to_end(ticker)
+            self.stats["hits"] += 1
+        metrics.record_cache("price_store", hit=True)
+        return series.slice(start) if start is not None else series
+
+    def _evict(self) -> None:
+        """Drops least recently used series until the store fits its budget. Needs the lock."""
+        used = sum(series.nbytes for series in self._series.values())
+        used += sum(index.nbytes for index in {id(s.dates): s.dates for s in self._series.values()}.values())
+        while used > self.max_bytes and len(self._series) > 1:
+            _, series = self._series.popitem(last=False)
+            used -= series.nbytes
+            if not any(other.dates is series.dates for other in self._series.values()):
+                used -= series.dates.nbytes
+            self.stats["evictions"] += 1
+
+    def invalidate(self, ticker: str = None) -> None:
+        """Drops one ticker's series, or every series."""
+        with self._lock:
+            if ticker is None:
+                self._series.clear()
+            else:
+                self._series.pop(ticker, None)
+
+# process-wide store shared by every session
+price_store = PriceStore()
@@ -0,0 +1,162 @@
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from utils.instrumentation import metrics, estimate_bytes
+from utils.fetch_scheduler import scheduler, current_priority, run_with_priority
+from utils.market_data import get_provider
+
+# upper bound on threads used to retry symbols the bulk download could not serve
+MAX_FALLBACK_WORKERS = 8
+
+def _ticker_frame(data: pd.DataFrame, ticker: str) -> pd.DataFrame:
+    """Extracts a single ticker's OHLCV frame from a ``yf.download`` result."""
+    if data is None or data.empty:
+        return pd.DataFrame()
+    if isinstance(data.columns, pd.MultiIndex):
+        if ticker not in data.columns.get_level_values(0):
+            return pd.DataFrame()
+        data = data[ticker]
+    return data.dropna(subset=["Close"])
+
+def _bulk_download(tickers: list, period: str, interval: str) -> pd.DataFrame:
+    provider = get_provider()
+
+    def fetch() -> pd.DataFrame:
+        with metrics.call(provider.name, "download") as call:
+            data = provider.download(tickers, period=period, interval=interval)
+            call.frame_bytes = estimate_bytes(data)
+        return data
+
+    # rate limited and shared with identical requests queued by other sessions
+    return scheduler.run(("download", tuple(tickers), period, interval), fetch)
+
+def _history(ticker: str, **kwargs) -> pd.DataFrame:
+    provider = get_provider()
+
+    def fetch() -> pd.DataFrame:
+        with metrics.call(provider.name, "history") as call:
+            hist = provider.history(ticker, **kwargs)
+            call.frame_bytes = estimate_bytes(hist)
+        return hist
+
+    return scheduler.run(("history", ticker, tuple(sorted(kwargs.items()))), fetch)
+
+def _quote_from_frames(ticker: str, daily: pd.DataFrame, intraday: pd.DataFrame, market_open: bool) -> dict:
+    """Builds a quote record, or returns None if the frames don't hold enough data."""
+    if daily.empty:
+        return None
+
+    if market_open:
+        if intraday.empty:
+            return None
+        today_open = intraday["Open"].iloc[0]
+        latest_price = intraday["Close"].iloc[-1]
+        percent_change = ((latest_price - today_open) / today_open) * 100
+    else:
+        # market hasn't opened yet, use yesterday's open-close change
+        yesterday_open = daily["Open"].iloc[-1]
+        latest_price = daily["Close"].iloc[-1]
+        percent_change = ((latest_price - yesterday_open) / yesterday_open) * 100
+
+    return {"ticker": ticker, "price": float(latest_price), "change": float(percent_change)}
+
+def _fetch_single(ticker: str, market_open: bool) -> tuple:
+    """Fetches one ticker the slow way, used for symbols missing from the bulk download."""
+    try:
+        daily = _history(ticker, period="2d", interval="1d")
+        if daily.empty:
+            return None, f"No historical data available for {ticker}."
+
+        intraday = _history(ticker, period="1d", interval="1m") if market_open else pd.DataFrame()
+        quote = _quote_from_frames(ticker, daily, intraday, market_open)
+        if quote is None:
+            return None, f"No intraday data available for {ticker} today."
+        return quote, None
+    except Exception as e:
+        return None, f"Error fetching data for {ticker}: {e}"
+
+def get_quotes(tickers: list, market_open: bool) -> tuple:
+    """Fetches the latest price and percentage change for many tickers at once.
+
+    All symbols are requested in one bulk download (plus one bulk intraday download while
+    the market is open). Symbols the bulk request could not serve are retried individually
+    on a bounded thread pool.
+
+    Args:
+        tickers (list): A list of stock ticker symbols (e.g., ["AAPL", "MSFT"]).
+        market_open (bool): Whether to measure the change from today's open using 1-minute
+            bars, or from yesterday's open to yesterday's close.
+
+    Returns:
+        tuple: A tuple containing:
+            - quotes (list): Dictionaries with "ticker", "price" and "change", in the
+              same order as tickers.
+            - failures (dict): Maps each ticker that could not be quoted to a message.
+    """
+    if not tickers:
+        return [], {}
+
+    try:
+        daily = _bulk_download(tickers, period="2d", interval="1d")
+        intraday = _bulk_download(tickers, period="1d", interval="1m") if market_open else pd.DataFrame()
+    except Exception:
+        daily, intraday = pd.DataFrame(), pd.DataFrame()
+
+    quotes, missing = {}, []
+    for ticker in tickers:
+        quote = _quote_from_frames(ticker, _ticker_frame(daily, ticker), _ticker_frame(intraday, ticker), market_open)
+        if quote is None:
+            missing.append(ticker)
+        else:
+            quotes[ticker] = quote
+
+    # retry anything the bulk download missed, one request set per ticker
+    failures = {}
+    if missing:
+        level = current_priority()  # pool threads don't inherit the caller's priority class
+        with ThreadPoolExecutor(max_workers=min(MAX_FALLBACK_WORKERS, len(missing))) as pool:
+            fetches = pool.map(lambda t: run_with_priority(level, _fetch_single, t, market_open), missing)
+            for ticker, (quote, error) in zip(missing, fetches):
+                if quote is None:
+                    failures[ticker] = error
+                else:
+                    quotes[ticker] = quote
+
+    return [quotes[ticker] for ticker in tickers if ticker in quotes], failures
+
+def get_last_prices(tickers: list) -> dict:
+    """Fetches the most recent traded price for many tickers in one batch.
+
+    The latest 1-minute bar is used where available, with the last daily close as a
+    fallback for symbols that have no intraday bars (e.g. before the open).
+
+    Args:
+        tickers (list): A list of stock ticker symbols (e.g., ["AAPL", "MSFT"]).
+
+    Returns:
+        dict: Maps each ticker to its latest price (float). Tickers without any data are left out.
+    """
+    if not tickers:
+        return {}
+
+    prices = {}
+    try:
+        intraday = _bulk_download(tickers, period="1d", interval="1m")
+    except Exception:
+        intraday = pd.DataFrame()
+    for ticker in tickers:
+        frame = _ticker_frame(intraday, ticker)
+        if not frame.empty:
+            prices[ticker] = float(frame["Close"].iloc[-1])
+
+    missing = [ticker for ticker in tickers if ticker not in prices]
+    if missing:
+        try:
+            daily = _bulk_download(missing, period="5d", interval="1d")
+        except Exception:
+            daily = pd.DataFrame()
+        for ticker in missing:
+            frame = _ticker_frame(daily, ticker)
+            if not frame.empty:
+                prices[ticker] = float(frame["Close"].iloc[-1])
+
+    return prices
@@ -0,0 +1,179 @@
+import numpy as np
+import pandas as pd
+from utils.valuation import holdings_matrix
+
+TRADING_DAYS = 252
+# annual risk-free rate used for Sharpe and Sortino ratios
+RISK_FREE_RATE = 0.0
+BENCHMARK = "^GSPC"
+# one-sided z-scores of the parametric VaR confidence levels
+Z_SCORES = {0.95: 1.6448536269514722, 0.99: 2.3263478740408408}
+
+def daily_returns(closes: pd.DataFrame) -> pd.DataFrame:
+    """Computes simple daily returns of every column of a date x ticker close matrix.
+
+    Args:
+        closes (pandas.DataFrame): Aligned closing prices, e.g. from ``build_close_matrix``.
+
+    Returns:
+        pandas.DataFrame: Returns from the second date on; NaN before a ticker's first close.
+    """
+    prices = closes.to_numpy(dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = prices[1:] / prices[:-1] - 1
+    return pd.DataFrame(returns, index=closes.index[1:], columns=closes.columns)
+
+def portfolio_returns(lots, closes: pd.DataFrame) -> pd.Series:
+    """Computes the daily returns of the portfolio, excluding the cash added by purchases.
+
+    Each day's return is the value of the previous day's holdings at today's prices over
+    their value at yesterday's prices, so a purchase doesn't count as a gain.
+
+    Args:
+        lots (list or pandas.DataFrame): Lots with "ticker", "buy_date" and "quantity".
+        closes (pandas.DataFrame): Aligned closing prices, e.g. from ``build_close_matrix``.
+
+    Returns:
+        pandas.Series: Portfolio returns from the second date on; NaN while nothing is held.
+    """
+    holdings = holdings_matrix(lots, closes.index, list(closes.columns))[:-1]
+    prices = np.nan_to_num(closes.to_numpy(dtype=float))
+    before = np.einsum("ij,ij->i", holdings, prices[:-1])
+    after = np.einsum("ij,ij->i", holdings, prices[1:])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.where(before > 0, after / before - 1, np.nan)
+    return pd.Series(returns, index=closes.index[1:], name="Portfolio")
+
+def max_drawdown(returns: np.ndarray) -> np.ndarray:
+    """Returns the largest peak-to-trough loss of each column (as a negative fraction)."""
+    wealth = np.cumprod(1 + np.nan_to_num(returns), axis=0)
+    peaks = np.maximum.accumulate(wealth, axis=0)
+    return (wealth / peaks - 1).min(axis=0)
+
+def risk_summary(returns: pd.DataFrame, benchmark: pd.Series = None, confidence: float = 0.95) -> pd.DataFrame:
+    """Computes annualised risk and return statistics for every column at once.
+
+    Args:
+        returns (pandas.DataFrame): Daily returns, one column per holding (or the portfolio).
+        benchmark (pandas.Series, optional): Daily benchmark returns on the same dates, for beta.
+        confidence (float): Confidence level of the value at risk, 0.95 or 0.99.
+
+    Returns:
+        pandas.DataFrame: One row per column with "Return", "Volatility", "Sharpe",
+        "Sortino", "Max Drawdown", "Beta", "VaR (Historical)" and "VaR (Parametric)".
+        VaR is a daily loss as a fraction, the other statistics are annualised.
+    """
+    r = returns.to_numpy(dtype=float)
+    valid = ~np.isnan(r)
+    count = valid.sum(axis=0)
+    rf = RISK_FREE_RATE / TRADING_DAYS
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.nansum(r, axis=0) / count
+        std = np.sqrt(np.nansum((r - mean) ** 2, axis=0) / (count - 1))
+        downside = np.sqrt(np.nansum(np.minimum(r - rf, 0) ** 2, axis=0) / count)
+
+        summary = {
+            "Return": mean * TRADING_DAYS,
+            "Volatility": std * np.sqrt(TRADING_DAYS),
+            "Sharpe": (mean - rf) / std * np.sqrt(TRADING_DAYS),
+            "Sortino": (mean - rf) / downside * np.sqrt(TRADING_DAYS),
+            "Max Drawdown": max_drawdown(r),
+        }
+
+        if benchmark is not None:
+            b = benchmark.reindex(returns.index).to_numpy(dtype=float)[:, None]
+            both = valid & ~np.isnan(b)
+            n = both.sum(axis=0)
+            r0, b0 = np.where(both, r, 0), np.where(both, b, 0)
+            b_mean = b0.sum(axis=0) / n
+            covariance = (r0 * b0).sum(axis=0) / n - (r0.sum(axis=0) / n) * b_mean
+            summary["Beta"] = covariance / ((b0 ** 2).sum(axis=0) / n - b_mean ** 2)
+        else:
+            summary["Beta"] = np.full(r.shape[1], np.nan)
+
+    summary["VaR (Historical)"] = -np.nanquantile(r, 1 - confidence, axis=0) if len(r) else np.full(r.shape[1], np.nan)
+    summary["VaR (Parametric)"] = Z_SCORES[confidence] * std - mean
+
+    return pd.DataFrame(summary, index=returns.columns)
+
+def rolling_stats(returns: pd.DataFrame, window: int, benchmark: pd.Series = None) -> dict:
+    """Computes rolling volatility, Sharpe and beta for every column in O(dates) time.
+
+    Running sums of the returns, squared returns and benchmark cross products are taken
+    once, and each window's moments are differences of two running sums, so the cost
+    does not grow with the window length.
+
+    Args:
+        returns (pandas.DataFrame): Daily returns, one column per series.
+        window (int): The window length in trading days.
+        benchmark (pandas.Series, optional): Daily benchmark returns on the same dates, for beta.
+
+    Returns:
+        dict: "Volatility", "Sharpe" and (with a benchmark) "Beta" DataFrames, annualised,
+        NaN until a window holds at least two returns.
+    """
+    r = returns.to_numpy(dtype=float)
+    valid = ~np.isnan(r)
+    r0 = np.where(valid, r, 0.0)
+
+    def window_sum(values: np.ndarray) -> np.ndarray:
+        sums = np.cumsum(values, axis=0)
+        sums[window:] = sums[window:] - sums[:-window]
+        return sums
+
+    n = window_sum(valid.astype(float))
+    s1, s2 = window_sum(r0), window_sum(r0 ** 2)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = s1 / n
+        std = np.sqrt(np.maximum(s2 - n * mean ** 2, 0) / (n - 1))
+        std[n < 2] = np.nan
+        rf = RISK_FREE_RATE / TRADING_DAYS
+        stats = {
+            "Volatility": std * np.sqrt(TRADING_DAYS),
+            "Sharpe": (mean - rf) / std * np.sqrt(TRADING_DAYS),
+        }
+
+        if benchmark is not None:
+            b = benchmark.reindex(returns.index).to_numpy(dtype=float)[:, None]
+            both = valid & ~np.isnan(b)
+            rb, bb = np.where(both, r, 0.0), np.where(both, b, 0.0)
+            m = window_sum(both.astype(float))
+            sb, sbb, srb, sr = window_sum(bb), window_sum(bb ** 2), window_sum(rb * bb), window_sum(rb)
+            beta = (srb - sr * sb / m) / (sbb - sb ** 2 / m)
+            beta[m < 2] = np.nan
+            stats["Beta"] = beta
+
+    return {name: pd.DataFrame(values, index=returns.index, columns=returns.columns) for name, values in stats.items()}
+
+def _pairwise_moments(returns: pd.DataFrame) -> tuple:
+    """Returns the pairwise count, sums and cross sums over the dates both series trade.
+
+    Everything is a matrix product of the zero-filled returns and the validity mask, so
+    all pairs are computed at once instead of pair by pair.
+    """
+    r = returns.to_numpy(dtype=float)
+    mask = (~np.isnan(r)).astype(float)
+    r0 = np.where(mask > 0, r, 0.0)
+    n = mask.T @ mask
+    sx = r0.T @ mask  # sum of x over the dates y trades too
+    sxx = (r0 ** 2).T @ mask
+    sxy = r0.T @ r0
+    return n, sx, sxx, sxy
+
+def correlation_matrix(returns: pd.DataFrame) -> pd.DataFrame:
+    """Returns the pairwise correlation of daily returns, over the dates both series trade."""
+    n, sx, sxx, sxy = _pairwise_moments(returns)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        correlation = (n * sxy - sx * sx.T) / np.sqrt((n * sxx - sx ** 2) * (n * sxx.T - sx.T ** 2))
+    correlation[n < 2] = np.nan
+    return pd.DataFrame(correlation, index=returns.columns, columns=returns.columns)
+
+def covariance_matrix(returns: pd.DataFrame) -> pd.DataFrame:
+    """Returns the annualised pairwise covariance of daily returns."""
+    n, sx, _, sxy = _pairwise_moments(returns)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        covariance = (sxy - sx * sx.T / n) / (n - 1) * TRADING_DAYS
+    covariance[n < 2] = np.nan
+    return pd.DataFrame(covariance, index=returns.columns, columns=returns.columns)
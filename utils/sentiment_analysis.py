@@ -1,58 +1,234 @@
 import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
 import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
-import nltk
-from nltk.sentiment import SentimentIntensityAnalyzer
 from dotenv import load_dotenv
+from utils.lazy import lazy_import
+from utils.instrumentation import metrics, estimate_bytes
+
+nltk = lazy_import("nltk")
 
 load_dotenv()
 NEWS_API_KEY = os.getenv("NEWS_API_KEY")
 
-nltk.download("vader_lexicon")
-sia = SentimentIntensityAnalyzer() # initialize sia
+# durable store of article scores and recent NewsAPI responses
+SENTIMENT_CACHE_PATH = os.getenv("SENTIMENT_CACHE_PATH", os.path.join(os.path.dirname(os.path.dirname(__file__)), ".sentiment_cache.db"))
+NEWS_TTL = 600  # seconds a NewsAPI response is reused for
+NEWS_API_URL = "https://newsapi.org/v2/everything"
+REQUEST_TIMEOUT = 10  # seconds
+MAX_WORKERS = 8  # concurrent NewsAPI requests
+PAGE_SIZE = 100  # NewsAPI's maximum page size
 
-def fetch_news(stock_symbol):
+# one keep-alive session with a connection pool shared by every worker thread
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=MAX_WORKERS))
+
+_analyzer = None
+_analyzer_lock = threading.Lock()
+
+def get_analyzer():
+    """Returns the shared VADER SentimentIntensityAnalyzer, creating it on first use.
+
+    The lexicon is only downloaded if it isn't installed yet, so a warm start never
+    touches the network.
     """
-    Fetches recent news headlines related to the given stock symbol from the News API.
+    global _analyzer
+    with _analyzer_lock:
+        if _analyzer is None:
+            try:
+                nltk.data.find("sentiment/vader_lexicon.zip")
+            except LookupError:
+                nltk.download("vader_lexicon", quiet=True)
+            from nltk.sentiment import SentimentIntensityAnalyzer
+            _analyzer = SentimentIntensityAnalyzer() # initialize sia
+        return _analyzer
+
+def _connect() -> sqlite3.Connection:
+    connection = sqlite3.connect(SENTIMENT_CACHE_PATH, timeout=30)
+    connection.execute("CREATE TABLE IF NOT EXISTS scores (key TEXT PRIMARY KEY, score REAL NOT NULL)")
+    connection.execute("CREATE TABLE IF NOT EXISTS responses (symbol TEXT PRIMARY KEY, fetched_at REAL NOT NULL, articles TEXT NOT NULL)")
+    return connection
+
+def article_key(title: str, description: str) -> str:
+    """Returns the content hash an article's score is cached under.
+
+    The hash covers the scored text rather than the URL, so the same wire story
+    published under many tickers and sites is only scored once.
+    """
+    return hashlib.sha1(f"{title} {description}".encode("utf-8")).hexdigest()
+
+def _fetch_articles(stock_symbol: str, limit: int = 10) -> list:
+    """Returns up to limit articles for a symbol, paging through NewsAPI as needed.
+
+    A stored response younger than NEWS_TTL is reused instead of calling NewsAPI.
+    Returns None if the first request fails.
+    """
+    cache_key = f"{stock_symbol}:{limit}"
+    connection = _connect()  # sqlite connections can't be shared between worker threads
+    try:
+        row = connection.execute("SELECT fetched_at, articles FROM responses WHERE symbol = ?", (cache_key,)).fetchone()
+        if row and time.time() - row[0] < NEWS_TTL:
+            metrics.record_cache("news_responses", hit=True)
+            return json.loads(row[1])
+        metrics.record_cache("news_responses", hit=False)
+
+        articles, page = [], 1
+        while len(articles) < limit:
+            params = {"q": stock_symbol, "language": "en", "pageSize": min(PAGE_SIZE, limit), "page": page, "apiKey": NEWS_API_KEY}
+            try:
+                with metrics.call("newsapi", "everything") as call:
+                    response = _session.get(NEWS_API_URL, params=params, timeout=REQUEST_TIMEOUT)
+                    call.bytes = estimate_bytes(response)
+            except requests.RequestException:
+                response = None
+            if response is None or response.status_code != 200:
+                if page == 1:
+                    return None
+                break  # keep what earlier pages returned
+
+            data = response.json()
+            batch = data.get("articles", [])
+            articles.extend(
+                {"title": a["title"], "description": a["description"] or "", "url": a["url"], "published_at": a.get("publishedAt")}
+                for a in batch
+            )
+            if not batch or len(articles) >= data.get("totalResults", 0):
+                break
+            page += 1
+
+        articles = articles[:limit]
+        with connection:
+            connection.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?)", (cache_key, time.time(), json.dumps(articles)))
+        return articles
+    finally:
+        connection.close()
+
+def cached_scores(keys: list, connection: sqlite3.Connection) -> dict:
+    """Returns the stored scores of the given article keys, leaving out unscored ones."""
+    scores = {}
+    # look up known scores in chunks to stay below SQLite's parameter limit
+    for i in range(0, len(keys), 500):
+        chunk = keys[i:i + 500]
+        placeholders = ",".join("?" * len(chunk))
+        scores.update(connection.execute(f"SELECT key, score FROM scores WHERE key IN ({placeholders})", chunk).fetchall())
+    return scores
+
+def score_articles(articles: list, connection: sqlite3.Connection = None) -> list:
+    """Scores articles with VADER, skipping every article that was already scored.
 
     Args:
-        stock_symbol (str): The stock symbol to search for.
+        articles (list): Dictionaries with "title" and "description".
+        connection (sqlite3.Connection, optional): An open cache connection. Defaults to a new one.
 
     Returns:
-        tuple: A pandas DataFrame containing news data, the overall sentiment score, and the overall sentiment label.
-               Returns empty DataFrame, 0, and "Neutral" if there's an error or no articles are found.
+        list: The compound sentiment score of each article, in order.
     """
-    url = f"https://newsapi.org/v2/everything?q={stock_symbol}&language=en&apiKey={NEWS_API_KEY}" # NewsAPI url
-    response = requests.get(url)
+    own_connection = connection is None
+    connection = connection or _connect()
+    try:
+        keys = [article_key(a["title"], a["description"]) for a in articles]
+        unique_keys = list(dict.fromkeys(keys))
+        scores = cached_scores(unique_keys, connection)
 
-    if response.status_code == 200:
-        data = response.json()
-        articles = data.get("articles", [])[:10] # extract articles, first 10
+        # score only the new articles and store them in one transaction
+        new_scores = {}
+        for key, article in zip(keys, articles):
+            if key not in scores and key not in new_scores:
+                sia = get_analyzer()
+                new_scores[key] = sia.polarity_scores(article["title"] + " " + article["description"])["compound"]
+        metrics.record_cache("sentiment_scores", hit=True, count=len(unique_keys) - len(new_scores))
+        metrics.record_cache("sentiment_scores", hit=False, count=len(new_scores))
+        if new_scores:
+            with connection:
+                connection.executemany("INSERT OR REPLACE INTO scores VALUES (?, ?)", new_scores.items())
+            scores.update(new_scores)
 
-        news_data, sentiment_scores = [], []
+        return [scores[key] for key in keys]
+    finally:
+        if own_connection:
+            connection.close()
 
-        # iterate through articles to extract title, description, and url
-        for article in articles:
-            title = article["title"]
-            description = article["description"] or ""
-            url = article["url"]
+def sentiment_label(score: float) -> str:
+    """Maps a compound score to "Positive", "Negative" or "Neutral"."""
+    return "Positive" if score > 0.05 else "Negative" if score < -0.05 else "Neutral"
 
-            # perform sentiment analysis
-            sentiment_score = sia.polarity_scores(title + " " + description)["compound"]
-            sentiment_scores.append(sentiment_score)
+def fetch_news_batch(stock_symbols: list, limit: int = 10, max_workers: int = MAX_WORKERS) -> dict:
+    """
+    Fetches and scores recent news for many stock symbols at once.
 
-            # sentiment label based on score
-            sentiment = "Positive" if sentiment_score > 0.05 else \
-                        "Negative" if sentiment_score < -0.05 else "Neutral"
+    News for every symbol is fetched concurrently over the shared session. Articles from
+    every symbol are then scored together, and articles already in the score cache
+    (including ones seen under another symbol) are not scored again.
 
-            news_data.append({"Title": title, "Sentiment": sentiment, "Score": sentiment_score, "URL": url})
+    Args:
+        stock_symbols (list): The stock symbols to search for.
+        limit (int, optional): Maximum number of articles per symbol. Defaults to 10.
+        max_workers (int, optional): Maximum number of concurrent requests. Defaults to MAX_WORKERS.
+
+    Returns:
+        dict: Maps each symbol to the same tuple fetch_news returns.
+    """
+    stock_symbols = list(dict.fromkeys(stock_symbols))
+    if not stock_symbols:
+        return {}
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(stock_symbols))) as pool:
+        fetched = dict(zip(stock_symbols, pool.map(lambda symbol: _fetch_articles(symbol, limit), stock_symbols)))
+
+    all_articles = [article for articles in fetched.values() if articles for article in articles]
+    all_scores = iter(score_articles(all_articles))
+
+    results = {}
+    for symbol, articles in fetched.items():
+        if articles is None:
+            results[symbol] = (pd.DataFrame(), 0, "Neutral")
+            continue
+
+        sentiment_scores = [next(all_scores) for _ in articles]
+        news_data = [
+            {"Title": a["title"], "Sentiment": sentiment_label(score), "Score": score, "URL": a["url"]}
+            for a, score in zip(articles, sentiment_scores)
+        ]
 
         # compute overall sentiment score
         overall_sentiment_score = sum(sentiment_scores) / len(sentiment_scores) if sentiment_scores else 0
-        overall_sentiment_label = "Positive" if overall_sentiment_score > 0.05 else \
-                                  "Negative" if overall_sentiment_score < -0.05 else "Neutral"
+        results[symbol] = (pd.DataFrame(news_data), overall_sentiment_score, sentiment_label(overall_sentiment_score))
+
+    return results
+
+def fetch_news(stock_symbol):
+    """
+    Fetches recent news headlines related to the given stock symbol from the News API.
+
+    Args:
+        stock_symbol (str): The stock symbol to search for.
+
+    Returns:
+        tuple: A pandas DataFrame containing news data, the overall sentiment score, and the overall sentiment label.
+               Returns empty DataFrame, 0, and "Neutral" if there's an error or no articles are found.
+    """
+    return fetch_news_batch([stock_symbol])[stock_symbol]
 
-        # return the news data as a pandas df and overall sentiment score and label
-        return pd.DataFrame(news_data), overall_sentiment_score, overall_sentiment_label
-    else:
-        return pd.DataFrame(), 0, "Neutral"
+def fetch_portfolio_sentiment(stock_symbols: list, limit: int = 10, max_workers: int = MAX_WORKERS) -> pd.DataFrame:
+    """
+    Fetches and scores news for every symbol of a portfolio and watchlist.
+
+    Args:
+        stock_symbols (list): The stock symbols to search for.
+        limit (int, optional): Maximum number of articles per symbol. Defaults to 10.
+        max_workers (int, optional): Maximum number of concurrent requests. Defaults to MAX_WORKERS.
+
+    Returns:
+        pandas.DataFrame: One row per article with "Symbol", "Title", "Sentiment", "Score" and "URL".
+    """
+    results = fetch_news_batch(stock_symbols, limit=limit, max_workers=max_workers)
+    frames = [news_df.assign(Symbol=symbol) for symbol, (news_df, _, _) in results.items() if not news_df.empty]
+    if not frames:
+        return pd.DataFrame(columns=["Symbol", "Title", "Sentiment", "Score", "URL"])
+    return pd.concat(frames, ignore_index=True)[["Symbol", "Title", "Sentiment", "Score", "URL"]]
@@ -0,0 +1,246 @@
+"""Bulk sentiment scoring of large article corpora.
+
+Run from the project root with:
+
+    python -m utils.sentiment_bulk dumps/*.json --symbols AAPL MSFT --limit 500 --output sentiment
+
+Articles come from stored dumps (NewsAPI JSON responses, JSON lines or CSV) and/or paged
+NewsAPI fetches. Exact and near-duplicate headlines are dropped per symbol before scoring,
+known articles are read from the score cache, and new ones are scored with VADER on a
+process pool in chunks. Per-ticker and daily aggregates are updated as each chunk finishes.
+"""
+import os
+import re
+import csv
+import json
+import hashlib
+import argparse
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+from utils.sentiment_analysis import (
+    _connect, _fetch_articles, article_key, cached_scores, get_analyzer, sentiment_label
+)
+
+CHUNK_SIZE = 500  # articles per process-pool task
+SIMHASH_DISTANCE = 3  # headlines whose simhashes differ in at most this many bits are near-duplicates
+SIMHASH_BANDS = 4  # 16-bit bands, one of which must match exactly within SIMHASH_DISTANCE
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_BITS = np.uint64(1) << np.arange(64, dtype=np.uint64)
+
+def normalise_headline(title: str) -> str:
+    """Lowercases a headline and collapses it to its words, for duplicate detection."""
+    return " ".join(_TOKEN.findall((title or "").lower()))
+
+def simhash(text: str) -> int:
+    """Returns the 64-bit simhash of a text's words and word pairs.
+
+    Texts that share most of their words get hashes that differ in only a few bits, so
+    small edits (a changed word, a suffix such as "- Reuters") stay close.
+    """
+    words = text.split()
+    features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    if not features:
+        return 0
+    hashes = np.array(
+        [int.from_bytes(hashlib.blake2b(f.encode("utf-8"), digest_size=8).digest(), "little") for f in features],
+        dtype=np.uint64
+    )
+    # each bit of the result is set if most features have it set
+    votes = ((hashes[:, None] & _BITS) != 0).sum(axis=0) * 2 > len(features)
+    return int((votes.astype(np.uint64) * _BITS).sum())
+
+class HeadlineDeduplicator:
+    """Remembers the headlines seen for each symbol and flags exact and near repeats.
+
+    Exact repeats are found with a set of normalised headlines. Near repeats are found by
+    simhash: two hashes within SIMHASH_DISTANCE bits must agree exactly on at least one of
+    SIMHASH_BANDS bands, so only headlines sharing a band are compared.
+    """
+
+    def __init__(self) -> None:
+        self.stats = {"exact": 0, "near": 0, "kept": 0}
+        self._exact = set()
+        self._bands = defaultdict(list)  # (symbol, band, value) -> simhashes
+
+    def is_duplicate(self, symbol: str, title: str) -> bool:
+        """Returns True if symbol already had this or a nearly identical headline, else records it."""
+        headline = normalise_headline(title)
+        if (symbol, headline) in self._exact:
+            self.stats["exact"] += 1
+            return True
+
+        fingerprint = simhash(headline)
+        width = 64 // SIMHASH_BANDS
+        bands = [(symbol, band, (fingerprint >> (band * width)) & ((1 << width) - 1)) for band in range(SIMHASH_BANDS)]
+        for key in bands:
+            if any(bin(fingerprint ^ other).count("1") <= SIMHASH_DISTANCE for other in self._bands[key]):
+                self.stats["near"] += 1
+                return True
+
+        self._exact.add((symbol, headline))
+        for key in bands:
+            self._bands[key].append(fingerprint)
+        self.stats["kept"] += 1
+        return False
+
+def read_dump(path: str, symbol: str = None):
+    """Yields the articles of a stored dump with "symbol", "title", "description" and "published_at".
+
+    Args:
+        path (str): A NewsAPI JSON response (.json), one article per line (.jsonl) or a CSV
+            with "symbol", "title", "description" and "published_at"/"publishedAt" columns.
+        symbol (str, optional): The symbol of articles without one. Defaults to the file
+            name, e.g. AAPL for dumps/AAPL.json.
+    """
+    symbol = symbol or os.path.splitext(os.path.basename(path))[0].upper()
+
+    def article(raw: dict) -> dict:
+        return {
+            "symbol": (raw.get("symbol") or symbol).upper(),
+            "title": raw.get("title") or "",
+            "description": raw.get("description") or "",
+            "published_at": raw.get("published_at") or raw.get("publishedAt"),
+        }
+
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.lower().endswith(".csv"):
+            for raw in csv.DictReader(f):
+                yield article(raw)
+        elif path.lower().endswith(".jsonl"):
+            for line in f:
+                if line.strip():
+                    yield article(json.loads(line))
+        else:
+            for raw in json.load(f).get("articles", []):
+                yield article(raw)
+
+def fetch_corpus(symbols: list, limit: int):
+    """Yields up to limit articles per symbol, paged from NewsAPI (or its stored responses)."""
+    for symbol in symbols:
+        for raw in _fetch_articles(symbol, limit) or []:
+            yield {"symbol": symbol, "title": raw["title"] or "", "description": raw["description"],
+                   "published_at": raw.get("published_at")}
+
+class SentimentAggregate:
+    """Running per-ticker and per-day sums of article scores."""
+
+    def __init__(self) -> None:
+        self._sums = defaultdict(lambda: [0.0, 0])  # (symbol, date) -> [score sum, count]
+
+    def add(self, rows: list, score: float) -> None:
+        """Adds one score to every (symbol, date) row it was published under."""
+        for row in rows:
+            total = self._sums[row]
+            total[0] += score
+            total[1] += 1
+
+    def by_ticker(self) -> pd.DataFrame:
+        """Returns "Symbol", "Score" (mean), "Sentiment" and "Articles" per ticker."""
+        if not self._sums:
+            return pd.DataFrame(columns=["Symbol", "Score", "Sentiment", "Articles"])
+        frame = pd.DataFrame(
+            [(symbol, total, count) for (symbol, _), (total, count) in self._sums.items()],
+            columns=["Symbol", "Total", "Articles"]
+        ).groupby("Symbol", as_index=False).sum()
+        frame["Score"] = frame["Total"] / frame["Articles"]
+        frame["Sentiment"] = frame["Score"].map(sentiment_label)
+        return frame[["Symbol", "Score", "Sentiment", "Articles"]]
+
+    def daily(self) -> pd.DataFrame:
+        """Returns the mean score per day (rows) and ticker (columns), NaN on days without news."""
+        rows = [(date, symbol, total / count) for (symbol, date), (total, count) in self._sums.items() if date]
+        if not rows:
+            return pd.DataFrame()
+        frame = pd.DataFrame(rows, columns=["Date", "Symbol", "Score"])
+        return frame.pivot(index="Date", columns="Symbol", values="Score").sort_index()
+
+def _score_chunk(texts: list) -> list:
+    """Scores a chunk of texts with VADER, runs in a worker process."""
+    sia = get_analyzer()
+    return [sia.polarity_scores(text)["compound"] for text in texts]
+
+def score_corpus(articles, workers: int = None, chunk_size: int = CHUNK_SIZE, deduplicator: HeadlineDeduplicator = None):
+    """Scores a corpus and yields the running aggregates as scores come in.
+
+    The same text published under several symbols is scored once, and cached scores are
+    aggregated before any new article is scored.
+
+    Args:
+        articles (iterable): Article dicts, e.g. from ``read_dump`` or ``fetch_corpus``.
+        workers (int, optional): Worker processes. Defaults to the number of CPUs.
+        chunk_size (int): Articles per process-pool task. Corpora up to this size are
+            scored in-process.
+        deduplicator (HeadlineDeduplicator, optional): Keeps duplicate statistics for the caller.
+
+    Yields:
+        tuple: (scored, total, aggregate), the number of unique articles with a score so
+        far, the number to score and the SentimentAggregate holding them.
+    """
+    deduplicator = deduplicator or HeadlineDeduplicator()
+    rows, texts = defaultdict(list), {}  # key -> (symbol, date) rows, key -> text
+    for article in articles:
+        if deduplicator.is_duplicate(article["symbol"], article["title"]):
+            continue
+        key = article_key(article["title"], article["description"])
+        rows[key].append((article["symbol"], (article["published_at"] or "")[:10] or None))
+        texts.setdefault(key, f"{article['title']} {article['description']}")
+
+    aggregate, total = SentimentAggregate(), len(rows)
+    connection = _connect()
+    try:
+        known = cached_scores(list(rows), connection)
+        for key, score in known.items():
+            aggregate.add(rows[key], score)
+        yield len(known), total, aggregate
+
+        pending = [key for key in rows if key not in known]
+        chunks = [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+        scored = len(known)
+
+        def finish(keys: list, scores: list) -> None:
+            with connection:
+                connection.executemany("INSERT OR REPLACE INTO scores VALUES (?, ?)", zip(keys, scores))
+            for key, score in zip(keys, scores):
+                aggregate.add(rows[key], score)
+
+        if len(chunks) == 1:
+            finish(chunks[0], _score_chunk([texts[key] for key in chunks[0]]))
+            yield total, total, aggregate
+        elif chunks:
+            with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+                futures = {pool.submit(_score_chunk, [texts[key] for key in chunk]): chunk for chunk in chunks}
+                for future in as_completed(futures):
+                    finish(futures[future], future.result())
+                    scored += len(futures[future])
+                    yield scored, total, aggregate
+    finally:
+        connection.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score large news corpora into per-ticker and daily sentiment.")
+    parser.add_argument("dumps", nargs="*", help="stored article dumps (.json NewsAPI responses, .jsonl or .csv)")
+    parser.add_argument("--symbols", nargs="*", default=[], help="symbols to fetch from NewsAPI")
+    parser.add_argument("--limit", type=int, default=100, help="articles to fetch per symbol")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="articles per worker task")
+    parser.add_argument("--output", default="sentiment", help="folder to write by_ticker.csv and daily.csv to")
+    args = parser.parse_args()
+
+    def corpus():
+        for path in args.dumps:
+            yield from read_dump(path)
+        yield from fetch_corpus(args.symbols, args.limit)
+
+    deduplicator = HeadlineDeduplicator()
+    aggregate = None
+    for scored, total, aggregate in score_corpus(corpus(), args.workers, args.chunk_size, deduplicator):
+        print(f"Scored {scored}/{total} articles")
+
+    os.makedirs(args.output, exist_ok=True)
+    aggregate.by_ticker().to_csv(os.path.join(args.output, "by_ticker.csv"), index=False)
+    aggregate.daily().to_csv(os.path.join(args.output, "daily.csv"))
+    print(f"Dropped {deduplicator.stats['exact']} exact and {deduplicator.stats['near']} near-duplicate headlines, "
+          f"wrote {args.output}/by_ticker.csv and {args.output}/daily.csv")
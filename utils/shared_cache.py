@@ -0,0 +1,195 @@
+import os
+import sys
+import time
+import threading
+from collections import OrderedDict
+from utils.instrumentation import metrics, estimate_bytes
+
+# memory budget of the shared market-data cache, can be overridden with MARKET_CACHE_MB
+MARKET_CACHE_BYTES = int(os.getenv("MARKET_CACHE_MB", "512")) * 1024 * 1024
+DEFAULT_TTL = 60
+
+_MISSING = object()
+
+def sizeof(value) -> int:
+    """Roughly sizes a cached value: DataFrames by their memory, containers by their items."""
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(sizeof(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(sizeof(k) + sizeof(v) for k, v in value.items())
+    return estimate_bytes(value) or sys.getsizeof(value)
+
+class _Flight:
+    """One in-flight fetch that concurrent requests for the same key wait on."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value = _MISSING
+        self.error = None
+
+class SharedCache:
+    """Process-wide LRU cache with per-entry TTLs, a memory budget and single-flight fetches.
+
+    Every Streamlit session runs in a thread of the same process, so one instance serves
+    all users. Concurrent misses for the same key wait on a single fetch instead of
+    downloading the same data once per session.
+
+    Attributes:
+        max_bytes (int): Entries are evicted least recently used first above this size.
+        stats (dict): Counts of "hits", "misses", "coalesced" waits and "evictions".
+    """
+
+    def __init__(self, max_bytes: int = MARKET_CACHE_BYTES, name: str = "market_cache") -> None:
+        self.max_bytes = max_bytes
+        self.name = name
+        self.bytes = 0
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0, "evictions": 0}
+        self._entries = OrderedDict()  # key -> (value, expires_at, size)
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _lookup(self, key):
+        """Returns a fresh entry's value (marking it recently used), or _MISSING. Needs the lock."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+        if entry[1] <= time.monotonic():
+            self._discard(key)
+            return _MISSING
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def _discard(self, key) -> None:
+        _, _, size = self._entries.pop(key)
+        self.bytes -= size
+
+    def _store(self, key, value, ttl: float) -> None:
+        size = sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self._discard(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, time.monotonic() + ttl, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                self._discard(next(iter(self._entries)))
+                self.stats["evictions"] += 1
+
+    def _count(self, hits: int = 0, misses: int = 0, coalesced: int = 0) -> None:
+        self.stats["hits"] += hits
+        self.stats["misses"] += misses
+        self.stats["coalesced"] += coalesced
+        if hits:
+            metrics.record_cache(self.name, hit=True, count=hits)
+        if misses:
+            metrics.record_cache(self.name, hit=False, count=misses)
+
+    def get(self, key, fetch, ttl: float = DEFAULT_TTL):
+        """Returns the cached value for key, fetching it once if it is missing or expired.
+
+        Args:
+            key (hashable): Identifies the data, e.g. ("history", "AAPL").
+            fetch (callable): Called without arguments to produce the value on a miss.
+            ttl (float): Seconds the fetched value stays fresh.
+
+        Returns:
+            The cached or fetched value. Errors of the fetch are raised to every waiter
+            and nothing is cached. If the fetching request is interrupted instead (e.g. by
+            a Streamlit rerun or stop), its waiters fetch again themselves.
+        """
+        with self._lock:
+            value = self._lookup(key)
+            if value is not _MISSING:
+                self._count(hits=1)
+                return value
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+                self._count(misses=1)
+            else:
+                self._count(coalesced=1)
+
+        if not leader:
+            flight.done.wait()
+            if isinstance(flight.error, Exception):
+                raise flight.error
+            if flight.error is not None:  # the leader's session was interrupted, not the fetch
+                return self.get(key, fetch, ttl)
+            return flight.value
+
+        try:
+            flight.value = fetch()
+            self._store(key, flight.value, ttl)
+            return flight.value
+        except BaseException as e:  # also rerun/stop exceptions, so waiters never see _MISSING
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            flight.done.set()
+
+    def get_many(self, keys: list, fetch_many, ttl: float = DEFAULT_TTL) -> dict:
+        """Returns the cached values of many keys, fetching all missing ones in one call.
+
+        Keys another request is already fetching are waited on rather than fetched again.
+
+        Args:
+            keys (list): The keys to look up.
+            fetch_many (callable): Called with the list of missing keys, returns a dict of
+                key -> value. Keys it leaves out are not cached.
+            ttl (float): Seconds the fetched values stay fresh.
+
+        Returns:
+            dict: Maps every key with a value to it.
+        """
+        results, waiting, leading = {}, {}, {}
+        with self._lock:
+            for key in dict.fromkeys(keys):
+                value = self._lookup(key)
+                if value is not _MISSING:
+                    results[key] = value
+                elif key in self._inflight:
+                    waiting[key] = self._inflight[key]
+                else:
+                    leading[key] = self._inflight[key] = _Flight()
+            self._count(hits=len(results), misses=len(leading), coalesced=len(waiting))
+
+        if leading:
+            try:
+                fetched = fetch_many(list(leading)) or {}
+                for key, value in fetched.items():
+                    if key in leading:
+                        self._store(key, value, ttl)
+                        leading[key].value = results[key] = value
+            except BaseException as e:
+                for flight in leading.values():
+                    flight.error = e
+                raise
+            finally:
+                with self._lock:
+                    for key in leading:
+                        del self._inflight[key]
+                for flight in leading.values():
+                    flight.done.set()
+
+        for key, flight in waiting.items():
+            flight.done.wait()
+            if flight.error is None and flight.value is not _MISSING:
+                results[key] = flight.value
+
+        return results
+
+    def invalidate(self, predicate=None) -> None:
+        """Drops every entry, or the entries whose key matches predicate."""
+        with self._lock:
+            for key in [key for key in self._entries if predicate is None or predicate(key)]:
+                self._discard(key)
+
+# process-wide cache shared by every session and page of one app server, the alert worker process has its own
+market_cache = SharedCache()
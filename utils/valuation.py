@@ -0,0 +1,149 @@
+import numpy as np
+import pandas as pd
+from utils.price_store import PriceSeries
+
+def build_close_matrix(histories: dict) -> pd.DataFrame:
+    """Aligns the closing prices of many tickers on one shared date index.
+
+    Args:
+        histories (dict): Maps ticker symbols to history DataFrames with a "Close" column,
+            or to compact ``PriceSeries``.
+
+    Returns:
+        pandas.DataFrame: A date x ticker matrix of closing prices. Gaps (e.g. before a
+        listing, or on a foreign holiday) are forward filled and any leading gaps are NaN.
+    """
+    closes = {}
+    for ticker, hist in histories.items():
+        if hist is None or hist.empty:
+            continue
+        if isinstance(hist, PriceSeries):  # already tz-naive and normalised
+            closes[ticker] = hist.to_series()
+            continue
+        close = hist["Close"]
+        index = close.index.tz_localize(None) if close.index.tz is not None else close.index
+        closes[ticker] = pd.Series(close.to_numpy(), index=index.normalize())
+
+    if not closes:
+        return pd.DataFrame()
+
+    matrix = pd.concat(closes, axis=1).sort_index()
+    matrix = matrix[~matrix.index.duplicated(keep="last")]
+    matrix.index.name = "Date"
+    return matrix.ffill()
+
+def holdings_matrix(lots: list, dates: pd.DatetimeIndex, tickers: list) -> np.ndarray:
+    """Computes the number of shares held per ticker on every date.
+
+    Each lot adds its quantity from its buy date onwards, so holdings are cumulative step
+    functions. The lots are scattered into a date x ticker delta matrix in one vectorised
+    pass and integrated with a cumulative sum.
+
+    Args:
+        lots (list or pandas.DataFrame): Lots with "ticker", "buy_date" ("%Y-%m-%d") and "quantity".
+        dates (pandas.DatetimeIndex): The sorted date index of the close matrix.
+        tickers (list): The column order of the close matrix.
+
+    Returns:
+        numpy.ndarray: A float array of shape (len(dates), len(tickers)).
+    """
+    deltas = np.zeros((len(dates), len(tickers)))
+    if len(lots) == 0:
+        return deltas
+
+    lot_frame = pd.DataFrame(lots, columns=["ticker", "buy_date", "quantity"])
+    column = pd.Index(tickers).get_indexer(lot_frame["ticker"])
+    row = dates.searchsorted(pd.to_datetime(lot_frame["buy_date"]).to_numpy(), side="left")
+
+    # lots for unknown tickers, or bought after the last known date, don't contribute yet
+    valid = (column >= 0) & (row < len(dates))
+    np.add.at(deltas, (row[valid], column[valid]), lot_frame["quantity"].to_numpy(dtype=float)[valid])
+
+    return np.cumsum(deltas, axis=0)
+
+def invested_series(lots, dates: pd.DatetimeIndex, tickers: list) -> np.ndarray:
+    """Computes the cumulative amount paid for the lots bought up to every date.
+
+    Args:
+        lots (pandas.DataFrame): Lots with "ticker", "buy_date", "buy_price" and "quantity".
+        dates (pandas.DatetimeIndex): The sorted date index of the close matrix.
+        tickers (list): The columns of the close matrix; lots of other tickers are not counted.
+
+    Returns:
+        numpy.ndarray: A float array of length len(dates).
+    """
+    flows = np.zeros(len(dates))
+    if len(lots) == 0:
+        return flows
+
+    lot_frame = pd.DataFrame(lots, columns=["ticker", "buy_date", "buy_price", "quantity"])
+    row = dates.searchsorted(pd.to_datetime(lot_frame["buy_date"]).to_numpy(), side="left")
+
+    # the same lots as holdings_matrix counts, so purchases match the value they add
+    valid = lot_frame["ticker"].isin(tickers).to_numpy() & (row < len(dates))
+    cost = lot_frame["buy_price"].to_numpy(dtype=float) * lot_frame["quantity"].to_numpy(dtype=float)
+    np.add.at(flows, row[valid], cost[valid])
+
+    return np.cumsum(flows)
+
+def percentage_change(values: pd.Series, invested: pd.Series) -> float:
+    """Calculates the percentage gain over a window, net of purchases made within it.
+
+    Money paid for lots bought inside the window is not a gain, so it is taken off the
+    change in value and added to the starting value. A window that starts before the first
+    purchase (e.g. "All Time") therefore measures the gain against the cost basis.
+
+    Args:
+        values (pandas.Series): The portfolio value on each date of the window.
+        invested (pandas.Series): The cumulative amount paid on the same dates, from
+            ``invested_series``.
+
+    Returns:
+        float: The gain in percent, or 0.0 if nothing was held or bought in the window.
+    """
+    if values.empty:
+        return 0.0
+    purchases = invested.iloc[-1] - invested.iloc[0]
+    base = values.iloc[0] + purchases
+    gain = values.iloc[-1] - values.iloc[0] - purchases
+    return float(gain / base * 100) if base else 0.0
+
+def portfolio_value_series(lots: list, histories: dict) -> pd.DataFrame:
+    """Calculates the total portfolio value on each date, taking buy dates into account.
+
+    The value is 0 before the first purchase, jumps by price * quantity on each buy date
+    and then follows the price of every ticker held.
+
+    Args:
+        lots (pandas.DataFrame): Lots with "ticker", "buy_date", "buy_price" and "quantity",
+            e.g. from ``LotStore.lots_frame``.
+        histories (dict): Maps ticker symbols to history DataFrames with a "Close" column.
+
+    Returns:
+        pandas.DataFrame: Columns "Date", "Total Portfolio Value" and "Invested" (the
+        cumulative amount paid for the lots bought so far).
+    """
+    return value_series_from_closes(lots, build_close_matrix(histories))
+
+def value_series_from_closes(lots, closes: pd.DataFrame) -> pd.DataFrame:
+    """Calculates the total portfolio value on each date of an aligned close matrix.
+
+    Args:
+        lots (pandas.DataFrame): Lots with "ticker", "buy_date", "buy_price" and "quantity".
+        closes (pandas.DataFrame): A date x ticker matrix from ``build_close_matrix``.
+
+    Returns:
+        pandas.DataFrame: Columns "Date", "Total Portfolio Value" and "Invested".
+    """
+    if closes.empty:
+        return pd.DataFrame(columns=["Date", "Total Portfolio Value", "Invested"])
+
+    tickers = list(closes.columns)
+    holdings = holdings_matrix(lots, closes.index, tickers)
+    prices = np.nan_to_num(closes.to_numpy(dtype=float))
+
+    # row-wise dot product of prices and holdings gives the value per date
+    values = np.einsum("ij,ij->i", prices, holdings)
+
+    return pd.DataFrame({"Date": closes.index, "Total Portfolio Value": values,
+                         "Invested": invested_series(lots, closes.index, tickers)})